@@ -0,0 +1,469 @@
+"""
+Requirement Analysis Pipeline
+Runs detection, classification and suggestion over one requirement in a single pass
+"""
+
+import os
+import sys
+import threading
+from array import array
+from functools import lru_cache
+from time import perf_counter
+
+from detector import find_term_matches, find_ambiguities, ambiguous_terms, suggest_improvement
+from preprocessor import MAX_REQUIREMENTS, extract_requirements, normalize_whitespace
+from classifier import match_keywords, category_from_counts, confidence_from_counts, keywords_for_category
+from lexicon import current_lexicon, require_lexicon
+from metrics import observe_stage, stage_timer
+
+# Maximum number of memoized requirement analyses (0 disables the cache)
+ANALYSIS_CACHE_SIZE = int(os.environ.get('SRS_ANALYSIS_CACHE_SIZE', 10000))
+
+# Category codes stored by RequirementTable
+CATEGORIES = ("Functional Requirement", "Non-Functional Requirement", "Unclassified")
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+
+
+class RequirementAnalysis:
+    """
+    Result of analyzing one requirement statement.
+
+    Attributes:
+        text (str): The original requirement text
+        ambiguities (tuple): (word, start, end) for every ambiguous term
+            occurrence, ordered by position. Offsets index the lowercased
+            text, which matches the original for ASCII input.
+        ambiguous_words (list): Distinct ambiguous words, as returned by
+            detector.detect_ambiguity
+        category (str): Classification result
+        confidence (int): Confidence score (0-100)
+        matched_keywords (list): Keywords supporting the category
+        suggestion (str): Improved text with measurable alternatives
+        lexicon_version (str): Version ID of the lexicon used
+    """
+
+    __slots__ = (
+        'text', 'ambiguities', 'ambiguous_words', 'category',
+        'confidence', 'matched_keywords', 'suggestion', 'lexicon_version',
+    )
+
+    def __init__(self, text, ambiguities, ambiguous_words, category,
+                 confidence, matched_keywords, suggestion, lexicon_version):
+        self.text = text
+        self.ambiguities = ambiguities
+        self.ambiguous_words = ambiguous_words
+        self.category = category
+        self.confidence = confidence
+        self.matched_keywords = matched_keywords
+        self.suggestion = suggestion
+        self.lexicon_version = lexicon_version
+
+    def __repr__(self):
+        return (f"RequirementAnalysis(category={self.category!r}, "
+                f"confidence={self.confidence}, ambiguous={self.ambiguous_words!r})")
+
+    def to_dict(self):
+        """
+        Returns the requirement record stored in chat sessions.
+
+        Returns:
+            dict: original, ambiguous, category, confidence, suggested and lexicon_version
+        """
+        return {
+            'original': self.text,
+            'ambiguous': list(self.ambiguous_words),
+            'category': self.category,
+            'confidence': self.confidence,
+            'suggested': self.suggestion,
+            'lexicon_version': self.lexicon_version,
+        }
+
+    def row(self):
+        """
+        Returns the fields RequirementTable.build() stores.
+
+        Returns:
+            tuple: (text, hits, category, confidence, lexicon_version, suggestion)
+        """
+        return (self.text, self.ambiguities, self.category, self.confidence,
+                self.lexicon_version, self.suggestion)
+
+
+class RequirementTable:
+    """
+    Analyzed requirements of one document, stored column by column.
+
+    Chat sessions keep this instead of one record dict per requirement.
+    Requirement texts are (start, end) spans of one shared document
+    string; categories, confidences and lexicon versions are one-byte
+    codes; ambiguity hits are (term ID, start, end) triples into a term
+    list shared by all rows, ordered like the lexicon. Suggestions are
+    spans of a second string, holding only those that differ from their
+    requirement. Rows are turned into dicts only where they leave the
+    process, by record().
+
+    Tables are immutable, so a PDF job can share the session's table
+    instead of copying it.
+
+    Attributes:
+        document (str): Requirement texts joined by newlines
+        spans (array): start, end offsets into document, two per row
+        categories (array): Index into CATEGORIES per row
+        confidences (array): Confidence score (0-100) per row
+        terms (tuple): Interned ambiguous terms referenced by hits
+        hits (array): term ID, start, end per hit, offsets into the
+            lowercased row text
+        hit_bounds (array): Row i owns hits hit_bounds[i] to hit_bounds[i + 1]
+        versions (tuple): Lexicon version IDs referenced by version_codes
+        version_codes (array): Index into versions per row
+        suggested (str): Suggestions that differ from their requirement,
+            joined by newlines
+        suggestion_spans (array): start, end offsets into suggested, two
+            per row; an empty span means the requirement is unchanged
+    """
+
+    __slots__ = (
+        'document', 'spans', 'categories', 'confidences', 'terms',
+        'hits', 'hit_bounds', 'versions', 'version_codes', 'suggested', 'suggestion_spans',
+    )
+
+    def __init__(self, document='', spans=(), categories=(), confidences=(), terms=(),
+                 hits=(), hit_bounds=(0,), versions=(), version_codes=(),
+                 suggested='', suggestion_spans=()):
+        self.document = document
+        self.spans = array('I', spans)
+        self.categories = array('B', categories)
+        self.confidences = array('B', confidences)
+        self.terms = tuple(sys.intern(term) for term in terms)
+        self.hits = array('I', hits)
+        self.hit_bounds = array('I', hit_bounds)
+        self.versions = tuple(versions)
+        self.version_codes = array('B', version_codes)
+        self.suggested = suggested
+        self.suggestion_spans = array('I', suggestion_spans)
+
+    @classmethod
+    def build(cls, rows, lexicon=None):
+        """
+        Packs analyzed requirements into a table.
+
+        Args:
+            rows: Iterable of (text, hits, category, confidence,
+                lexicon_version, suggestion), as returned by
+                RequirementAnalysis.row() and RequirementTable.row()
+            lexicon (Lexicon): Lexicon whose term order the term IDs follow
+                (default: the active one)
+
+        Returns:
+            RequirementTable: The packed rows
+        """
+        rows = list(rows)
+        word_rank = (lexicon or current_lexicon()).word_rank
+
+        # Term IDs in lexicon order, so a row's distinct IDs sorted are its
+        # ambiguous words in the order detector.ambiguous_terms gives them
+        terms = list(dict.fromkeys(word for row in rows for word, _, _ in row[1]))
+        terms.sort(key=lambda word: word_rank.get(word, len(word_rank)))
+        term_ids = {word: term_id for term_id, word in enumerate(terms)}
+        versions = list(dict.fromkeys(row[4] for row in rows))
+        version_ids = {version: code for code, version in enumerate(versions)}
+
+        table = cls(terms=terms, versions=versions)
+        texts = []
+        suggestions = []
+        position = 0
+        suggested_position = 0
+        for text, hits, category, confidence, lexicon_version, suggestion in rows:
+            texts.append(text)
+            table.spans.append(position)
+            table.spans.append(position + len(text))
+            position += len(text) + 1
+            if suggestion == text:
+                table.suggestion_spans.extend((0, 0))
+            else:
+                suggestions.append(suggestion)
+                table.suggestion_spans.append(suggested_position)
+                table.suggestion_spans.append(suggested_position + len(suggestion))
+                suggested_position += len(suggestion) + 1
+            table.categories.append(CATEGORY_CODES[category])
+            table.confidences.append(confidence)
+            table.version_codes.append(version_ids[lexicon_version])
+            for word, start, end in hits:
+                table.hits.extend((term_ids[word], start, end))
+            table.hit_bounds.append(len(table.hits) // 3)
+        table.document = '\n'.join(texts)
+        table.suggested = '\n'.join(suggestions)
+        return table
+
+    @classmethod
+    def load(cls, value):
+        """
+        Returns the table stored in a session field.
+
+        Args:
+            value: A RequirementTable, its to_json() form as decoded by the
+                SQLite session store, or None. Record dict lists and
+                tables without suggestions, saved by older versions, are
+                analyzed again.
+
+        Returns:
+            RequirementTable: The table (empty for None)
+        """
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            table = cls(**value)
+            if 'suggestion_spans' in value:
+                return table
+            return cls.build(analyze_requirement(table.text(index)).row() for index in range(len(table)))
+        return cls.build(analyze_requirement(record['original']).row() for record in value or ())
+
+    def to_json(self):
+        """
+        Returns the table as JSON-serializable columns, for load().
+
+        Returns:
+            dict: One entry per attribute; arrays become lists
+        """
+        return {
+            'document': self.document,
+            'spans': self.spans.tolist(),
+            'categories': self.categories.tolist(),
+            'confidences': self.confidences.tolist(),
+            'terms': list(self.terms),
+            'hits': self.hits.tolist(),
+            'hit_bounds': self.hit_bounds.tolist(),
+            'versions': list(self.versions),
+            'version_codes': self.version_codes.tolist(),
+            'suggested': self.suggested,
+            'suggestion_spans': self.suggestion_spans.tolist(),
+        }
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __repr__(self):
+        return f"RequirementTable({len(self)} requirements, {len(self.hits) // 3} ambiguities)"
+
+    def text(self, index):
+        """Returns the text of requirement index."""
+        return self.document[self.spans[2 * index]:self.spans[2 * index + 1]]
+
+    def category(self, index):
+        """Returns the category of requirement index."""
+        return CATEGORIES[self.categories[index]]
+
+    def confidence(self, index):
+        """Returns the confidence score of requirement index."""
+        return self.confidences[index]
+
+    def lexicon_version(self, index):
+        """Returns the version ID of the lexicon requirement index was analyzed with."""
+        return self.versions[self.version_codes[index]]
+
+    def suggestion(self, index):
+        """Returns the suggested improvement of requirement index."""
+        start, end = self.suggestion_spans[2 * index], self.suggestion_spans[2 * index + 1]
+        return self.suggested[start:end] if start != end else self.text(index)
+
+    def ambiguities(self, index):
+        """Returns the (word, start, end) ambiguity hits of requirement index, ordered by position."""
+        terms = self.terms
+        found = self.hits[3 * self.hit_bounds[index]:3 * self.hit_bounds[index + 1]]
+        return [(terms[found[i]], found[i + 1], found[i + 2]) for i in range(0, len(found), 3)]
+
+    def ambiguous(self, index):
+        """Returns the distinct ambiguous words of requirement index, in lexicon order."""
+        term_ids = self.hits[3 * self.hit_bounds[index]:3 * self.hit_bounds[index + 1]:3]
+        return [self.terms[term_id] for term_id in sorted(set(term_ids))]
+
+    def row(self, index):
+        """Returns requirement index in the form build() takes."""
+        return (self.text(index), self.ambiguities(index), self.category(index),
+                self.confidence(index), self.lexicon_version(index), self.suggestion(index))
+
+    def record(self, index):
+        """
+        Materializes requirement index as a RequirementAnalysis.to_dict() record.
+
+        Args:
+            index (int): Row number
+
+        Returns:
+            dict: original, ambiguous, category, confidence, suggested and lexicon_version
+        """
+        return {
+            'original': self.text(index),
+            'ambiguous': self.ambiguous(index),
+            'category': self.category(index),
+            'confidence': self.confidence(index),
+            'suggested': self.suggestion(index),
+            'lexicon_version': self.lexicon_version(index),
+        }
+
+
+def analyze_requirement(sentence, lexicon=None):
+    """
+    Analyzes a requirement, lowercasing and scanning it only once per lexicon.
+
+    Whitespace is normalized first, as the segmenter does. Results are
+    memoized across sessions, keyed by the normalized text and the lexicon
+    fingerprint; the returned object is shared and must not be mutated.
+    Cache hits are recorded as the 'analysis_cache_hit' stage.
+
+    Args:
+        sentence (str): The requirement sentence to analyze
+        lexicon (Lexicon): Lexicon to use (default: the active one)
+
+    Returns:
+        RequirementAnalysis: Ambiguities, category, confidence, keywords and suggestion
+    """
+    lexicon = lexicon or current_lexicon()
+    sentence = normalize_whitespace(sentence)
+    if ANALYSIS_CACHE_SIZE <= 0:
+        return _analyze(sentence, lexicon)
+
+    started = perf_counter()
+    _lookup.lexicon = lexicon
+    _lookup.missed = False
+    try:
+        analysis = _cached_analysis(sentence, lexicon.fingerprint)
+    finally:
+        _lookup.lexicon = None
+    if not _lookup.missed:
+        observe_stage('analysis_cache_hit', perf_counter() - started)
+    return analysis
+
+
+def analysis_cache_stats():
+    """
+    Returns hit-rate metrics of the requirement analysis cache.
+
+    Returns:
+        dict: hits, misses, hit_rate, entries, capacity and lexicon_version
+    """
+    info = _cached_analysis.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': round(info.hits / lookups, 4) if lookups else 0.0,
+        'entries': info.currsize,
+        'capacity': ANALYSIS_CACHE_SIZE,
+        'lexicon_version': current_lexicon().version_id,
+    }
+
+
+# The lexicon of the lookup in progress on this thread. It is not part of
+# the cache key, so cached entries never keep a replaced lexicon alive.
+_lookup = threading.local()
+
+
+@lru_cache(maxsize=max(ANALYSIS_CACHE_SIZE, 0))
+def _cached_analysis(sentence, fingerprint):
+    """Memoized _analyze; results of a replaced lexicon are never reused."""
+    _lookup.missed = True
+    return _analyze(sentence, _lookup.lexicon)
+
+
+def _analyze(sentence, lexicon=None):
+    """Runs the full analysis of one requirement without caching."""
+    lexicon = lexicon or current_lexicon()
+    started = perf_counter()
+    sentence_lower = sentence.lower()
+
+    # One automaton scan serves both detection and the suggestion
+    matches = find_term_matches(sentence_lower, lexicon=lexicon)
+    hits = find_ambiguities(sentence_lower, lexicon=lexicon, matches=matches)
+    ambiguous_words = ambiguous_terms(hits, lexicon)
+    detected = perf_counter()
+
+    functional, non_functional = match_keywords(sentence_lower, lexicon)
+    category = category_from_counts(len(functional), len(non_functional))
+    confidence = confidence_from_counts(category, len(functional), len(non_functional))
+    matched_keywords = keywords_for_category(category, functional, non_functional)
+    classified = perf_counter()
+
+    if len(sentence_lower) != len(sentence):
+        matches = None  # offsets differ from the original; let it lowercase per character
+    suggestion = suggest_improvement(sentence, lexicon, matches)
+
+    observe_stage('detection', detected - started)
+    observe_stage('classification', classified - detected)
+    observe_stage('suggestion', perf_counter() - classified)
+
+    return RequirementAnalysis(
+        text=sentence,
+        ambiguities=tuple(hits),
+        ambiguous_words=ambiguous_words,
+        category=category,
+        confidence=confidence,
+        matched_keywords=matched_keywords,
+        suggestion=suggestion,
+        lexicon_version=lexicon.version_id,
+    )
+
+
+def analyze_document(text, limit=MAX_REQUIREMENTS, lexicon_fingerprint=None):
+    """
+    Splits an SRS document into requirements and analyzes each of them.
+
+    Module-level so that it can be shipped to worker processes.
+
+    Args:
+        text (str): Full SRS document text
+        limit (int): Maximum number of requirements analyzed (None for no limit)
+        lexicon_fingerprint (str): Lexicon version to analyze with; a worker
+            process holding another one reloads the lexicon file first
+
+    Returns:
+        dict: Per-document summary with one record per requirement
+    """
+    with stage_timer('segmentation'):
+        requirements = extract_requirements(text, limit)
+    lexicon = current_lexicon() if lexicon_fingerprint is None else require_lexicon(lexicon_fingerprint)
+
+    functional_count = 0
+    non_functional_count = 0
+    total_ambiguities = 0
+    ambiguous_words = {}
+    requirement_results = []
+
+    for req in requirements:
+        analysis = analyze_requirement(req, lexicon)
+
+        if analysis.category == "Functional Requirement":
+            functional_count += 1
+        elif analysis.category == "Non-Functional Requirement":
+            non_functional_count += 1
+
+        total_ambiguities += len(analysis.ambiguous_words)
+        ambiguous_words.update(dict.fromkeys(analysis.ambiguous_words))
+        requirement_results.append(analysis.to_dict())
+
+    return {
+        'requirement_count': len(requirement_results),
+        'functional_count': functional_count,
+        'non_functional_count': non_functional_count,
+        'total_ambiguities': total_ambiguities,
+        'ambiguous_words': list(ambiguous_words),
+        'requirements': requirement_results,
+        'lexicon_version': lexicon.version_id,
+    }
+
+
+if __name__ == "__main__":
+    # Test the pipeline
+    test_sentences = [
+        "The system should be fast and user-friendly.",
+        "The user can login to the system using email and password.",
+        "The application must be secure and reliable.",
+    ]
+
+    for sentence in test_sentences:
+        result = analyze_requirement(sentence)
+        print(f"\nSentence: {sentence}")
+        print(f"Ambiguities: {result.ambiguities}")
+        print(f"Category: {result.category} ({result.confidence}%)")
+        print(f"Matched keywords: {result.matched_keywords}")
+        print(f"Suggested: {result.suggestion}")
@@ -3,26 +3,197 @@ Flask Web Application for SRS Ambiguity Detection Chatbot
 Interactive clarification-based analysis
 """
 
-from flask import Flask, request, jsonify, send_from_directory, send_file, make_response
+from flask import Flask, Response, g, request, jsonify, send_from_directory, send_file, make_response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import os
+import codecs
 import uuid
 import io
-import base64
+import json
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from functools import partial
+from itertools import islice
+from time import perf_counter
 
 # Import our custom modules
-from detector import detect_ambiguity, suggest_improvement, highlight_ambiguous_words
-from classifier import classify_requirement, get_confidence_score, get_matched_keywords
-from preprocessor import preprocess_text, is_valid_requirement, normalize_whitespace
-from clarifications import get_clarification_question, apply_user_clarification
-from pdf_generator import generate_improved_srs_pdf
+from detector import highlight_ambiguous_words
+from classifier import get_matched_keywords
+from analyzer import analyze_requirement, analyze_document, analysis_cache_stats, RequirementTable
+from preprocessor import (
+    preprocess_text, is_valid_requirement, normalize_whitespace, extract_requirements, iter_requirements,
+    iter_chunked_requirements, MAX_REQUIREMENTS,
+)
+from clarifications import get_clarification_question, improve_requirements
+from pdf_generator import generate_improved_srs_pdf, render_cache
+from session_store import SessionStore, SQLiteSessionStore
+from pdf_jobs import PdfJobQueue
+from metrics import (
+    METRICS_ENABLED, REGISTRY, LATENCY_BUCKETS, SIZE_BUCKETS,
+    Histogram, Counter, CallbackMetric, stage_timer, timed_iter,
+)
+from profiler import ProfileSpool, ProfilingMiddleware
+from lexicon import current_lexicon, check_for_update, require_lexicon
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider recording every jsonify() serialization as a stage"""
+    
+    def dumps(self, obj, **kwargs):
+        with stage_timer('json_serialization'):
+            return super().dumps(obj, **kwargs)
+
 
 app = Flask(__name__, static_folder='static')
+app.json = TimedJSONProvider(app)
 CORS(app)
 
-# Store conversation sessions (in-memory for simplicity)
-conversations = {}
+# Opt-in cProfile capture of /chat, /chat/upload and /analyze/batch requests: send the
+# X-SRS-Profile header with SRS_PROFILE_TOKEN, or sample a fraction of traffic.
+# Profiles are kept in a per-user directory only its owner can access
+profiler = ProfilingMiddleware(
+    app.wsgi_app,
+    ProfileSpool(
+        os.environ.get('SRS_PROFILE_DIR') or os.path.join(
+            os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache')), 'srs-profiles'),
+        max_files=int(os.environ.get('SRS_PROFILE_MAX_FILES', 50)),
+        max_bytes=int(os.environ.get('SRS_PROFILE_MAX_BYTES', 64 * 1024 * 1024))
+    ),
+    token=os.environ.get('SRS_PROFILE_TOKEN') or None,
+    sample_rate=float(os.environ.get('SRS_PROFILE_SAMPLE_RATE', 0)),
+    paths=('/chat', '/chat/upload', '/analyze/batch')
+)
+app.wsgi_app = profiler
+
+# Store conversation sessions: in-memory (bounded by count, memory and idle
+# time) by default, or in a SQLite file shared by all workers
+SHARED_SESSIONS = os.environ.get('SRS_SESSION_BACKEND', 'memory') == 'sqlite'
+if SHARED_SESSIONS:
+    conversations = SQLiteSessionStore(
+        os.environ.get('SRS_SESSION_DB', 'sessions.db'),
+        ttl_seconds=float(os.environ.get('SRS_SESSION_TTL', 3600))
+    )
+else:
+    conversations = SessionStore(
+        max_sessions=int(os.environ.get('SRS_MAX_SESSIONS', 1000)),
+        max_bytes=int(os.environ.get('SRS_SESSION_MAX_BYTES', 256 * 1024 * 1024)),
+        ttl_seconds=float(os.environ.get('SRS_SESSION_TTL', 3600))
+    )
+
+# Background PDF rendering; disabled on serverless hosts, where work cannot
+# continue after the response is sent, and with shared sessions, where a job
+# lives in one worker's memory and the next poll may reach another worker
+pdf_jobs = PdfJobQueue(
+    workers=int(os.environ.get('SRS_PDF_WORKERS', 0 if os.environ.get('VERCEL') or SHARED_SESSIONS else 2)),
+    max_depth=int(os.environ.get('SRS_PDF_QUEUE_DEPTH', 32)),
+    timeout_seconds=float(os.environ.get('SRS_PDF_JOB_TIMEOUT', 60))
+)
+conversations.on_evict = pdf_jobs.cancel_session
+
+# Chat history keeps the newest SRS_SESSION_HISTORY messages. Longer message
+# texts (pasted documents) are cut down to a preview; the analysis keeps
+# the requirements themselves.
+SESSION_HISTORY = int(os.environ.get('SRS_SESSION_HISTORY', 50))
+HISTORY_INLINE_CHARS = int(os.environ.get('SRS_HISTORY_INLINE_CHARS', 2000))
+HISTORY_PREVIEW_CHARS = 200
+
+# Worker processes for /analyze/batch (0 or 1 analyzes on the request thread)
+BATCH_WORKERS = int(os.environ.get('SRS_BATCH_WORKERS', os.cpu_count() or 1))
+# Workers are started fresh rather than forked from this multithreaded
+# server, where a fork could copy a lock some other thread holds
+BATCH_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+BATCH_MAX_DOCUMENTS = int(os.environ.get('SRS_BATCH_MAX_DOCUMENTS', 1000))
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+# Uploaded documents are read in chunks of this size; larger uploads are refused
+UPLOAD_CHUNK_BYTES = 64 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get('SRS_MAX_UPLOAD_BYTES', 32 * 1024 * 1024))
+# No request body may be larger; the ASGI adapter stops reading beyond it
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
+
+# Per-endpoint request metrics; the process-wide figures below are read at scrape time
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'srs_request_duration_seconds', 'Time to build each response, by endpoint.',
+    LATENCY_BUCKETS, ('endpoint',)
+))
+REQUEST_BYTES = REGISTRY.register(Histogram(
+    'srs_request_size_bytes', 'Request body size, by endpoint.', SIZE_BUCKETS, ('endpoint',)
+))
+RESPONSE_BYTES = REGISTRY.register(Histogram(
+    'srs_response_size_bytes', 'Response body size, by endpoint (streamed responses excluded).',
+    SIZE_BUCKETS, ('endpoint',)
+))
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    'srs_requests_total', 'Requests served, by endpoint and status code.', ('endpoint', 'status')
+))
+REGISTRY.register(CallbackMetric(
+    'srs_active_sessions', 'Chat sessions currently stored.', 'gauge', lambda: len(conversations)
+))
+REGISTRY.register(CallbackMetric(
+    'srs_session_store_bytes', 'Size of all stored chat sessions.', 'gauge',
+    lambda: conversations.stats()['bytes']
+))
+REGISTRY.register(CallbackMetric(
+    'srs_session_evictions_total', 'Sessions dropped from the store, by reason.', 'counter',
+    lambda: conversations.stats()['evictions'], ('reason',)
+))
+REGISTRY.register(CallbackMetric(
+    'srs_pdf_jobs', 'Background PDF jobs, by state.', 'gauge',
+    lambda: {state: count for state, count in pdf_jobs.stats().items() if state in ('queued', 'running')},
+    ('state',)
+))
+REGISTRY.register(CallbackMetric(
+    'srs_analysis_cache_lookups_total', 'Requirement analysis cache lookups, by result.', 'counter',
+    lambda: {result: analysis_cache_stats()[key] for result, key in (('hit', 'hits'), ('miss', 'misses'))},
+    ('result',)
+))
+
+
+@app.before_request
+def start_request_timer():
+    """Remember when the request started, for srs_request_duration_seconds"""
+    g.request_started = perf_counter()
+
+
+@app.before_request
+def limit_request_size():
+    """Refuse bodies declared larger than MAX_CONTENT_LENGTH before any view reads them"""
+    if (request.content_length or 0) > app.config['MAX_CONTENT_LENGTH']:
+        return jsonify({
+            'error': f"Request body too large (limit {app.config['MAX_CONTENT_LENGTH']} bytes)"
+        }), 413
+
+
+@app.before_request
+def watch_lexicon():
+    """Pick up lexicon.json edits; the reload runs in the background"""
+    check_for_update()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Record duration, body sizes and status of the request"""
+    if METRICS_ENABLED and 'request_started' in g:
+        endpoint = (request.endpoint or 'unmatched',)
+        REQUEST_SECONDS.observe(perf_counter() - g.request_started, endpoint)
+        REQUEST_BYTES.observe(request.content_length or 0, endpoint)
+        if not response.is_streamed:
+            RESPONSE_BYTES.observe(response.content_length or 0, endpoint)
+        REQUESTS_TOTAL.inc((endpoint[0], str(response.status_code)))
+    return response
+
+
+@app.after_request
+def flush_sessions(response):
+    """Write back the sessions changed by this request in one batch"""
+    conversations.flush()
+    return response
 
 
 @app.route('/')
@@ -39,7 +210,8 @@ def chat():
     Expected JSON input:
     {
         "message": "The system should be fast",
-        "session_id": "optional-session-id"
+        "session_id": "optional-session-id",
+        "stream": false
     }
     
     Returns:
@@ -49,6 +221,11 @@ def chat():
         "timestamp": "...",
         "awaiting_clarification": true/false
     }
+    
+    Documents can be streamed instead: with "stream": true or an
+    Accept: application/x-ndjson header the reply is one NDJSON line per
+    requirement followed by a "done" line carrying the fields above;
+    Accept: text/event-stream sends the same events as Server-Sent Events.
     """
     try:
         data = request.get_json()
@@ -59,25 +236,12 @@ def chat():
             }), 400
         
         user_message = data['message'].strip()
-        session_id = data.get('session_id', str(uuid.uuid4()))
-        
-        # Initialize conversation if new session
-        if session_id not in conversations:
-            conversations[session_id] = {
-                'messages': [],
-                'created_at': datetime.now().isoformat(),
-                'state': 'initial',  # States: initial, awaiting_clarification, completed
-                'pending_clarifications': [],  # ambiguous words needing clarification
-                'clarifications': {},  # {ambiguous_word: user_clarification}
-                'original_document': None,
-                'requirements': [],
-                'session_id': session_id  # Store session ID
-            }
+        session_id = data.get('session_id') or str(uuid.uuid4())
         
-        session = conversations[session_id]
+        session = load_session(session_id)
         
         # Add user message to history
-        session['messages'].append({
+        append_history(session, {
             'role': 'user',
             'content': user_message,
             'timestamp': datetime.now().isoformat()
@@ -89,17 +253,86 @@ def chat():
             bot_messages = handle_clarification_response(session, user_message)
         else:
             # User is providing initial SRS document
+            stream_format = requested_stream_format(data)
+            if stream_format:
+                events = stream_bot_response(user_message, session_id, session)
+                return stream_chat_response(events, session_id, session, stream_format)
             bot_messages = generate_bot_response(user_message, session_id, session)
         
         # Add bot messages to history
-        for msg in bot_messages:
-            session['messages'].append({
-                'role': 'bot',
-                'content': msg['content'],
-                'type': msg.get('type', 'text'),
-                'data': msg.get('data'),
-                'timestamp': datetime.now().isoformat()
-            })
+        record_bot_messages(session, bot_messages)
+        conversations.put(session_id, session)
+        
+        return jsonify({
+            'bot_messages': bot_messages,
+            'session_id': session_id,
+            'timestamp': datetime.now().isoformat(),
+            'awaiting_clarification': session['state'] == 'awaiting_clarification'
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'error': f'An error occurred: {str(e)}'
+        }), 500
+
+
+@app.route('/chat/upload', methods=['POST'])
+def chat_upload():
+    """
+    Analyze an SRS document uploaded as a file
+    
+    Expected multipart/form-data input:
+        file: UTF-8 text document (.txt, .md)
+        session_id: optional session ID
+        stream: optional, "true" for a streamed reply
+    
+    Returns the same reply as /chat, streamed under the same conditions.
+    The upload is read in chunks and segmented as it is read, so memory use
+    does not grow with the document; only the requirement records are kept.
+    Like streamed /chat documents, an uploaded document is analyzed in full
+    when streamed, and up to MAX_REQUIREMENTS otherwise.
+    """
+    try:
+        if (request.content_length or 0) > MAX_UPLOAD_BYTES:
+            return jsonify({
+                'error': f'File too large (limit {MAX_UPLOAD_BYTES} bytes)'
+            }), 413
+        
+        upload = request.files.get('file')
+        if upload is None or not upload.filename:
+            return jsonify({
+                'error': 'Missing required file: file'
+            }), 400
+        
+        session_id = request.form.get('session_id') or str(uuid.uuid4())
+        session = load_session(session_id)
+        
+        # The document itself is never held whole, so only its name is recorded
+        append_history(session, {
+            'role': 'user',
+            'content': f'📎 Uploaded {upload.filename}',
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        # Flask closes request files when the view returns, before a streamed
+        # reply is generated, so the segmenter takes over the file
+        stream, upload.stream = upload.stream, io.BytesIO()
+        requirements = timed_iter('segmentation', iter_upload_requirements(stream))
+        stream_format = requested_stream_format({'stream': request.form.get('stream') in ('1', 'true')})
+        if stream_format:
+            events = stream_document_analysis(session, requirements)
+            return stream_chat_response(events, session_id, session, stream_format)
+        
+        # Only the first MAX_REQUIREMENTS are read; closing the segmenter
+        # records its time and closes the file
+        try:
+            bot_messages = collect_bot_messages(
+                stream_document_analysis(session, islice(requirements, MAX_REQUIREMENTS))
+            )
+        finally:
+            requirements.close()
+        record_bot_messages(session, bot_messages)
+        conversations.put(session_id, session)
         
         return jsonify({
             'bot_messages': bot_messages,
@@ -114,6 +347,131 @@ def chat():
         }), 500
 
 
+def load_session(session_id):
+    """
+    Get a conversation session, starting a new one if it is unknown or expired
+    
+    Args:
+        session_id: Session ID
+        
+    Returns:
+        dict: Session object
+    """
+    session = conversations.get(session_id)
+    if session is None:
+        session = {
+            'messages': [],
+            'created_at': datetime.now().isoformat(),
+            'state': 'initial',  # States: initial, awaiting_clarification, completed
+            'pending_clarifications': [],  # ambiguous words needing clarification
+            'clarifications': {},  # {ambiguous_word: user_clarification}
+            'requirements': RequirementTable(),
+            'session_id': session_id  # Store session ID
+        }
+    return session
+
+
+def iter_upload_text(stream):
+    """
+    Decode an uploaded file chunk by chunk
+    
+    Args:
+        stream: Binary file object (werkzeug spools large uploads to disk)
+        
+    Yields:
+        str: Decoded text chunks; invalid UTF-8 is replaced, a BOM is dropped
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    while True:
+        data = stream.read(UPLOAD_CHUNK_BYTES)
+        if not data:
+            break
+        yield decoder.decode(data)
+    yield decoder.decode(b'', final=True)
+
+
+def iter_upload_requirements(stream):
+    """
+    Lazily segment an uploaded document into requirements
+    
+    The file is read once and closed when the generator finishes or is
+    discarded.
+    
+    Args:
+        stream: Binary file object
+        
+    Yields:
+        str: Requirement statements, as iter_requirements would produce them
+    """
+    try:
+        yield from iter_chunked_requirements(iter_upload_text(stream))
+    finally:
+        stream.close()
+
+
+def requested_stream_format(data):
+    """
+    Work out whether the client asked for a streamed analysis
+    
+    Args:
+        data: Parsed /chat request body
+        
+    Returns:
+        str or None: 'sse', 'ndjson', or None for a regular JSON reply
+    """
+    accept = request.headers.get('Accept', '')
+    
+    if 'text/event-stream' in accept:
+        return 'sse'
+    if 'application/x-ndjson' in accept or data.get('stream'):
+        return 'ndjson'
+    return None
+
+
+def append_history(session, message):
+    """
+    Add a message to the session history, keeping the newest SESSION_HISTORY
+    
+    Message text longer than HISTORY_INLINE_CHARS is truncated to a
+    preview, with 'content_chars' recording the original length. A
+    SESSION_HISTORY of 0 or less keeps no history.
+    
+    Args:
+        session: Session object
+        message: History entry with 'role', 'content' and 'timestamp'
+    """
+    history = session['messages']
+    if SESSION_HISTORY <= 0:
+        history.clear()
+        return
+    
+    content = message['content']
+    if len(content) > HISTORY_INLINE_CHARS:
+        message['content'] = content[:HISTORY_PREVIEW_CHARS] + '…'
+        message['content_chars'] = len(content)
+    
+    history.append(message)
+    del history[:-SESSION_HISTORY]
+
+
+def record_bot_messages(session, bot_messages):
+    """
+    Add bot messages to the session history
+    
+    Args:
+        session: Session object
+        bot_messages: Messages sent back to the client
+    """
+    for msg in bot_messages:
+        append_history(session, {
+            'role': 'bot',
+            'content': msg['content'],
+            'type': msg.get('type', 'text'),
+            'data': msg.get('data'),
+            'timestamp': datetime.now().isoformat()
+        })
+
+
 def handle_clarification_response(session, user_response):
     """
     Handle user's response to a clarification question
@@ -176,32 +534,20 @@ def generate_final_improvements(session):
         'type': 'text'
     })
     
-    # Apply clarifications to each requirement
-    improved_requirements = []
-    
-    for req_data in session['requirements']:
-        improved_text = req_data['original']
-        
-        # Apply each user clarification
-        for ambiguous_word in req_data['ambiguous']:
-            if ambiguous_word in session['clarifications']:
-                user_clarification = session['clarifications'][ambiguous_word]
-                improved_text = apply_user_clarification(improved_text, ambiguous_word, user_clarification)
-        
-        improved_requirements.append({
-            'original': req_data['original'],
-            'improved': improved_text,
-            'category': req_data['category']
-        })
+    # Apply clarifications to each requirement once; the PDF reuses the results
+    requirements = session_requirements(session)
+    with stage_timer('clarification'):
+        session['improved_requirements'] = improve_requirements(requirements, session['clarifications'])
     
     # Show improved requirements
     improvement_parts = ['✨ **Your Improved Requirements:**\n']
     
-    for i, req in enumerate(improved_requirements[:10], 1):  # Show max 10
-        if req['original'] != req['improved']:
-            improvement_parts.append(f'**{i}. {req["category"]}**')
-            improvement_parts.append(f'   **Before:** {req["original"][:80]}...' if len(req['original']) > 80 else f'   **Before:** {req["original"]}')
-            improvement_parts.append(f'   **After:** {req["improved"][:100]}...\n' if len(req['improved']) > 100 else f'   **After:** {req["improved"]}\n')
+    for i, improved in enumerate(session['improved_requirements'][:10], 1):  # Show max 10
+        original = requirements.text(i - 1)
+        if original != improved:
+            improvement_parts.append(f'**{i}. {requirements.category(i - 1)}**')
+            improvement_parts.append(f'   **Before:** {original[:80]}...' if len(original) > 80 else f'   **Before:** {original}')
+            improvement_parts.append(f'   **After:** {improved[:100]}...\n' if len(improved) > 100 else f'   **After:** {improved}\n')
     
     messages.append({
         'content': '\n'.join(improvement_parts),
@@ -215,20 +561,40 @@ def generate_final_improvements(session):
             session_id = str(uuid.uuid4())
             
         pdf_filename = f"improved_srs_{str(session_id)[:8]}.pdf"
+        generated_at = datetime.now().astimezone()
             
-        pdf_bytes = generate_improved_srs_pdf(session, pdf_filename)
+        session['pdf'] = {
+            'filename': pdf_filename,
+            'generated_at': generated_at.isoformat()
+        }
         
-        # Encode to base64 for client-side download
-        pdf_base64 = base64.b64encode(pdf_bytes).decode('utf-8')
+        # Render in the background; fall back to rendering here when the
+        # job queue is full or disabled
+        job = pdf_jobs.submit(session_id, session, pdf_filename, generated_at)
         
-        messages.append({
-            'content': f'📄 **PDF Ready for Download!**\n\nYour improved SRS has been generated as a professional PDF document.',
-            'type': 'download',
-            'data': {
-                'filename': pdf_filename,
-                'pdf_base64': pdf_base64
-            }
-        })
+        if job is not None:
+            session['pdf']['job_id'] = job.id
+            messages.append({
+                'content': f'📄 **Your PDF is being generated...**\n\nThe download button will appear here as soon as it is ready.',
+                'type': 'job',
+                'data': {
+                    'filename': pdf_filename,
+                    'job_id': job.id,
+                    'status_url': f'/jobs/{job.id}'
+                }
+            })
+        else:
+            # Rendered bytes stay in the PDF render cache; the reply only
+            # carries a download URL
+            generate_improved_srs_pdf(session, pdf_filename, generated_at)
+            messages.append({
+                'content': f'📄 **PDF Ready for Download!**\n\nYour improved SRS has been generated as a professional PDF document.',
+                'type': 'download',
+                'data': {
+                    'filename': pdf_filename,
+                    'download_url': f'/download-pdf/{session_id}'
+                }
+            })
     except Exception as e:
         print(f"PDF generation error: {e}")
         messages.append({
@@ -245,17 +611,17 @@ def generate_final_improvements(session):
     return messages
 
 
-def generate_bot_response(user_message, session_id, session):
+def screen_document_message(user_message, session):
     """
-    Generate appropriate bot response based on user message
+    Handle greetings and too-short input before any analysis runs
     
     Args:
         user_message: User's input text
-        session_id: Current session ID
         session: Session object
         
     Returns:
-        list: List of bot message objects
+        list: Bot messages; empty when the text should be analyzed as an
+            SRS document
     """
     messages = []
     user_lower = user_message.lower()
@@ -270,71 +636,77 @@ def generate_bot_response(user_message, session_id, session):
         session['state'] = 'initial'
         return messages
     
-    # Otherwise, treat as SRS document for analysis
-    text = normalize_whitespace(user_message)
-    
-    # Validate minimum length
-    if len(text) < 20:
+    # Otherwise, treat as SRS document for analysis; validate minimum length
+    if len(normalize_whitespace(user_message)) < 20:
         messages.append({
             'content': '⚠️ **Too short!** Please provide a complete SRS document or at least one full requirement statement (minimum 20 characters).',
             'type': 'text'
         })
-        return messages
     
-    # Split into individual requirements
-    requirements = extract_requirements(text)
+    return messages
+
+
+def no_requirements_message():
+    """Bot message for documents without any usable requirement"""
+    return {
+        'content': '⚠️ **No valid requirements found.** Please provide clear requirement statements.',
+        'type': 'text'
+    }
+
+
+def summarize_document_analysis(session, requirements, reused_count=0):
+    """
+    Store analyzed requirements in the session and build the summary messages
     
-    if not requirements:
-        messages.append({
-            'content': '⚠️ **No valid requirements found.** Please provide clear requirement statements.',
-            'type': 'text'
-        })
-        return messages
+    Clarifications given for an earlier version of the document are kept
+    for terms that still occur, and only new terms are asked about.
     
-    # Analyze all requirements
-    total_requirements = len(requirements)
+    Args:
+        session: Session object
+        requirements: RequirementTable of the analyzed document
+        reused_count: How many records were carried over unchanged from the
+            previous submission
+        
+    Returns:
+        list: Bot messages, ending with the first clarification question if any
+    """
+    messages = []
     functional_count = 0
     non_functional_count = 0
     total_ambiguities = 0
     all_ambiguous_words = set()
-    requirement_results = []
     
-    for req in requirements:
-        # Skip very short lines
-        if len(req.strip()) < 15:
-            continue
-            
-        ambiguous_words = detect_ambiguity(req)
-        category = classify_requirement(req)
-        confidence = get_confidence_score(req, category)
-        suggested = suggest_improvement(req)
-        
+    for index in range(len(requirements)):
+        category = requirements.category(index)
         if category == "Functional Requirement":
             functional_count += 1
         elif category == "Non-Functional Requirement":
             non_functional_count += 1
         
+        ambiguous_words = requirements.ambiguous(index)
         total_ambiguities += len(ambiguous_words)
         all_ambiguous_words.update(ambiguous_words)
-        
-        requirement_results.append({
-            'original': req,
-            'ambiguous': ambiguous_words,
-            'category': category,
-            'confidence': confidence,
-            'suggested': suggested
-        })
     
-    # Store document and requirements in session
-    session['original_document'] = text
-    session['requirements'] = requirement_results
+    # Store requirements in session, keeping only the clarifications that
+    # still apply. The document itself is only kept in the history.
+    session.pop('original_document', None)
+    session['requirements'] = requirements
+    session['clarifications'] = {
+        word: clarification
+        for word, clarification in session['clarifications'].items()
+        if word in all_ambiguous_words
+    }
+    session.pop('pdf', None)
+    session.pop('improved_requirements', None)
     
     # Generate response
     response_parts = []
     
     # 1. Document Summary
     response_parts.append(f'📊 **Document Analysis Complete**')
-    response_parts.append(f'Analyzed **{len(requirement_results)} requirements** from your SRS document.\n')
+    response_parts.append(f'Analyzed **{len(requirements)} requirements** from your SRS document.\n')
+    if reused_count:
+        response_parts.append(f'♻️ Reused **{reused_count} unchanged requirements** from your previous version; analyzed **{len(requirements) - reused_count}** new or changed ones.\n')
     
     # 2. Classification Summary with Explanation
     response_parts.append('📋 **Classification Results:**')
@@ -351,25 +723,37 @@ def generate_bot_response(user_message, session_id, session):
     
     # 3. Handle ambiguities with interactive clarification
     if total_ambiguities > 0:
+        # Terms clarified for a previous version are not asked again
+        new_words = [word for word in all_ambiguous_words if word not in session['clarifications']]
+        
         # Notify about ambiguities
         top_ambiguous = list(all_ambiguous_words)[:8]
         ambiguous_list = ', '.join([f'"{w}"' for w in top_ambiguous])
+        if new_words:
+            follow_up = '💬 **Let me clarify these with you!** I\'ll ask a few quick questions to make your requirements more specific.'
+        else:
+            follow_up = f'♻️ All of these terms were already clarified, so I\'ll reuse your {len(session["clarifications"])} earlier answers.'
         messages.append({
-            'content': f'⚠️ **Found {total_ambiguities} ambiguous terms:** {ambiguous_list}{"..." if len(all_ambiguous_words) > 8 else ""}\n\n💬 **Let me clarify these with you!** I\'ll ask a few quick questions to make your requirements more specific.',
+            'content': f'⚠️ **Found {total_ambiguities} ambiguous terms:** {ambiguous_list}{"..." if len(all_ambiguous_words) > 8 else ""}\n\n{follow_up}',
             'type': 'text'
         })
         
         # Set up clarification flow
-        session['pending_clarifications'] = list(all_ambiguous_words)[:10]  # Max 10 clarifications
-        session['state'] = 'awaiting_clarification'
+        session['pending_clarifications'] = new_words[:10]  # Max 10 clarifications
         
-        # Ask first clarification question
-        first_word = session['pending_clarifications'][0]
-        question = get_clarification_question(first_word)
-        messages.append({
-            'content': f'📝 **First ambiguous term: "{first_word}"**\n\n{question}',
-            'type': 'text'
-        })
+        if session['pending_clarifications']:
+            session['state'] = 'awaiting_clarification'
+            
+            # Ask first clarification question
+            first_word = session['pending_clarifications'][0]
+            question = get_clarification_question(first_word)
+            messages.append({
+                'content': f'📝 **First ambiguous term: "{first_word}"**\n\n{question}',
+                'type': 'text'
+            })
+        else:
+            session['state'] = 'completed'
+            messages.extend(generate_final_improvements(session))
     else:
         # No ambiguities - document is clear
         messages.append({
@@ -381,37 +765,340 @@ def generate_bot_response(user_message, session_id, session):
     return messages
 
 
-def extract_requirements(text):
+def session_requirements(session):
     """
-    Extract individual requirements from SRS document
+    The session's analyzed requirements as a RequirementTable
+    
+    The SQLite store hands back the table's JSON form, and sessions saved
+    by older versions hold record dicts; either is converted and stored back.
     
     Args:
-        text: Full SRS document text
+        session: Session object
         
     Returns:
-        list: Individual requirement statements
-    """
-    import re
-    
-    # Split by common delimiters
-    # Try numbered lists first (1., 2., etc or 1), 2), etc)
-    numbered_pattern = r'\d+[\.)]\s+'
-    if re.search(numbered_pattern, text):
-        requirements = re.split(numbered_pattern, text)
-        requirements = [r.strip() for r in requirements if r.strip()]
-    # Try bullet points
-    elif '•' in text or '*' in text or '-' in text[:50]:
-        requirements = re.split(r'[•\*\-]\s+', text)
-        requirements = [r.strip() for r in requirements if r.strip()]
-    # Split by sentences
+        RequirementTable: Requirements of the latest submitted document
+    """
+    requirements = RequirementTable.load(session.get('requirements'))
+    session['requirements'] = requirements
+    return requirements
+
+
+def previous_requirement_rows(session):
+    """
+    Index the requirements of the session's previous submission by text
+    
+    Requirements analyzed with another lexicon version are left out, so
+    they are analyzed again.
+    
+    Args:
+        session: Session object
+        
+    Returns:
+        tuple: (RequirementTable, {requirement text: row index})
+    """
+    requirements = session_requirements(session)
+    lexicon_version = current_lexicon().version_id
+    return requirements, {
+        requirements.text(index): index
+        for index in range(len(requirements))
+        if requirements.lexicon_version(index) == lexicon_version
+    }
+
+
+def generate_bot_response(user_message, session_id, session):
+    """
+    Generate appropriate bot response based on user message
+    
+    Args:
+        user_message: User's input text
+        session_id: Current session ID
+        session: Session object
+        
+    Returns:
+        list: List of bot message objects
+    """
+    messages = screen_document_message(user_message, session)
+    if messages:
+        return messages
+    
+    # Split into individual requirements; line breaks delimit list items
+    with stage_timer('segmentation'):
+        requirements = extract_requirements(user_message)
+    
+    return collect_bot_messages(stream_document_analysis(session, requirements))
+
+
+def stream_bot_response(user_message, session_id, session):
+    """
+    Streaming variant of generate_bot_response
+    
+    Requirements are analyzed as the segmenter produces them, without the
+    MAX_REQUIREMENTS cap, and each result is yielded straight away. The
+    summary and clarification messages follow once the document is done.
+    
+    Args:
+        user_message: User's input text
+        session_id: Current session ID
+        session: Session object
+        
+    Yields:
+        tuple: ('requirement', payload) per requirement, then ('messages', bot messages)
+    """
+    messages = screen_document_message(user_message, session)
+    if messages:
+        yield 'messages', messages
+        return
+    
+    requirements = timed_iter('segmentation', iter_requirements(user_message))
+    yield from stream_document_analysis(session, requirements)
+
+
+def stream_document_analysis(session, requirements):
+    """
+    Analyze requirements as they arrive, then summarize the document
+    
+    Requirements unchanged since the session's last submission are reused.
+    
+    Args:
+        session: Session object
+        requirements: Iterable of requirement statements
+        
+    Yields:
+        tuple: ('requirement', payload) per requirement, then ('messages', bot messages)
+    """
+    previous, previous_rows = previous_requirement_rows(session)
+    rows = []
+    reused_count = 0
+    
+    for req in requirements:
+        index = previous_rows.get(req)
+        if index is None:
+            analysis = analyze_requirement(req)
+            rows.append(analysis.row())
+            record = analysis.to_dict()
+        else:
+            rows.append(previous.row(index))
+            record = previous.record(index)
+            reused_count += 1
+        yield 'requirement', {'index': len(rows), 'requirement': record}
+    
+    if rows:
+        messages = summarize_document_analysis(session, RequirementTable.build(rows), reused_count)
     else:
-        requirements = re.split(r'[.!?]+', text)
-        requirements = [r.strip() for r in requirements if r.strip() and len(r.strip()) > 15]
+        messages = [no_requirements_message()]
+    
+    yield 'messages', messages
+
+
+def collect_bot_messages(events):
+    """
+    Run an analysis event stream to the end
+    
+    Args:
+        events: Events from stream_document_analysis or stream_bot_response
+        
+    Returns:
+        list: The final bot messages
+    """
+    for event, payload in events:
+        if event == 'messages':
+            return payload
+
+
+def format_stream_event(event, payload, stream_format):
+    """
+    Encode one streaming event as an NDJSON line or a Server-Sent Event
+    
+    Args:
+        event: Event name ('requirement', 'done' or 'error')
+        payload: JSON-serializable dict
+        stream_format: 'ndjson' or 'sse'
+        
+    Returns:
+        str: Encoded event
+    """
+    with stage_timer('json_serialization'):
+        if stream_format == 'sse':
+            return f'event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n'
+        return json.dumps({'event': event, **payload}, ensure_ascii=False) + '\n'
+
+
+def stream_chat_response(events, session_id, session, stream_format):
+    """
+    Build the streaming HTTP response for a document submitted to /chat or /chat/upload
+    
+    Args:
+        events: Events from stream_bot_response or stream_document_analysis
+        session_id: Current session ID
+        session: Session object
+        stream_format: 'ndjson' or 'sse'
+        
+    Returns:
+        Response: Streaming response, one event per requirement then 'done'
+    """
+    def generate():
+        try:
+            for event, payload in events:
+                if event == 'requirement':
+                    yield format_stream_event(event, payload, stream_format)
+                else:
+                    record_bot_messages(session, payload)
+                    conversations.put(session_id, session)
+                    conversations.flush()
+                    yield format_stream_event('done', {
+                        'bot_messages': payload,
+                        'session_id': session_id,
+                        'timestamp': datetime.now().isoformat(),
+                        'awaiting_clarification': session['state'] == 'awaiting_clarification'
+                    }, stream_format)
+        except Exception as e:
+            yield format_stream_event('error', {'error': f'An error occurred: {str(e)}'}, stream_format)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+def get_batch_executor():
+    """
+    Get the process pool used for batch analysis, creating it on first use
+    
+    Workers import the analysis modules themselves and start on the
+    active lexicon version.
+    
+    Returns:
+        ProcessPoolExecutor or None when batch analysis runs in-process
+    """
+    global _batch_executor
+    
+    if BATCH_WORKERS <= 1:
+        return None
+    
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ProcessPoolExecutor(
+                max_workers=BATCH_WORKERS,
+                mp_context=multiprocessing.get_context(BATCH_START_METHOD),
+                initializer=require_lexicon,
+                initargs=(current_lexicon().fingerprint,)
+            )
+    
+    return _batch_executor
+
+
+def discard_batch_executor(executor):
+    """
+    Shut down a broken batch pool so that the next call creates a new one
+    
+    Args:
+        executor (ProcessPoolExecutor): The pool that failed
+    """
+    global _batch_executor
+    
+    with _batch_executor_lock:
+        if _batch_executor is executor:
+            _batch_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(texts):
+    """
+    Analyze documents on the batch pool, replacing the pool if a worker died
+    
+    A broken pool is retried once on a new pool; if that one breaks too,
+    the documents are analyzed in-process.
     
-    # Filter out very short segments
-    requirements = [r for r in requirements if len(r) > 15]
+    Args:
+        texts (list): Document texts
     
-    return requirements[:50]  # Limit to 50 requirements to avoid overwhelming
+    Returns:
+        list: analyze_document() results, in input order
+    """
+    # Several documents per task keeps inter-process overhead low
+    chunksize = max(1, len(texts) // (BATCH_WORKERS * 4))
+    # Workers keep the lexicon they started with until told otherwise
+    analyze = partial(analyze_document, lexicon_fingerprint=current_lexicon().fingerprint)
+    for _ in range(2):
+        executor = get_batch_executor()
+        if executor is None:
+            break
+        try:
+            return list(executor.map(analyze, texts, chunksize=chunksize))
+        except BrokenProcessPool as e:
+            print(f"Batch process pool broke, replacing it: {e}")
+            discard_batch_executor(executor)
+    return [analyze_document(text) for text in texts]
+
+
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Batch endpoint analyzing many SRS documents in one call
+    
+    Expected JSON input:
+    {
+        "documents": [
+            "1. The system should be fast...",
+            {"id": "billing-srs", "text": "1. Users can pay..."}
+        ]
+    }
+    
+    Returns:
+    {
+        "results": [{"id": ..., "requirement_count": ..., "requirements": [...]}, ...],
+        "document_count": 2,
+        "timestamp": "..."
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('documents'), list) or not data['documents']:
+            return jsonify({
+                'error': 'Missing required field: documents'
+            }), 400
+        
+        documents = data['documents']
+        if len(documents) > BATCH_MAX_DOCUMENTS:
+            return jsonify({
+                'error': f'Too many documents: maximum is {BATCH_MAX_DOCUMENTS} per request'
+            }), 400
+        
+        document_ids = []
+        texts = []
+        for index, document in enumerate(documents):
+            if isinstance(document, str):
+                document_ids.append(index)
+                texts.append(document)
+            elif isinstance(document, dict) and isinstance(document.get('text'), str):
+                document_ids.append(document.get('id', index))
+                texts.append(document['text'])
+            else:
+                return jsonify({
+                    'error': f'Document {index} must be a string or an object with a "text" field'
+                }), 400
+        
+        # Profiled requests stay in-process so the profile covers the analysis
+        if BATCH_WORKERS <= 1 or len(texts) == 1 or request.environ.get('srs.profiling'):
+            results = [analyze_document(text) for text in texts]
+        else:
+            results = run_batch(texts)
+        
+        return jsonify({
+            'results': [
+                {'id': document_id, **result}
+                for document_id, result in zip(document_ids, results)
+            ],
+            'document_count': len(results),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'error': f'An error occurred: {str(e)}'
+        }), 500
 
 
 @app.route('/welcome', methods=['GET'])
@@ -439,8 +1126,79 @@ def welcome():
 
 @app.route('/download-pdf/<session_id>', methods=['GET'])
 def download_pdf(session_id):
-    """Deprecated: Download handled client-side via Base64"""
-    return jsonify({'error': 'Please use the client-side download button'}), 410
+    """Download the improved SRS PDF generated for a session"""
+    session = conversations.get(session_id)
+    pdf_info = session.get('pdf') if session is not None else None
+    
+    if not pdf_info:
+        return jsonify({
+            'error': 'No PDF available for this session'
+        }), 404
+    
+    # Normally a render cache hit; otherwise rendering is deterministic for
+    # a fixed timestamp, so another worker reproduces the same bytes
+    generated_at = datetime.fromisoformat(pdf_info['generated_at'])
+    pdf_bytes = generate_improved_srs_pdf(session, pdf_info['filename'], generated_at)
+    
+    return send_pdf(pdf_bytes, pdf_info['filename'])
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Status of a background PDF rendering job
+    
+    Returns:
+    {
+        "job_id": "...",
+        "state": "queued" | "running" | "done" | "failed" | "cancelled",
+        "filename": "...",
+        "download_url": "/jobs/<job_id>/download"  (once done)
+    }
+    """
+    job = pdf_jobs.get(job_id)
+    
+    if job is None:
+        return jsonify({
+            'error': 'Unknown or expired job'
+        }), 404
+    
+    status = job.to_dict()
+    if job.state == 'done':
+        status['download_url'] = f'/jobs/{job_id}/download'
+    
+    return jsonify(status), 200
+
+
+@app.route('/jobs/<job_id>/download', methods=['GET'])
+def job_download(job_id):
+    """Download the PDF rendered by a finished job"""
+    job = pdf_jobs.get(job_id)
+    
+    if job is None or job.state != 'done':
+        return jsonify({
+            'error': 'PDF is not ready'
+        }), 404
+    
+    return send_pdf(job.render(), job.filename)
+
+
+def send_pdf(pdf_bytes, filename):
+    """
+    Send PDF bytes as a download
+    
+    Sends Content-Length and an ETag, and honours If-None-Match, Range and
+    If-Range so that interrupted downloads can resume.
+    """
+    return send_file(
+        io.BytesIO(pdf_bytes),
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=filename,
+        conditional=True,
+        etag=hashlib.sha256(pdf_bytes).hexdigest(),
+        max_age=0
+    )
 
 
 @app.route('/health', methods=['GET'])
@@ -449,10 +1207,116 @@ def health():
     return jsonify({
         'status': 'healthy',
         'message': 'SRS Ambiguity Detection Chatbot is running',
-        'active_sessions': len(conversations)
+        'active_sessions': len(conversations),
+        'session_store': conversations.stats(),
+        'pdf_cache': render_cache.stats(),
+        'pdf_jobs': pdf_jobs.stats(),
+        'analysis_cache': analysis_cache_stats()
     }), 200
 
 
+@app.route('/profiles', methods=['GET'])
+def list_profiles():
+    """
+    List recent request profiles (operator only: X-SRS-Profile header)
+    
+    Returns:
+    {
+        "profiles": [{"id": ..., "path": "/chat", "duration_seconds": ...,
+                      "stages": {"detection": {"count": ..., "seconds": ...}}, ...}],
+        "download_url_template": "/profiles/<id>"
+    }
+    """
+    if not profiler.is_operator(request.environ):
+        return jsonify({
+            'error': 'Endpoint not found'
+        }), 404
+    
+    return jsonify({
+        'profiles': profiler.spool.list(),
+        'download_url_template': '/profiles/<id>'
+    }), 200
+
+
+@app.route('/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """
+    Download one profile (operator only)
+    
+    Returns the raw pstats file, or with ?format=json its metadata
+    including the top functions by cumulative time.
+    """
+    if not profiler.is_operator(request.environ):
+        return jsonify({
+            'error': 'Endpoint not found'
+        }), 404
+    
+    if request.args.get('format') == 'json':
+        metadata = profiler.spool.metadata(profile_id)
+        if metadata is None:
+            return jsonify({
+                'error': 'Unknown or expired profile'
+            }), 404
+        return jsonify(metadata), 200
+    
+    path = profiler.spool.profile_path(profile_id)
+    if path is None:
+        return jsonify({
+            'error': 'Unknown or expired profile'
+        }), 404
+    
+    return send_file(
+        path,
+        mimetype='application/octet-stream',
+        as_attachment=True,
+        download_name=f'{profile_id}.prof'
+    )
+
+
+@app.route('/sessions', methods=['GET'])
+def session_usage():
+    """
+    Largest chat sessions by size, with a per-field breakdown (operator only)
+    
+    Query: ?limit=20
+    
+    Returns:
+    {
+        "sessions": [{"session_id": ..., "bytes": ..., "idle_seconds": ...,
+                      "fields": {"messages": ..., "requirements": ...}}],
+        "session_store": {...}
+    }
+    """
+    if not profiler.is_operator(request.environ):
+        return jsonify({
+            'error': 'Endpoint not found'
+        }), 404
+    
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        'sessions': conversations.usage(max(1, min(limit, 1000))),
+        'session_store': conversations.stats()
+    }), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint
+    
+    Stage latency histograms (segmentation, detection, classification,
+    suggestion, clarification, pdf_render, json_serialization), request
+    durations and body sizes per endpoint, and session/job/cache figures.
+    Each worker process reports its own figures.
+    """
+    if not METRICS_ENABLED:
+        return jsonify({
+            'error': 'Metrics are disabled'
+        }), 404
+    
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
 @app.errorhandler(404)
 def not_found(e):
     """Handle 404 errors"""
@@ -481,6 +1345,7 @@ if __name__ == '__main__':
     print("API Endpoint: POST /chat")
     print("Welcome: GET /welcome")
     print("Features: Interactive Clarification Questions")
+    print("Development server; for production run: python serve.py")
     print("=" * 60)
     
     app.run(debug=True, host='127.0.0.1', port=5000)
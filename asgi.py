@@ -0,0 +1,281 @@
+"""
+ASGI Serving Mode
+Serves the Flask app from an asyncio event loop, with request handling on bounded thread pools
+
+Usage:
+    pip install uvicorn
+    python asgi.py --port 5000
+    uvicorn asgi:app --port 5000
+
+Every route of app.py is served unchanged. The event loop reads request
+bodies and writes responses, so slow clients cost a coroutine rather than
+a thread. The Flask views run on two bounded thread pools: analysis and
+PDF routes on SRS_ASGI_CPU_WORKERS threads (default: CPU count), and all
+other routes on SRS_ASGI_IO_WORKERS threads (default 8), so that /health,
+/welcome and job polling stay responsive while documents are analyzed.
+Streamed replies are produced one event at a time on the pool and sent
+from the loop. Request bodies larger than the Flask app's
+MAX_CONTENT_LENGTH are answered with 413 as soon as the declared length
+or the bytes received exceed it.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app as flask_app, conversations
+
+# Threads running analysis and PDF routes; more than the CPU count only adds GIL contention
+CPU_WORKERS = int(os.environ.get('SRS_ASGI_CPU_WORKERS', os.cpu_count() or 1))
+
+# Threads running every other route
+IO_WORKERS = int(os.environ.get('SRS_ASGI_IO_WORKERS', 8))
+
+# Routes whose requests segment, analyze or render
+CPU_PATHS = ('/chat', '/chat/upload', '/analyze/batch')
+CPU_PATH_PREFIXES = ('/download-pdf/',)
+
+# Request bodies up to this size are buffered in memory, larger ones on disk
+BODY_SPOOL_BYTES = 1024 * 1024
+
+
+class BodyTooLarge(Exception):
+    """Raised when a request body exceeds the adapter's limit."""
+
+
+class AsgiAdapter:
+    """
+    ASGI application running a WSGI app on bounded thread pools.
+
+    The request body is read on the event loop before the WSGI app is
+    called, and each response chunk is pulled from the WSGI iterable on
+    the pool and sent from the loop. All calls for one request run in the
+    same contextvars context, because Flask keeps its request context
+    there and a streamed response resumes on whichever thread is free.
+    """
+
+    def __init__(self, wsgi_app, cpu_workers=CPU_WORKERS, io_workers=IO_WORKERS,
+                 cpu_paths=CPU_PATHS, cpu_path_prefixes=CPU_PATH_PREFIXES, on_shutdown=None,
+                 max_body_bytes=None):
+        self.wsgi_app = wsgi_app
+        # None reads bodies of any size
+        self.max_body_bytes = max_body_bytes
+        self.cpu_paths = frozenset(cpu_paths)
+        self.cpu_path_prefixes = tuple(cpu_path_prefixes)
+        self.on_shutdown = on_shutdown
+        self.cpu_executor = ThreadPoolExecutor(max_workers=max(1, cpu_workers), thread_name_prefix='asgi-cpu')
+        self.io_executor = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix='asgi-io')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        try:
+            body = await self._read_body(scope, receive)
+        except BodyTooLarge:
+            await send_error(send, 413, f'Request body too large (limit {self.max_body_bytes} bytes)')
+            return
+        if body is None:
+            return  # client went away before sending the whole request
+        try:
+            await self._respond(scope, body, send)
+        finally:
+            body.close()
+
+    def is_cpu_bound(self, path):
+        """
+        Tells whether a request path is served on the CPU pool.
+
+        Args:
+            path (str): Request path
+
+        Returns:
+            bool: True for analysis and PDF routes
+        """
+        return path in self.cpu_paths or path.startswith(self.cpu_path_prefixes)
+
+    def shutdown(self):
+        """Waits for running requests, then runs the on_shutdown hook."""
+        self.cpu_executor.shutdown(wait=True)
+        self.io_executor.shutdown(wait=True)
+        if self.on_shutdown is not None:
+            self.on_shutdown()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, scope, receive):
+        """Spools the request body; None if the client disconnected. Raises BodyTooLarge."""
+        limit = self.max_body_bytes
+        if limit is not None:
+            declared = dict(scope.get('headers', ())).get(b'content-length', b'')
+            if declared.isdigit() and int(declared) > limit:
+                raise BodyTooLarge()
+
+        body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_BYTES)
+        received = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if limit is not None and received > limit:
+                body.close()
+                raise BodyTooLarge()
+            body.write(chunk)
+            if not message.get('more_body'):
+                break
+        body.seek(0)
+        return body
+
+    async def _respond(self, scope, body, send):
+        loop = asyncio.get_running_loop()
+        executor = self.cpu_executor if self.is_cpu_bound(scope['path']) else self.io_executor
+        context = contextvars.copy_context()
+
+        def run(func, *args):
+            return loop.run_in_executor(executor, context.run, func, *args)
+
+        response = {}
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return written.append
+
+        try:
+            chunks = await run(self.wsgi_app, wsgi_environ(scope, body), start_response)
+        except Exception as e:
+            print(f"ASGI request error: {e}")
+            await send_error(send, 500, 'Internal server error')
+            return
+
+        iterator = iter(chunks)
+        try:
+            while True:
+                # start_response may be deferred until the first chunk exists
+                chunk = await run(next, iterator, None)
+                if not response.get('started'):
+                    response['started'] = True
+                    await send({'type': 'http.response.start', 'status': response['status'],
+                                'headers': response['headers']})
+                while written:
+                    await send({'type': 'http.response.body', 'body': written.pop(0), 'more_body': True})
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        except OSError:
+            pass  # client disconnected mid-response
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                await run(close)
+
+
+async def send_error(send, status, message):
+    """
+    Sends a JSON error response in the app's {"error": ...} format.
+
+    Args:
+        send: ASGI send callable
+        status (int): HTTP status code
+        message (str): Error message
+    """
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps({'error': message}).encode('utf-8')})
+
+
+def wsgi_environ(scope, body):
+    """
+    Builds the PEP 3333 environ of an ASGI HTTP request.
+
+    Args:
+        scope (dict): ASGI connection scope
+        body: File object holding the whole request body, at position 0
+
+    Returns:
+        dict: WSGI environ
+    """
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+        # The body is already de-chunked and complete, so it can be read to EOF
+        'wsgi.input_terminated': True,
+    }
+    for name, value in scope.get('headers', ()):
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    body.seek(0, os.SEEK_END)
+    environ['CONTENT_LENGTH'] = str(body.tell())
+    body.seek(0)
+    return environ
+
+
+app = AsgiAdapter(flask_app, on_shutdown=conversations.flush,
+                  max_body_bytes=flask_app.config['MAX_CONTENT_LENGTH'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve the chatbot as an ASGI app")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("The ASGI serving mode needs an ASGI server: pip install uvicorn")
+
+    print(f"ASGI server on http://{args.host}:{args.port} "
+          f"({CPU_WORKERS} analysis threads, {IO_WORKERS} other threads)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
@@ -0,0 +1,249 @@
+"""
+Command-Line Batch Analyzer
+Analyzes a tree of SRS files in parallel and writes one JSON line per requirement
+
+Usage:
+    python batch_analyzer.py docs/ --jobs 8 --output results.jsonl --summary
+    python batch_analyzer.py docs/ --output results.jsonl --checkpoint results.ckpt
+
+Each requirement becomes a line {"type": "requirement", "file": ..., "index": ...,
+"original": ..., "ambiguous": [...], ...}. With --summary every file is
+followed by a {"type": "file", ...} line carrying the document counts, and
+unreadable files produce {"type": "error", ...} lines. Every requirement
+is analyzed unless --max-requirements is given; files cut short by it
+are marked "truncated" in their summary line and reported on stderr.
+
+With --checkpoint, every finished file is recorded by its absolute path,
+together with the output size at that point. A rerun with the same
+arguments skips those files and truncates the output back to the last checkpoint, so no line is
+written twice. If the output is missing or shorter than the checkpoint
+says, the checkpoint is discarded and the run starts over. Files are analyzed in sorted order, with at most a few files
+per worker in flight, so memory stays flat however large the tree is.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from analyzer import analyze_document
+from preprocessor import iter_requirement_spans
+
+DEFAULT_EXTENSIONS = '.txt,.md'
+
+# Files queued per worker process; bounds memory held by pending results
+FILES_PER_WORKER = 4
+
+
+def iter_source_files(roots, extensions):
+    """
+    Walks files and directories in a stable, sorted order.
+
+    Args:
+        roots (list): Files and directories given on the command line
+        extensions (tuple): Lowercase file extensions to include
+
+    Yields:
+        tuple: (path, name reported in the output)
+    """
+    for root in roots:
+        if os.path.isfile(root):
+            yield root, root
+            continue
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.lower().endswith(extensions):
+                    path = os.path.join(directory, filename)
+                    yield path, os.path.relpath(path, root)
+
+
+def analyze_file(path, limit):
+    """
+    Reads and analyzes one SRS file. Module-level so it can run in worker processes.
+
+    Args:
+        path (str): File path
+        limit (int): Maximum number of requirements per file (None for no limit)
+
+    Returns:
+        dict: analyze_document() result plus 'truncated', whether the limit
+            left requirements out, or {'error': ...} if the file cannot be read
+    """
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except OSError as e:
+        return {'error': str(e)}
+    result = analyze_document(text, limit)
+    result['truncated'] = bool(limit) and result['requirement_count'] == limit and any(
+        True for _ in islice(iter_requirement_spans(text), limit, None)
+    )
+    return result
+
+
+def analyze_files(files, jobs, limit):
+    """
+    Analyzes files across a process pool, yielding results in input order.
+
+    Args:
+        files: Iterable of (path, name)
+        jobs (int): Worker processes (1 analyzes in this process)
+        limit (int): Maximum number of requirements per file
+
+    Yields:
+        tuple: (path, name, result)
+    """
+    if jobs <= 1:
+        for path, name in files:
+            yield path, name, analyze_file(path, limit)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for path, name in files:
+            pending.append((path, name, executor.submit(analyze_file, path, limit)))
+            if len(pending) >= jobs * FILES_PER_WORKER:
+                path, name, future = pending.popleft()
+                yield path, name, future.result()
+        while pending:
+            path, name, future = pending.popleft()
+            yield path, name, future.result()
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint file.
+
+    Args:
+        path (str): Checkpoint path
+
+    Returns:
+        tuple: (set of absolute paths of finished files, output offset to resume at or None)
+    """
+    done = set()
+    offset = None
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn line from an interrupted run
+                if 'path' not in entry:
+                    continue
+                done.add(entry['path'])
+                offset = entry.get('offset')
+    except FileNotFoundError:
+        pass
+    return done, offset
+
+
+def result_lines(name, result, summary):
+    """
+    Encodes the output lines of one analyzed file.
+
+    Args:
+        name (str): File name reported in the output
+        result (dict): analyze_file() result
+        summary (bool): Whether to add the per-file summary line
+
+    Returns:
+        list: JSON lines
+    """
+    if 'error' in result:
+        return [json.dumps({'type': 'error', 'file': name, 'error': result['error']}, ensure_ascii=False)]
+
+    lines = [
+        json.dumps({'type': 'requirement', 'file': name, 'index': index, **record}, ensure_ascii=False)
+        for index, record in enumerate(result['requirements'], 1)
+    ]
+    if summary:
+        counts = {key: value for key, value in result.items() if key != 'requirements'}
+        lines.append(json.dumps({'type': 'file', 'file': name, **counts}, ensure_ascii=False))
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze SRS files and write JSON lines")
+    parser.add_argument('paths', nargs='+', help="SRS files or directories to scan")
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--output', '-o', help="write JSON lines here instead of stdout")
+    parser.add_argument('--summary', action='store_true', help="add a summary line after each file")
+    parser.add_argument('--checkpoint', help="record progress here and resume from it")
+    parser.add_argument('--extensions', default=DEFAULT_EXTENSIONS,
+                        help=f"comma-separated file extensions (default {DEFAULT_EXTENSIONS})")
+    parser.add_argument('--max-requirements', type=int, default=0,
+                        help="requirements analyzed per file (default 0: all)")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        if not os.path.exists(path):
+            parser.error(f"no such file or directory: {path}")
+
+    extensions = tuple(ext.strip().lower() for ext in args.extensions.split(',') if ext.strip())
+    limit = args.max_requirements or None
+
+    done, offset = load_checkpoint(args.checkpoint) if args.checkpoint else (set(), None)
+    restart = offset is not None and args.output and (
+        not os.path.exists(args.output) or os.path.getsize(args.output) < offset
+    )
+    if restart:
+        print(f"{args.output} does not match {args.checkpoint}; starting over", file=sys.stderr)
+        done, offset = set(), 0
+
+    if args.output:
+        output = open(args.output, 'a+b')
+        # Drop lines written after the last checkpoint by an interrupted run
+        output.truncate(offset if offset is not None else (output.tell() if done else 0))
+        output.seek(0, os.SEEK_END)
+    else:
+        output = sys.stdout.buffer
+    checkpoint = open(args.checkpoint, 'w+b' if restart else 'a+b') if args.checkpoint else None
+    if checkpoint and checkpoint.tell():
+        # Terminate a torn last line so the next entry starts on its own line
+        checkpoint.seek(-1, os.SEEK_END)
+        if checkpoint.read(1) != b'\n':
+            checkpoint.write(b'\n')
+
+    # Keyed by absolute path: the reported names of two roots may be equal
+    files = (
+        (path, name) for path, name in iter_source_files(args.paths, extensions)
+        if os.path.abspath(path) not in done
+    )
+
+    errors = 0
+    truncated = 0
+    try:
+        for path, name, result in analyze_files(files, args.jobs, limit):
+            errors += 'error' in result
+            truncated += result.get('truncated', False)
+            lines = result_lines(name, result, args.summary)
+            output.write(('\n'.join(lines) + '\n').encode('utf-8'))
+            output.flush()
+            if checkpoint:
+                entry = {'file': name, 'path': os.path.abspath(path)}
+                if args.output:
+                    entry['offset'] = output.tell()
+                checkpoint.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+                checkpoint.flush()
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        if args.output:
+            output.close()
+
+    if truncated:
+        print(f"{truncated} file(s) had more than {limit} requirements; "
+              f"only the first {limit} were analyzed", file=sys.stderr)
+    if errors:
+        print(f"{errors} file(s) could not be read", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Benchmark for the ambiguity matcher
+Compares the Aho-Corasick matcher with the per-term substring scan
+
+Run from the repository root:
+    python benchmarks/bench_detector.py
+"""
+
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexicon import current_lexicon  # noqa: E402
+from matcher import KeywordAutomaton  # noqa: E402
+
+SENTENCE = "The system should be fast and user-friendly and store many records securely. "
+
+
+def naive_scan(lexicon, text_lower):
+    """The pre-automaton algorithm: one substring scan per lexicon entry."""
+    found = []
+    for word in lexicon:
+        if word in text_lower and word not in found:
+            found.append(word)
+    return found
+
+
+def build_lexicon(size, rng):
+    """Pads the ambiguous terms with random filler terms up to the requested size."""
+    lexicon = list(current_lexicon().ambiguous_words)
+    while len(lexicon) < size:
+        length = rng.randint(5, 12)
+        lexicon.append('zq' + ''.join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return lexicon
+
+
+def time_call(func, repeat=5):
+    """Returns the best single-call time in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    rng = random.Random(42)
+
+    print("Scaling with lexicon size (text = 20 sentences)")
+    print(f"{'terms':>8} {'naive ms':>10} {'automaton ms':>14}")
+    text = (SENTENCE * 20).lower()
+    for size in (60, 600, 6000):
+        lexicon = build_lexicon(size, rng)
+        automaton = KeywordAutomaton(lexicon)
+        naive = time_call(lambda: naive_scan(lexicon, text))
+        compiled = time_call(lambda: automaton.find_ids(text))
+        print(f"{size:>8} {naive:>10.3f} {compiled:>14.3f}")
+
+    print("\nScaling with text length (lexicon = 6000 terms)")
+    print(f"{'chars':>8} {'naive ms':>10} {'automaton ms':>14}")
+    lexicon = build_lexicon(6000, rng)
+    automaton = KeywordAutomaton(lexicon)
+    for sentences in (10, 100, 1000):
+        text = (SENTENCE * sentences).lower()
+        naive = time_call(lambda: naive_scan(lexicon, text))
+        compiled = time_call(lambda: automaton.find_ids(text))
+        print(f"{len(text):>8} {naive:>10.3f} {compiled:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark for requirement segmentation on multi-megabyte documents
+Compares the single-pass segmenter with the former three-mode regex split
+
+Run from the repository root:
+    python benchmarks/bench_segmenter.py
+    python benchmarks/bench_segmenter.py --megabytes 1,4,16 --style numbered
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_document  # noqa: E402
+from preprocessor import (  # noqa: E402
+    normalize_whitespace, iter_requirement_spans, iter_requirements, iter_chunked_requirements,
+)
+
+CHUNK_CHARS = 64 * 1024
+
+
+def legacy_split(text):
+    """The pre-segmenter algorithm: normalize, pick one delimiter globally, split."""
+    text = normalize_whitespace(text)
+    if re.search(r'\d+[\.)]\s+', text):
+        pattern = r'\d+[\.)]\s+'
+    elif '•' in text or '*' in text or '-' in text[:50]:
+        pattern = r'[•\*\-]\s+'
+    else:
+        pattern = r'[.!?]+'
+    return [segment.strip() for segment in re.split(pattern, text) if len(segment.strip()) > 15]
+
+
+def chunks_of(text):
+    for start in range(0, len(text), CHUNK_CHARS):
+        yield text[start:start + CHUNK_CHARS]
+
+
+def document_of_size(megabytes, style):
+    """Builds a synthetic document of roughly the requested size."""
+    sample = generate_document(100, style)
+    count = max(1, int(megabytes * 1024 * 1024 / len(sample) * 100))
+    return generate_document(count, style)
+
+
+def time_call(func, repeat):
+    """Returns the best single-call time in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark requirement segmentation")
+    parser.add_argument('--megabytes', default='1,4,16', help="document sizes (default 1,4,16)")
+    parser.add_argument('--style', default='mixed', help="synthetic document style (default mixed)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per measurement, best kept")
+    args = parser.parse_args(argv)
+
+    variants = {
+        'legacy': legacy_split,
+        'spans': lambda text: sum(1 for _ in iter_requirement_spans(text)),
+        'strings': lambda text: sum(1 for _ in iter_requirements(text)),
+        'chunked': lambda text: sum(1 for _ in iter_chunked_requirements(chunks_of(text))),
+    }
+
+    print(f"{'MB':>6} {'items':>9} " + ' '.join(f"{name + ' ms':>12}" for name in variants) + f" {'MB/s':>8}")
+    for megabytes in (float(size) for size in args.megabytes.split(',')):
+        text = document_of_size(megabytes, args.style)
+        items = sum(1 for _ in iter_requirement_spans(text))
+        timings = {name: time_call(lambda: func(text), args.repeat) for name, func in variants.items()}
+        throughput = len(text) / 1024 / 1024 / (timings['spans'] / 1000)
+        print(f"{len(text) / 1024 / 1024:>6.1f} {items:>9} "
+              + ' '.join(f"{timings[name]:>12.1f}" for name in variants) + f" {throughput:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
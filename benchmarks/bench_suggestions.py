@@ -0,0 +1,86 @@
+"""
+Benchmark for suggest_improvement
+Compares the automaton splice with the former per-term regex loop and the single alternation regex
+
+Run from the repository root:
+    python benchmarks/bench_suggestions.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_document  # noqa: E402
+from detector import find_term_matches, suggest_improvement  # noqa: E402
+from lexicon import current_lexicon  # noqa: E402
+from preprocessor import extract_requirements  # noqa: E402
+
+PLAIN = "The user shall be able to export the monthly report as a CSV file for auditing."
+
+
+def per_term_loop(lexicon):
+    """The original algorithm: one substring test and one regex substitution per term."""
+    ordered = sorted(lexicon.suggestions.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def suggest(sentence):
+        improved = sentence
+        for ambiguous, suggestion in ordered:
+            if ambiguous in improved.lower():
+                improved = re.compile(re.escape(ambiguous), re.IGNORECASE).sub(suggestion, improved, count=1)
+        return improved
+    return suggest
+
+
+def alternation(lexicon):
+    """The former single pass: one case-insensitive alternation with a group per term."""
+    terms = tuple(sorted(lexicon.suggestions, key=len, reverse=True))
+    pattern = re.compile('|'.join(f'({re.escape(term)})' for term in terms), re.IGNORECASE)
+
+    def suggest(sentence):
+        replaced = set()
+
+        def replace(match):
+            ambiguous = terms[match.lastindex - 1]
+            if ambiguous in replaced:
+                return match.group(0)
+            replaced.add(ambiguous)
+            return lexicon.suggestions[ambiguous]
+        return pattern.sub(replace, sentence)
+    return suggest
+
+
+def time_per_sentence(func, sentences, repeat=7):
+    """Returns the best time per sentence in microseconds."""
+    seconds = min(timeit.repeat(lambda: [func(sentence) for sentence in sentences], number=1, repeat=repeat))
+    return seconds / len(sentences) * 1e6
+
+
+def main():
+    lexicon = current_lexicon()
+    corpus = extract_requirements(generate_document(1000, 'numbered', 3))
+    ambiguous = [sentence for sentence in corpus if lexicon.ambiguity_matcher.find_ids(sentence.lower())]
+    corpora = {'plain': [PLAIN] * 1000, 'ambiguous': ambiguous, 'mixed': corpus}
+    variants = {
+        'per-term loop': per_term_loop(lexicon),
+        'alternation': alternation(lexicon),
+        'automaton': lambda sentence: suggest_improvement(sentence, lexicon),
+    }
+
+    # What the analysis pipeline pays: it reuses the matches of its detection scan
+    scans = {sentence: find_term_matches(sentence.lower(), lexicon=lexicon) for sentence in corpus + [PLAIN]}
+    variants['automaton, shared scan'] = lambda sentence: suggest_improvement(sentence, lexicon, scans[sentence])
+
+    print("Microseconds per sentence")
+    print(f"{'variant':>22}" + ''.join(f"{name:>11}" for name in corpora))
+    for name, func in variants.items():
+        timings = [time_per_sentence(func, sentences) for sentences in corpora.values()]
+        print(f"{name:>22}" + ''.join(f"{us:>11.1f}" for us in timings))
+
+
+if __name__ == "__main__":
+    main()
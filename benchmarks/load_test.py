@@ -0,0 +1,222 @@
+"""
+Load test comparing the threaded Flask server with the ASGI serving mode
+
+Starts each server in a subprocess. For every concurrency level, that many
+clients post freshly generated SRS documents to /chat for --duration
+seconds, while a probe polls /health and --slow-clients connections
+trickle request bodies that never finish. Reports /chat throughput and
+latency, /health latency under that load, and the server's peak thread
+count. The analysis cache is disabled in the servers so every request
+does the full work.
+
+Run from the repository root (the ASGI mode needs uvicorn):
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 1,8,32 --requirements 50 --slow-clients 64
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import generate_document  # noqa: E402
+
+# The Flask path as app.py runs it, minus the debugger and reloader
+SERVER_COMMANDS = {
+    'flask': lambda port: [sys.executable, '-c',
+                           f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"],
+    'asgi': lambda port: [sys.executable, 'asgi.py', '--port', str(port)],
+}
+
+PROBE_INTERVAL = 0.05
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def request(port, method, path, body=None):
+    """Sends one request on a new connection and returns (status, seconds)."""
+    started = time.perf_counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+    try:
+        connection.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+    finally:
+        connection.close()
+
+
+def start_server(name, port):
+    """Starts a server subprocess and waits until /health answers."""
+    env = dict(os.environ, SRS_ANALYSIS_CACHE_SIZE='0', SRS_LEXICON_RELOAD_INTERVAL='0')
+    process = subprocess.Popen(SERVER_COMMANDS[name](port), cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} server exited with status {process.returncode}")
+        try:
+            request(port, 'GET', '/health')
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{name} server did not start")
+
+
+def thread_count(pid):
+    """Returns the thread count of a process (Linux only, else None)."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def slow_client(port, stop):
+    """Holds a connection open, sending a request body one byte at a time."""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b'POST /chat HTTP/1.1\r\nHost: localhost\r\n'
+                         b'Content-Type: application/json\r\nContent-Length: 1000000\r\n\r\n{')
+            while not stop.wait(0.5):
+                sock.sendall(b' ')
+    except OSError:
+        pass
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_level(process, port, clients, documents, duration, slow_clients):
+    """Runs one concurrency level and returns its measurements."""
+    stop = threading.Event()
+    deadline = time.monotonic() + duration
+    chat_seconds = []
+    health_seconds = []
+    errors = [0]
+    peak_threads = [thread_count(process.pid) or 0]
+    lock = threading.Lock()
+
+    def client(index):
+        sequence = index
+        while time.monotonic() < deadline:
+            body = documents[sequence % len(documents)]
+            sequence += clients
+            try:
+                status, seconds = request(port, 'POST', '/chat', body)
+            except OSError:
+                status, seconds = None, 0
+            with lock:
+                if status == 200:
+                    chat_seconds.append(seconds)
+                else:
+                    errors[0] += 1
+
+    def probe():
+        while not stop.wait(PROBE_INTERVAL):
+            try:
+                status, seconds = request(port, 'GET', '/health')
+                if status == 200:
+                    health_seconds.append(seconds)
+            except OSError:
+                errors[0] += 1
+            peak_threads[0] = max(peak_threads[0], thread_count(process.pid) or 0)
+
+    helpers = [threading.Thread(target=slow_client, args=(port, stop)) for _ in range(slow_clients)]
+    helpers.append(threading.Thread(target=probe))
+    workers = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in helpers + workers:
+        thread.start()
+    started = time.monotonic()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - started
+    stop.set()
+    for thread in helpers:
+        thread.join()
+
+    return {
+        'clients': clients,
+        'requests': len(chat_seconds),
+        'requests_per_second': round(len(chat_seconds) / elapsed, 2),
+        'chat_p50_ms': round(percentile(chat_seconds, 0.5) * 1000, 1) if chat_seconds else None,
+        'chat_p95_ms': round(percentile(chat_seconds, 0.95) * 1000, 1) if chat_seconds else None,
+        'health_p95_ms': round(percentile(health_seconds, 0.95) * 1000, 1) if health_seconds else None,
+        'peak_threads': peak_threads[0] or None,
+        'errors': errors[0],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the Flask and ASGI serving modes under load")
+    parser.add_argument('--servers', default='flask,asgi', help="servers to test (default flask,asgi)")
+    parser.add_argument('--concurrency', default='1,4,16,64', help="concurrent clients per level")
+    parser.add_argument('--duration', type=float, default=10, help="seconds per level (default 10)")
+    parser.add_argument('--requirements', type=int, default=30, help="requirements per document (default 30)")
+    parser.add_argument('--style', default='mixed', help="synthetic document style (default mixed)")
+    parser.add_argument('--slow-clients', type=int, default=16,
+                        help="connections trickling an unfinished request body (default 16)")
+    parser.add_argument('--output', help="also write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    servers = [name.strip() for name in args.servers.split(',') if name.strip()]
+    for name in servers:
+        if name not in SERVER_COMMANDS:
+            parser.error(f"unknown server: {name}")
+    if 'asgi' in servers:
+        try:
+            import uvicorn  # noqa: F401
+        except ImportError:
+            print("uvicorn is not installed; skipping the asgi server", file=sys.stderr)
+            servers.remove('asgi')
+
+    documents = [
+        json.dumps({'message': generate_document(args.requirements, args.style, seed)})
+        for seed in range(200)
+    ]
+
+    results = []
+    print(f"{'server':>6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'health p95':>10} {'threads':>7} {'errors':>6}")
+    for name in servers:
+        port = free_port()
+        process = start_server(name, port)
+        try:
+            for clients in (int(level) for level in args.concurrency.split(',')):
+                result = {'server': name, **run_level(process, port, clients, documents,
+                                                      args.duration, args.slow_clients)}
+                results.append(result)
+                print(f"{name:>6} {clients:>7} {result['requests_per_second']:>8} "
+                      f"{result['chat_p50_ms'] or '-':>8} {result['chat_p95_ms'] or '-':>8} "
+                      f"{result['health_p95_ms'] or '-':>10} {result['peak_threads'] or '-':>7} "
+                      f"{result['errors']:>6}")
+        finally:
+            process.terminate()
+            process.wait()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark Suite
+Times every analysis stage on synthetic SRS documents and emits JSON
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 10,100,1000,10000,100000
+    python benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.2
+
+With --baseline the run exits with status 1 when any stage is slower than
+the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import STYLES, generate_document  # noqa: E402
+from preprocessor import extract_requirements, iter_requirements  # noqa: E402
+from detector import detect_ambiguity, suggest_improvement  # noqa: E402
+from classifier import classify_requirement, get_confidence_score  # noqa: E402
+from clarifications import apply_user_clarification, improve_requirements  # noqa: E402
+from analyzer import analyze_requirement, _analyze, RequirementTable  # noqa: E402
+from pdf_generator import generate_improved_srs_pdf  # noqa: E402
+
+DEFAULT_SIZES = "10,100,1000,10000"
+
+CLARIFICATION = "within 2 seconds under a load of 500 concurrent users"
+
+
+def best_time(func, repeat):
+    """Returns the fastest of `repeat` runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def stage_functions(document, requirements, records, table, session):
+    """
+    Builds one zero-argument callable per benchmarked stage.
+
+    Returns:
+        dict: stage name -> callable
+    """
+    def classify():
+        for req in requirements:
+            get_confidence_score(req, classify_requirement(req))
+
+    def clarify():
+        for record in records:
+            text = record['original']
+            for word in record['ambiguous']:
+                text = apply_user_clarification(text, word, CLARIFICATION)
+
+    clarifications = {word: CLARIFICATION for record in records for word in record['ambiguous']}
+
+    return {
+        'extract_requirements': lambda: extract_requirements(document),
+        'iter_requirements': lambda: sum(1 for _ in iter_requirements(document)),
+        'detect_ambiguity': lambda: [detect_ambiguity(req) for req in requirements],
+        'suggest_improvement': lambda: [suggest_improvement(req) for req in requirements],
+        'classify_requirement': classify,
+        'analyze_requirement_uncached': lambda: [_analyze(req) for req in requirements],
+        'analyze_requirement_cached': lambda: [analyze_requirement(req) for req in requirements],
+        'apply_user_clarification': clarify,
+        'improve_requirements': lambda: improve_requirements(table, clarifications),
+        'generate_improved_srs_pdf': lambda: generate_improved_srs_pdf(session, use_cache=False),
+    }
+
+
+def run(sizes, styles, seed, repeat, pdf_max):
+    """
+    Runs every stage for every document size and style.
+
+    Returns:
+        list: Result dicts (stage, style, size, seconds, per_item_us)
+    """
+    results = []
+
+    for size in sizes:
+        for style in styles:
+            document = generate_document(size, style, seed)
+            requirements = list(iter_requirements(document))
+            analyses = [analyze_requirement(req) for req in requirements]
+            records = [analysis.to_dict() for analysis in analyses]
+            table = RequirementTable.build(analysis.row() for analysis in analyses)
+            session = {
+                'requirements': RequirementTable.build(analysis.row() for analysis in analyses[:pdf_max]),
+                'clarifications': {
+                    word: CLARIFICATION for record in records[:pdf_max] for word in record['ambiguous']
+                },
+            }
+
+            for stage, func in stage_functions(document, requirements, records, table, session).items():
+                if stage == 'generate_improved_srs_pdf' and size > pdf_max:
+                    continue
+                items = len(session['requirements']) if stage == 'generate_improved_srs_pdf' else len(requirements)
+                seconds = best_time(func, repeat)
+                results.append({
+                    'stage': stage,
+                    'style': style,
+                    'size': size,
+                    'seconds': round(seconds, 6),
+                    'per_item_us': round(seconds / max(items, 1) * 1e6, 3),
+                })
+                print(f"{stage:<30} {style:<9} {size:>7} {seconds * 1000:>10.2f} ms", file=sys.stderr)
+
+    return results
+
+
+def git_revision():
+    """Returns the current git commit, or None outside a checkout."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance, min_seconds=0.001):
+    """
+    Compares results against a baseline run.
+
+    Stages faster than min_seconds in both runs are skipped; timer noise
+    dominates at that scale.
+
+    Returns:
+        list: Regression dicts for stages slower than baseline * (1 + tolerance)
+    """
+    previous = {(r['stage'], r['style'], r['size']): r['seconds'] for r in baseline['results']}
+    regressions = []
+
+    for result in results:
+        key = (result['stage'], result['style'], result['size'])
+        if key not in previous or previous[key] <= 0:
+            continue
+        if max(result['seconds'], previous[key]) < min_seconds:
+            continue
+        ratio = result['seconds'] / previous[key]
+        if ratio > 1 + tolerance:
+            regressions.append(dict(result, baseline_seconds=previous[key], ratio=round(ratio, 3)))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SRS analysis stages")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"comma-separated requirement counts (default {DEFAULT_SIZES})")
+    parser.add_argument('--styles', default=','.join(STYLES),
+                        help="comma-separated document styles: numbered, bulleted, prose")
+    parser.add_argument('--seed', type=int, default=1234, help="random seed for the corpus")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage; the fastest counts")
+    parser.add_argument('--pdf-max', type=int, default=1000,
+                        help="largest document rendered to PDF (default 1000)")
+    parser.add_argument('--output', help="write JSON results to this file instead of stdout")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown against the baseline (default 0.25 = 25%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help="ignore stages faster than this in both runs (default 0.001)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    styles = args.styles.split(',')
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': run(sizes, styles, args.seed, args.repeat, args.pdf_max),
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare(report['results'], json.load(f), args.tolerance, args.min_seconds)
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(encoded + '\n')
+    else:
+        print(encoded)
+
+    for regression in report.get('regressions', []):
+        print(f"REGRESSION {regression['stage']} {regression['style']} {regression['size']}: "
+              f"{regression['baseline_seconds']:.6f}s -> {regression['seconds']:.6f}s "
+              f"(x{regression['ratio']})", file=sys.stderr)
+
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Synthetic SRS Generator
+Seeded, reproducible SRS documents for benchmarking
+"""
+
+import random
+
+SUBJECTS = [
+    "The system", "The application", "The platform", "The server", "The mobile app",
+    "The admin portal", "The reporting module", "The payment service", "Users", "Administrators",
+]
+
+MODALS = ["shall", "should", "must", "will", "can"]
+
+ACTIONS = [
+    "allow users to login with email and password",
+    "display a dashboard with the latest orders",
+    "export the monthly report as a spreadsheet",
+    "send a notification email when a payment is received",
+    "store every record in the database",
+    "validate the form before it is submitted",
+    "search products by name and category",
+    "delete inactive accounts after ninety days",
+    "upload profile pictures up to ten megabytes",
+    "generate invoices for completed orders",
+    "respond to requests",
+    "encrypt personal data at rest",
+    "keep an audit log of administrator actions",
+    "synchronize settings across devices",
+]
+
+QUALIFIERS = [
+    "fast", "quickly", "user-friendly", "secure", "reliable", "efficient", "scalable",
+    "intuitive", "as soon as possible", "with good performance", "for many users",
+    "in a timely manner", "with adequate logging", "using a modern interface",
+]
+
+CLEAR_QUALIFIERS = [
+    "within 2 seconds", "for up to 500 concurrent users", "over an encrypted TLS connection",
+    "with 99 percent availability", "according to the approved design",
+]
+
+INTRO = "This document describes the software requirements for the target platform"
+
+STYLES = ("numbered", "bulleted", "prose")
+
+# Requirements per section of a "mixed" document
+MIXED_SECTION_SIZE = 8
+
+
+def generate_requirement(rng, ambiguity_rate=0.6):
+    """
+    Builds one requirement sentence without trailing punctuation.
+
+    Args:
+        rng (random.Random): Seeded random source
+        ambiguity_rate (float): Probability of adding an ambiguous qualifier
+
+    Returns:
+        str: Requirement sentence
+    """
+    qualifiers = QUALIFIERS if rng.random() < ambiguity_rate else CLEAR_QUALIFIERS
+    parts = [rng.choice(SUBJECTS), rng.choice(MODALS), rng.choice(ACTIONS), rng.choice(qualifiers)]
+    if rng.random() < 0.3:
+        parts.append("and " + rng.choice(QUALIFIERS))
+    return " ".join(parts)
+
+
+def generate_requirements(count, seed=0):
+    """
+    Builds a reproducible list of requirement sentences.
+
+    Args:
+        count (int): Number of requirements
+        seed (int): Random seed
+
+    Returns:
+        list: Requirement sentences
+    """
+    rng = random.Random(seed)
+    return [generate_requirement(rng) for _ in range(count)]
+
+
+def generate_document(count, style="numbered", seed=0):
+    """
+    Builds a reproducible SRS document.
+
+    Args:
+        count (int): Number of requirements
+        style (str): "numbered" (1. ...), "bulleted" (• ...), "prose", or
+            "mixed" (sections alternating the three, as real SRS documents do)
+        seed (int): Random seed
+
+    Returns:
+        str: Document text
+    """
+    requirements = generate_requirements(count, seed)
+
+    if style == "numbered":
+        return "\n".join(f"{i}. {req}." for i, req in enumerate(requirements, 1))
+    if style == "bulleted":
+        return "\n".join(f"• {req}." for req in requirements)
+    if style == "prose":
+        return " ".join([INTRO + "."] + [f"{req}." for req in requirements])
+    if style == "mixed":
+        sections = [INTRO + "."]
+        for number, start in enumerate(range(0, count, MIXED_SECTION_SIZE), 1):
+            section = requirements[start:start + MIXED_SECTION_SIZE]
+            kind = number % 3
+            if kind == 1:
+                lines = [f"{i}. {req}." for i, req in enumerate(section, 1)]
+            elif kind == 2:
+                lines = [f"- {req}" for req in section]
+            else:
+                lines = [" ".join(f"{req}." for req in section)]
+            sections.append(f"Section {number}\n\n" + "\n".join(lines))
+        return "\n\n".join(sections)
+    raise ValueError(f"Unknown document style: {style}")
@@ -3,69 +3,11 @@ Clarification questions for ambiguous terms
 Maps ambiguous words to specific counter-questions
 """
 
-CLARIFICATION_QUESTIONS = {
-    # Performance/Speed terms
-    "fast": "⏱️ How fast should it be? (e.g., response time in seconds)",
-    "quick": "⏱️ How quick should the response be? (e.g., within X seconds)",
-    "slow": "⏱️ What is the acceptable maximum time? (e.g., X seconds)",
-    "quickly": "⏱️ How quickly should this happen? (e.g., within X seconds)",
-    "rapid": "⏱️ How rapid should the response be? (e.g., X milliseconds)",
-    
-    # Usability terms
-    "user-friendly": "👤 What makes it user-friendly? (e.g., number of clicks, help features, UI standards)",
-    "easy": "👤 What defines 'easy'? (e.g., max number of steps, training time required)",
-    "simple": "👤 What makes it simple? (e.g., minimal UI elements, single-page design)",
-    "intuitive": "👤 What UI standards should it follow? (e.g., Material Design, iOS HIG)",
-    "clear": "👤 How should clarity be ensured? (e.g., tooltips, error messages, documentation)",
-    
-    # Security terms
-    "secure": "🔒 What security measures are required? (e.g., encryption type, authentication method)",
-    "safe": "🔒 What safety features are needed? (e.g., SSL/TLS, password hashing method)",
-    "protected": "🔒 How should data be protected? (e.g., access control method, encryption level)",
-    "encrypted": "🔒 What encryption standard? (e.g., AES-256, RSA-2048)",
-    
-    # Reliability terms
-    "reliable": "🎯 What reliability level is required? (e.g., uptime percentage, error rate)",
-    "robust": "🎯 What load should it handle? (e.g., concurrent users, requests per second)",
-    "stable": "🎯 What stability metrics? (e.g., crash rate, error frequency)",
-    
-    # Scalability terms
-    "scalable": "📈 What scale is needed? (e.g., number of users, data volume)",
-    "flexible": "📈 What flexibility features? (e.g., configurable settings, plugin support)",
-    "adaptable": "📈 What platforms should it support? (e.g., Web, iOS, Android)",
-    
-    # Quality terms
-    "good": "✨ What defines 'good' quality? (e.g., defect rate, user satisfaction %)",
-    "better": "✨ How much better? (e.g., X% faster, Y% fewer errors)",
-    "improved": "✨ What improvement metrics? (e.g., X% performance increase)",
-    "high quality": "✨ What quality standards? (e.g., ISO, defect rate threshold)",
-    "excellent": "✨ What are the excellence criteria? (e.g., benchmark scores, ratings)",
-    
-    # Size/Quantity terms
-    "large": "📏 How large? (e.g., file size in MB/GB, data volume)",
-    "small": "📏 How small? (e.g., maximum file size, memory footprint)",
-    "big": "📏 How big? (e.g., storage capacity, screen size)",
-    "many": "📏 How many? (e.g., exact number or range)",
-    "few": "📏 How few? (e.g., maximum count)",
-    
-    # Time terms
-    "as soon as possible": "⏰ What's the deadline? (e.g., within 24 hours, X business days)",
-    "asap": "⏰ What's the specific timeframe? (e.g., within X hours)",
-    "timely": "⏰ What's the time requirement? (e.g., within X hours, same-day)",
-    "recent": "⏰ How recent? (e.g., last X days, current week)",
-    
-    # Adequacy terms
-    "adequate": "📊 What standards should be met? (e.g., industry standard, compliance level)",
-    "sufficient": "📊 What level is sufficient? (e.g., test coverage %, resources needed)",
-    "appropriate": "📊 What makes it appropriate? (e.g., compliance standards, guidelines)",
-    "reasonable": "📊 What are the constraints? (e.g., budget limit, timeline)",
-    
-    # Performance terms
-    "efficient": "⚡ What efficiency metrics? (e.g., resource usage, processing time)",
-    "effective": "⚡ What effectiveness criteria? (e.g., accuracy %, success rate)",
-    "optimal": "⚡ What optimization targets? (e.g., latency, throughput)",
-    "performance": "⚡ What performance benchmarks? (e.g., response time, throughput)",
-}
+import re
+
+from lexicon import current_lexicon
+
+# The questions are defined per term in lexicon.json
 
 
 def get_clarification_question(ambiguous_word):
@@ -79,9 +21,10 @@ def get_clarification_question(ambiguous_word):
         str: Clarification question or default question
     """
     word_lower = ambiguous_word.lower()
+    questions = current_lexicon().questions
     
-    if word_lower in CLARIFICATION_QUESTIONS:
-        return CLARIFICATION_QUESTIONS[word_lower]
+    if word_lower in questions:
+        return questions[word_lower]
     else:
         return f"❓ Can you provide specific criteria for '{ambiguous_word}'? (e.g., measurable values, standards, or benchmarks)"
 
@@ -98,8 +41,6 @@ def apply_user_clarification(original_text, ambiguous_word, user_clarification):
     Returns:
         str: Updated requirement with user's clarification
     """
-    import re
-    
     # Create pattern to match the ambiguous word (case-insensitive)
     pattern = re.compile(re.escape(ambiguous_word), re.IGNORECASE)
     
@@ -107,3 +48,83 @@ def apply_user_clarification(original_text, ambiguous_word, user_clarification):
     improved = pattern.sub(user_clarification, original_text, count=1)
     
     return improved
+
+
+class ClarificationApplier:
+    """
+    Rewrites requirements with a session's clarifications in one pass each.
+    
+    Built once from the session's clarifications. Each requirement is
+    lowercased once, its clarified terms are located in it, and the
+    replacements are spliced in by a single pass over the text. As with
+    apply_user_clarification, the first occurrence of each term is
+    replaced, ignoring case. Text inserted by one clarification is never
+    rewritten by another.
+    """
+    
+    def __init__(self, clarifications):
+        """
+        Args:
+            clarifications: {ambiguous_word: user_clarification}
+        """
+        self.replacements = {word.lower(): value for word, value in clarifications.items()}
+    
+    def apply(self, text, ambiguous_words):
+        """
+        Replace the requirement's clarified terms
+        
+        Args:
+            text: Original requirement text
+            ambiguous_words: Ambiguous terms detected in the requirement
+            
+        Returns:
+            str: Improved requirement text
+        """
+        replacements = self.replacements
+        words = [word for word in map(str.lower, ambiguous_words) if word in replacements]
+        if not words:
+            return text
+        
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            # Lowercasing moved some offsets (rare non-ASCII letters)
+            for word in words:
+                text = apply_user_clarification(text, word, replacements[word])
+            return text
+        
+        hits = []
+        for word in set(words):
+            start = text_lower.find(word)
+            if start >= 0:
+                hits.append((start, start + len(word), word))
+        # At the same start the longer term wins ("quickly" over "quick")
+        hits.sort(key=lambda hit: (hit[0], -hit[1]))
+        
+        parts = []
+        position = 0
+        for start, end, word in hits:
+            if start < position:
+                continue  # overlaps a term already replaced
+            parts.append(text[position:start])
+            parts.append(replacements[word])
+            position = end
+        parts.append(text[position:])
+        return ''.join(parts)
+
+
+def improve_requirements(requirements, clarifications):
+    """
+    Apply clarifications to every requirement of a document
+    
+    Args:
+        requirements: analyzer.RequirementTable of the document
+        clarifications: {ambiguous_word: user_clarification}
+        
+    Returns:
+        list: Improved text of each requirement, in order
+    """
+    applier = ClarificationApplier(clarifications)
+    return [
+        applier.apply(requirements.text(index), requirements.ambiguous(index))
+        for index in range(len(requirements))
+    ]
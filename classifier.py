@@ -3,100 +3,53 @@ Requirement Classification Module
 Classifies requirements as Functional (FR) or Non-Functional (NFR)
 """
 
-# Keywords that indicate Functional Requirements (what the system does)
-FUNCTIONAL_KEYWORDS = [
-    # User actions
-    "login", "register", "sign up", "sign in", "logout",
-    "create", "add", "insert", "delete", "remove",
-    "update", "edit", "modify", "change",
-    "view", "display", "show", "list", "browse",
-    "search", "find", "filter", "sort",
-    "upload", "download", "export", "import",
-    "send", "receive", "submit", "post",
-    "calculate", "compute", "process", "generate",
-    "validate", "verify", "check", "confirm",
-    "approve", "reject", "cancel",
-    "notify", "alert", "remind",
-    "print", "save", "store",
-    "share", "collaborate",
-    
-    # System features
-    "dashboard", "report", "form", "button",
-    "menu", "navigation", "link",
-    "payment", "checkout", "cart",
-    "profile", "account", "settings",
-    "notification", "message", "email",
-    "database", "record", "entry",
-]
-
-# Keywords that indicate Non-Functional Requirements (quality attributes)
-NON_FUNCTIONAL_KEYWORDS = [
-    # Performance
-    "performance", "speed", "response time", "latency",
-    "throughput", "load time", "processing time",
-    "fast", "quick", "slow", "efficient",
-    
-    # Security
-    "security", "secure", "encryption", "authentication",
-    "authorization", "access control", "password",
-    "privacy", "confidential", "protected",
-    "ssl", "tls", "https", "oauth",
-    
-    # Reliability
-    "reliability", "reliable", "uptime", "availability",
-    "fault tolerance", "backup", "recovery",
-    "robust", "stable", "consistent",
-    
-    # Scalability
-    "scalability", "scalable", "concurrent users",
-    "load balancing", "horizontal scaling",
-    
-    # Usability
-    "usability", "user-friendly", "intuitive", "easy",
-    "accessible", "accessibility", "wcag",
-    "user experience", "ux", "ui",
-    
-    # Maintainability
-    "maintainability", "maintainable", "modular",
-    "extensible", "flexible", "reusable",
-    "documentation", "code quality",
-    
-    # Portability
-    "portability", "portable", "cross-platform",
-    "compatibility", "compatible", "browser support",
-    
-    # Compliance
-    "compliance", "compliant", "regulation", "standard",
-    "gdpr", "hipaa", "iso", "ieee",
-]
+from lexicon import current_lexicon
 
+try:
+    import numpy as np
+except ImportError:  # classify_many falls back to per-sentence scoring
+    np = None
 
-def classify_requirement(sentence):
+# The functional and non-functional keywords are defined in lexicon.json
+
+
+def match_keywords(sentence_lower, lexicon=None):
     """
-    Classifies a requirement as Functional or Non-Functional.
+    Finds the classifier keywords present in an already lowercased sentence.
     
     Args:
-        sentence (str): The requirement sentence to classify
+        sentence_lower (str): The lowercased requirement sentence
+        lexicon (Lexicon): Lexicon to use (default: the active one)
         
     Returns:
-        str: "Functional Requirement", "Non-Functional Requirement", or "Unclassified"
+        tuple: (functional, non_functional) lists of matched keywords,
+            each in keyword-list order
     """
-    sentence_lower = sentence.lower()
-    
-    functional_count = 0
-    non_functional_count = 0
-    
-    # Count matches for functional keywords
-    for keyword in FUNCTIONAL_KEYWORDS:
-        if keyword in sentence_lower:
-            functional_count += 1
-    
-    # Count matches for non-functional keywords
-    for keyword in NON_FUNCTIONAL_KEYWORDS:
-        if keyword in sentence_lower:
-            non_functional_count += 1
+    lexicon = lexicon or current_lexicon()
+    functional_count = lexicon.functional_count
+    functional = []
+    non_functional = []
+    
+    for keyword_id in lexicon.keyword_matcher.find_ids(sentence_lower):
+        if keyword_id < functional_count:
+            functional.append(lexicon.functional_keywords[keyword_id])
+        else:
+            non_functional.append(lexicon.non_functional_keywords[keyword_id - functional_count])
+    
+    return functional, non_functional
+
+
+def category_from_counts(functional_count, non_functional_count):
+    """
+    Picks a category from the number of matched keywords of each kind.
     
-    # Determine category based on keyword counts
+    Args:
+        functional_count (int): Number of functional keywords matched
+        non_functional_count (int): Number of non-functional keywords matched
+        
+    Returns:
+        str: "Functional Requirement", "Non-Functional Requirement", or "Unclassified"
+    """
     if functional_count > non_functional_count:
         return "Functional Requirement"
     elif non_functional_count > functional_count:
@@ -108,31 +61,27 @@ def classify_requirement(sentence):
         return "Unclassified"
 
 
-def get_confidence_score(sentence, category):
+def confidence_from_counts(category, functional_count, non_functional_count):
     """
-    Calculates a confidence score for the classification.
+    Calculates a confidence score from the number of matched keywords.
     
     Args:
-        sentence (str): The requirement sentence
         category (str): The assigned category
+        functional_count (int): Number of functional keywords matched
+        non_functional_count (int): Number of non-functional keywords matched
         
     Returns:
         int: Confidence score (0-100)
     """
-    sentence_lower = sentence.lower()
-    
-    functional_matches = sum(1 for kw in FUNCTIONAL_KEYWORDS if kw in sentence_lower)
-    non_functional_matches = sum(1 for kw in NON_FUNCTIONAL_KEYWORDS if kw in sentence_lower)
-    
-    total_matches = functional_matches + non_functional_matches
+    total_matches = functional_count + non_functional_count
     
     if total_matches == 0:
         return 0  # Unclassified
     
     if category == "Functional Requirement":
-        confidence = (functional_matches / total_matches) * 100
+        confidence = (functional_count / total_matches) * 100
     elif category == "Non-Functional Requirement":
-        confidence = (non_functional_matches / total_matches) * 100
+        confidence = (non_functional_count / total_matches) * 100
     else:
         confidence = 0
     
@@ -143,6 +92,55 @@ def get_confidence_score(sentence, category):
     return int(confidence)
 
 
+def keywords_for_category(category, functional, non_functional):
+    """
+    Selects the matched keywords that support a category.
+    
+    Args:
+        category (str): The category to check
+        functional (list): Matched functional keywords
+        non_functional (list): Matched non-functional keywords
+        
+    Returns:
+        list: Distinct matched keywords for the category
+    """
+    if category == "Functional Requirement":
+        return list(dict.fromkeys(functional))
+    elif category == "Non-Functional Requirement":
+        return list(dict.fromkeys(non_functional))
+    else:
+        return []
+
+
+def classify_requirement(sentence):
+    """
+    Classifies a requirement as Functional or Non-Functional.
+    
+    Args:
+        sentence (str): The requirement sentence to classify
+        
+    Returns:
+        str: "Functional Requirement", "Non-Functional Requirement", or "Unclassified"
+    """
+    functional, non_functional = match_keywords(sentence.lower())
+    return category_from_counts(len(functional), len(non_functional))
+
+
+def get_confidence_score(sentence, category):
+    """
+    Calculates a confidence score for the classification.
+    
+    Args:
+        sentence (str): The requirement sentence
+        category (str): The assigned category
+        
+    Returns:
+        int: Confidence score (0-100)
+    """
+    functional, non_functional = match_keywords(sentence.lower())
+    return confidence_from_counts(category, len(functional), len(non_functional))
+
+
 def get_matched_keywords(sentence, category):
     """
     Returns the list of matched keywords for a given category.
@@ -154,21 +152,83 @@ def get_matched_keywords(sentence, category):
     Returns:
         list: List of matched keywords
     """
-    sentence_lower = sentence.lower()
-    matched = []
-    
-    if category == "Functional Requirement":
-        keywords = FUNCTIONAL_KEYWORDS
-    elif category == "Non-Functional Requirement":
-        keywords = NON_FUNCTIONAL_KEYWORDS
-    else:
-        return matched
+    functional, non_functional = match_keywords(sentence.lower())
+    return keywords_for_category(category, functional, non_functional)
+
+
+def classify_many(requirements):
+    """
+    Classifies a batch of requirements in one go.
     
-    for keyword in keywords:
-        if keyword in sentence_lower and keyword not in matched:
-            matched.append(keyword)
+    Each requirement is scanned once to fill a requirements x keywords
+    count matrix; categories and confidence scores for the whole batch are
+    then computed with vectorized NumPy operations. Results are identical to
+    calling classify_requirement, get_confidence_score and
+    get_matched_keywords on every sentence.
     
-    return matched
+    Args:
+        requirements (list): Requirement sentences
+        
+    Returns:
+        list: (category, confidence, matched_keywords) tuple per requirement
+    """
+    lexicon = current_lexicon()
+    
+    if np is None:
+        results = []
+        for sentence in requirements:
+            functional, non_functional = match_keywords(sentence.lower(), lexicon)
+            category = category_from_counts(len(functional), len(non_functional))
+            results.append((
+                category,
+                confidence_from_counts(category, len(functional), len(non_functional)),
+                keywords_for_category(category, functional, non_functional),
+            ))
+        return results
+    
+    # Single scan per requirement fills the count matrix
+    rows = []
+    columns = []
+    for row, sentence in enumerate(requirements):
+        keyword_ids = lexicon.keyword_matcher.find_ids(sentence.lower())
+        rows.extend([row] * len(keyword_ids))
+        columns.extend(keyword_ids)
+    
+    counts = np.zeros((len(requirements), len(lexicon.keyword_matcher)), dtype=np.uint8)
+    counts[rows, columns] = 1
+    
+    split = lexicon.functional_count
+    functional_counts = counts[:, :split].sum(axis=1, dtype=np.int64)
+    non_functional_counts = counts[:, split:].sum(axis=1, dtype=np.int64)
+    total_matches = functional_counts + non_functional_counts
+    
+    # Same rules as category_from_counts: ties with any match go to Functional
+    is_functional = (functional_counts >= non_functional_counts) & (functional_counts > 0)
+    is_non_functional = non_functional_counts > functional_counts
+    
+    # Same arithmetic as confidence_from_counts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(is_functional, functional_counts / total_matches * 100, 0.0)
+        confidence = np.where(is_non_functional, non_functional_counts / total_matches * 100, confidence)
+    confidence = np.where(total_matches >= 3, np.minimum(confidence + 10, 100), confidence)
+    confidence = np.where(total_matches == 0, 0, np.trunc(confidence)).astype(np.int64)
+    
+    results = []
+    for row in range(len(requirements)):
+        if is_functional[row]:
+            category = "Functional Requirement"
+            keyword_ids = np.flatnonzero(counts[row, :split])
+            matched = list(dict.fromkeys(lexicon.functional_keywords[i] for i in keyword_ids))
+        elif is_non_functional[row]:
+            category = "Non-Functional Requirement"
+            keyword_ids = np.flatnonzero(counts[row, split:])
+            matched = list(dict.fromkeys(lexicon.non_functional_keywords[i] for i in keyword_ids))
+        else:
+            category = "Unclassified"
+            matched = []
+        results.append((category, int(confidence[row]), matched))
+    
+    return results
 
 
 if __name__ == "__main__":
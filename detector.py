@@ -3,135 +3,158 @@ Ambiguity Detection Module
 Detects ambiguous words in SRS requirements and suggests improvements
 """
 
-# Comprehensive list of ambiguous terms commonly found in requirements
-AMBIGUOUS_WORDS = [
-    "fast", "quick", "rapid", "slow",
-    "user-friendly", "easy", "simple", "intuitive",
-    "efficient", "effective", "optimal", "better", "improved",
-    "secure", "safe", "protected",
-    "reliable", "robust", "stable",
-    "scalable", "flexible", "adaptable",
-    "adequate", "sufficient", "appropriate",
-    "as soon as possible", "asap", "timely",
-    "recent", "modern", "latest",
-    "high quality", "good", "bad", "poor",
-    "large", "small", "big", "tiny",
-    "many", "few", "several", "various",
-    "etc", "and so on", "and so forth",
-    "reasonable", "acceptable", "suitable",
-    "maximum", "minimum", "approximately",
-    "normal", "usual", "typical",
-    "clear", "obvious", "evident",
-]
-
-# Mapping of ambiguous terms to specific, measurable alternatives
-SUGGESTIONS = {
-    "fast": "within 2 seconds",
-    "quick": "within 3 seconds",
-    "slow": "more than 5 seconds",
-    "user-friendly": "with clear navigation, tooltips, and help documentation",
-    "easy": "requiring no more than 3 clicks",
-    "simple": "with a clean interface and minimal steps",
-    "intuitive": "following standard UI patterns (e.g., Material Design)",
-    "efficient": "using less than 100MB of memory",
-    "effective": "achieving 95% accuracy",
-    "optimal": "meeting performance benchmarks of <2s response time",
-    "better": "10% faster than the previous version",
-    "improved": "with 20% reduced error rate",
-    "secure": "using AES-256 encryption and OAuth 2.0 authentication",
-    "safe": "with SSL/TLS encryption and password hashing (bcrypt)",
-    "protected": "with role-based access control (RBAC)",
-    "reliable": "with 99.9% uptime",
-    "robust": "handling 1000 concurrent users",
-    "stable": "with less than 0.1% crash rate",
-    "scalable": "supporting up to 10,000 users",
-    "flexible": "with configurable settings and plugin support",
-    "adaptable": "supporting multiple platforms (Web, iOS, Android)",
-    "adequate": "meeting ISO 25010 quality standards",
-    "sufficient": "providing 99.5% test coverage",
-    "appropriate": "following WCAG 2.1 AA accessibility guidelines",
-    "as soon as possible": "within 24 hours",
-    "asap": "within 24 hours",
-    "timely": "within the agreed SLA of 48 hours",
-    "recent": "from the last 30 days",
-    "modern": "supporting current browser versions (Chrome 90+, Firefox 88+)",
-    "latest": "the most recent stable version",
-    "high quality": "with less than 5 defects per 1000 lines of code",
-    "good": "meeting acceptance criteria with 90% user satisfaction",
-    "bad": "with error rate exceeding 5%",
-    "poor": "below 70% performance benchmark",
-    "large": "greater than 1GB",
-    "small": "less than 50MB",
-    "big": "exceeding 500MB",
-    "tiny": "less than 10MB",
-    "many": "more than 100 items",
-    "few": "fewer than 10 items",
-    "several": "between 5 and 15 items",
-    "various": "supporting at least 5 different formats",
-    "etc": "(please specify all items explicitly)",
-    "and so on": "(please list all requirements)",
-    "and so forth": "(please enumerate all conditions)",
-    "reasonable": "within the budget of $50,000 and 6-month timeline",
-    "acceptable": "meeting 85% of user acceptance criteria",
-    "suitable": "compliant with industry standards (IEEE, ISO)",
-    "maximum": "not exceeding [specify exact limit]",
-    "minimum": "at least [specify exact threshold]",
-    "approximately": "[specify exact value ± acceptable range]",
-    "normal": "under standard operating conditions (20-25°C, <80% humidity)",
-    "usual": "following typical usage patterns",
-    "typical": "representing 80% of use cases",
-    "clear": "with explicit error messages and status indicators",
-    "obvious": "following conventional design patterns",
-    "evident": "with visible feedback for all user actions",
-}
-
-
-def detect_ambiguity(sentence):
+import re
+
+from lexicon import current_lexicon
+
+# The ambiguous terms and their suggestions are defined in lexicon.json
+
+
+def find_term_matches(sentence_lower, whole_words=False, lexicon=None):
     """
-    Detects ambiguous words in a given sentence.
+    Runs the ambiguity matcher over an already lowercased sentence.
     
     Args:
-        sentence (str): The requirement sentence to analyze
+        sentence_lower (str): The lowercased requirement sentence
+        whole_words (bool): If True, ignore terms embedded in longer words
+        lexicon (Lexicon): Lexicon to use (default: the active one)
+        
+    Returns:
+        list: (start, end, word_id) tuples, by start and then longest first
+    """
+    lexicon = lexicon or current_lexicon()
+    # Outermost occurrences first at each start, so nested ones are seen after their container
+    return sorted(
+        lexicon.ambiguity_matcher.iter_matches(sentence_lower, whole_words),
+        key=lambda match: (match[0], -match[1])
+    )
+
+
+def find_ambiguities(sentence_lower, whole_words=False, lexicon=None, matches=None):
+    """
+    Locates every ambiguous term occurrence in an already lowercased sentence.
+    
+    An occurrence lying inside a longer term's occurrence (e.g. "quick"
+    inside "quickly") is not reported separately.
+    
+    Args:
+        sentence_lower (str): The lowercased requirement sentence
+        whole_words (bool): If True, ignore terms embedded in longer words
+            (e.g. "fast" inside "breakfast")
+        lexicon (Lexicon): Lexicon to use (default: the active one)
+        matches (list): find_term_matches() result for the same arguments,
+            if the caller already has it
         
     Returns:
-        list: List of ambiguous words found in the sentence
+        list: (word, start, end) tuples ordered by position in the sentence
+    """
+    lexicon = lexicon or current_lexicon()
+    words = lexicon.ambiguous_words
+    if matches is None:
+        matches = find_term_matches(sentence_lower, whole_words, lexicon)
+    
+    hits = []
+    covered_until = -1
+    for start, end, word_id in matches:
+        if end > covered_until:
+            hits.append((words[word_id], start, end))
+            covered_until = end
+    return hits
+
+
+def ambiguous_terms(hits, lexicon=None):
     """
-    found_words = []
-    sentence_lower = sentence.lower()
+    Reduces find_ambiguities() hits to the distinct terms found.
     
-    for word in AMBIGUOUS_WORDS:
-        if word in sentence_lower:
-            # Avoid duplicate detections
-            if word not in found_words:
-                found_words.append(word)
+    Args:
+        hits (list): (word, start, end) tuples
+        lexicon (Lexicon): Lexicon the hits were found with (default: the active one)
+        
+    Returns:
+        list: Distinct ambiguous words in lexicon order
+    """
+    word_rank = (lexicon or current_lexicon()).word_rank
+    return sorted({word for word, _, _ in hits}, key=word_rank.__getitem__)
+
+
+def detect_ambiguity(sentence, whole_words=False):
+    """
+    Detects ambiguous words in a given sentence.
     
-    return found_words
+    Args:
+        sentence (str): The requirement sentence to analyze
+        whole_words (bool): If True, ignore terms embedded in longer words
+            (e.g. "fast" inside "breakfast")
+        
+    Returns:
+        list: List of ambiguous words found in the sentence, in
+            lexicon order and without duplicates
+    """
+    lexicon = current_lexicon()
+    return ambiguous_terms(find_ambiguities(sentence.lower(), whole_words, lexicon), lexicon)
 
 
-def suggest_improvement(sentence):
+def suggest_improvement(sentence, lexicon=None, matches=None):
     """
     Suggests an improved version of the sentence by replacing ambiguous words.
     
+    The sentence is read left to right, case-insensitively; where several
+    terms start together the longest wins, and only the first occurrence
+    of each term is replaced.
+    
     Args:
         sentence (str): The original requirement sentence
+        lexicon (Lexicon): Lexicon to use (default: the active one)
+        matches (list): find_term_matches() result for sentence.lower(),
+            if the caller already has it
         
     Returns:
         str: Improved sentence with specific alternatives
     """
-    improved = sentence
+    lexicon = lexicon or current_lexicon()
+    suggestion_by_id = lexicon.suggestion_by_id
     
-    # Sort by length (longest first) to avoid partial replacements
-    sorted_suggestions = sorted(SUGGESTIONS.items(), key=lambda x: len(x[0]), reverse=True)
+    offsets = None
+    if matches is None:
+        sentence_lower = sentence.lower()
+        if len(sentence_lower) != len(sentence):
+            sentence_lower, offsets = _lowercase_with_offsets(sentence)
+        matches = find_term_matches(sentence_lower, lexicon=lexicon)
     
-    for ambiguous, specific in sorted_suggestions:
-        # Case-insensitive replacement while preserving original case
-        if ambiguous.lower() in improved.lower():
-            # Find the exact occurrence (case-insensitive)
-            import re
-            pattern = re.compile(re.escape(ambiguous), re.IGNORECASE)
-            improved = pattern.sub(specific, improved, count=1)
+    parts = []
+    copied = 0
+    position = 0
+    replaced = set()
+    for start, end, word_id in matches:
+        suggestion = suggestion_by_id[word_id]
+        if suggestion is None or start < position:
+            continue
+        position = end
+        # Later occurrences of a replaced term are kept, but still consumed
+        if word_id in replaced:
+            continue
+        replaced.add(word_id)
+        if offsets is not None:
+            start, end = offsets[start], offsets[end - 1] + 1
+        parts.append(sentence[copied:start])
+        parts.append(suggestion)
+        copied = end
     
-    return improved
+    if not parts:
+        return sentence
+    parts.append(sentence[copied:])
+    return ''.join(parts)
+
+
+def _lowercase_with_offsets(sentence):
+    """Lowercases a sentence whose length changes when lowercased, mapping each character back."""
+    lowered = []
+    offsets = []
+    for index, char in enumerate(sentence):
+        char = char.lower()
+        lowered.append(char)
+        offsets.extend([index] * len(char))
+    return ''.join(lowered), offsets
 
 
 def highlight_ambiguous_words(sentence, ambiguous_words):
@@ -151,7 +174,6 @@ def highlight_ambiguous_words(sentence, ambiguous_words):
     sorted_words = sorted(ambiguous_words, key=len, reverse=True)
     
     for word in sorted_words:
-        import re
         pattern = re.compile(f'({re.escape(word)})', re.IGNORECASE)
         highlighted = pattern.sub(r'<span class="ambiguous">\1</span>', highlighted)
     
@@ -0,0 +1,449 @@
+"""
+Lexicon Module
+Loads the versioned lexicon file, compiles its matchers and hot-reloads it
+
+The lexicon file (lexicon.json) holds every ambiguous term with its
+suggestion and clarification question, plus the classifier keyword lists.
+Compiled lexicons are cached as marshal artifacts keyed by the file's
+content, so workers after the first start without rebuilding the automata.
+"""
+
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from matcher import KeywordAutomaton
+
+# Lexicon file format understood by parse_lexicon
+LEXICON_FORMAT = 1
+
+# Bump when the compiled structures change, so stale artifacts are ignored
+COMPILER_VERSION = 1
+
+LEXICON_PATH = os.environ.get('SRS_LEXICON_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'lexicon.json'
+)
+
+# Compiled artifacts, in a per-user directory only its owner can write;
+# an empty SRS_LEXICON_CACHE_DIR disables them
+LEXICON_CACHE_DIR = os.environ.get(
+    'SRS_LEXICON_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache')), 'srs-lexicon'),
+)
+
+# Seconds between checks of the lexicon file for changes (0 disables hot reload)
+RELOAD_INTERVAL = float(os.environ.get('SRS_LEXICON_RELOAD_INTERVAL', 5))
+
+
+class LexiconError(ValueError):
+    """Raised when a lexicon file is malformed."""
+
+
+class Lexicon:
+    """
+    One immutable lexicon version with its compiled matchers.
+
+    Readers take a Lexicon once per operation (see current_lexicon) and use
+    only that object, so a reload never mixes two versions in one result.
+
+    Attributes:
+        version (str): Version declared in the lexicon file
+        fingerprint (str): SHA-256 of the lexicon content
+        version_id (str): "<version>+<fingerprint prefix>", recorded in results
+        ambiguous_words (tuple): Detected terms, in reporting order
+        suggestions (dict): Term -> measurable alternative
+        questions (dict): Term -> clarification question
+        functional_keywords (tuple): Classifier keywords for functional requirements
+        non_functional_keywords (tuple): Classifier keywords for quality attributes
+        ambiguity_matcher (KeywordAutomaton): Over the lowercased ambiguous words
+        keyword_matcher (KeywordAutomaton): Over functional then non-functional
+            keywords; IDs below functional_count are functional
+        word_rank (dict): Term -> position in ambiguous_words
+        suggestion_by_id (tuple): Suggestion of each ambiguity_matcher pattern
+            ID, or None for terms without one
+    """
+
+    __slots__ = (
+        'version', 'fingerprint', 'version_id', 'ambiguous_words', 'suggestions', 'questions',
+        'functional_keywords', 'non_functional_keywords', 'functional_count',
+        'ambiguity_matcher', 'keyword_matcher', 'word_rank', 'suggestion_by_id',
+    )
+
+    def __init__(self, version, fingerprint, ambiguous_words, suggestions, questions,
+                 functional_keywords, non_functional_keywords,
+                 ambiguity_matcher=None, keyword_matcher=None):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.version_id = f"{version}+{fingerprint[:8]}"
+        self.ambiguous_words = tuple(ambiguous_words)
+        self.suggestions = dict(suggestions)
+        self.questions = dict(questions)
+        self.functional_keywords = tuple(functional_keywords)
+        self.non_functional_keywords = tuple(non_functional_keywords)
+        self.functional_count = len(self.functional_keywords)
+
+        # Automata are the expensive part; compiled artifacts supply them ready-made
+        if ambiguity_matcher is None:
+            ambiguity_matcher = KeywordAutomaton([word.lower() for word in self.ambiguous_words])
+        if keyword_matcher is None:
+            keyword_matcher = KeywordAutomaton(
+                [keyword.lower() for keyword in self.functional_keywords + self.non_functional_keywords]
+            )
+        self.ambiguity_matcher = ambiguity_matcher
+        self.keyword_matcher = keyword_matcher
+
+        self.word_rank = {word: rank for rank, word in enumerate(self.ambiguous_words)}
+
+        self.suggestion_by_id = tuple(self.suggestions.get(word) for word in self.ambiguous_words)
+
+    def __repr__(self):
+        return f"Lexicon(version={self.version_id!r}, terms={len(self.ambiguous_words)})"
+
+
+def _string_list(data, key):
+    values = data.get(key)
+    if not isinstance(values, list) or not all(isinstance(v, str) and v.strip() for v in values):
+        raise LexiconError(f'"{key}" must be a list of non-empty strings')
+    return values
+
+
+def parse_lexicon(data):
+    """
+    Validates a decoded lexicon file and compiles it.
+
+    Args:
+        data (dict): Decoded lexicon JSON
+
+    Returns:
+        Lexicon: Compiled lexicon
+
+    Raises:
+        LexiconError: If the content does not follow the lexicon format
+    """
+    if not isinstance(data, dict) or data.get('format') != LEXICON_FORMAT:
+        raise LexiconError(f'Unsupported lexicon format (expected "format": {LEXICON_FORMAT})')
+    version = data.get('version')
+    if not isinstance(version, str) or not version.strip():
+        raise LexiconError('"version" must be a non-empty string')
+
+    entries = data.get('ambiguous_terms')
+    if not isinstance(entries, list) or not entries:
+        raise LexiconError('"ambiguous_terms" must be a non-empty list')
+
+    words = []
+    suggestions = {}
+    questions = {}
+    for index, entry in enumerate(entries):
+        term = entry.get('term') if isinstance(entry, dict) else None
+        if not isinstance(term, str) or not term.strip() or term != term.lower():
+            raise LexiconError(f'ambiguous_terms[{index}]: "term" must be a non-empty lowercase string')
+        if term in words:
+            raise LexiconError(f'ambiguous_terms[{index}]: duplicate term "{term}"')
+        for field, target in (('suggestion', suggestions), ('question', questions)):
+            if field in entry:
+                if not isinstance(entry[field], str) or not entry[field].strip():
+                    raise LexiconError(f'ambiguous_terms[{index}]: "{field}" must be a non-empty string')
+                target[term] = entry[field]
+        words.append(term)
+
+    return Lexicon(
+        version=version,
+        fingerprint=lexicon_fingerprint(data),
+        ambiguous_words=words,
+        suggestions=suggestions,
+        questions=questions,
+        functional_keywords=_string_list(data, 'functional_keywords'),
+        non_functional_keywords=_string_list(data, 'non_functional_keywords'),
+    )
+
+
+def lexicon_fingerprint(data):
+    """
+    Hashes decoded lexicon content, independently of key order and formatting.
+
+    Args:
+        data (dict): Decoded lexicon JSON
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def private_cache_dir(cache_dir):
+    """
+    Creates the artifact directory with mode 0700 and checks nobody else can write to it.
+
+    Args:
+        cache_dir (str): Artifact directory
+
+    Returns:
+        bool: True if artifacts may be read from and written to it
+    """
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat = os.stat(cache_dir)
+    except OSError as e:
+        print(f"Lexicon artifact directory unavailable: {e}")
+        return False
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o022):
+        print(f"Ignoring lexicon artifact directory {cache_dir}: "
+              f"it must belong to this user and not be writable by others")
+        return False
+    return True
+
+
+def artifact_path(cache_dir, source):
+    """
+    Returns where the compiled artifact of a lexicon file is cached.
+
+    The name hashes the file content together with the compiler and marshal
+    versions, so any change to either produces a fresh artifact.
+
+    Args:
+        cache_dir (str): Artifact directory
+        source (bytes): Raw lexicon file content
+
+    Returns:
+        str: Artifact path
+    """
+    digest = hashlib.sha256(source)
+    digest.update(f'{LEXICON_FORMAT}/{COMPILER_VERSION}/{marshal.version}/{sys.version_info[:2]}'.encode())
+    return os.path.join(cache_dir, f'lexicon-{digest.hexdigest()[:24]}.marshal')
+
+
+def save_artifact(lexicon, path):
+    """
+    Writes a compiled lexicon atomically.
+
+    Args:
+        lexicon (Lexicon): Compiled lexicon
+        path (str): Artifact path
+    """
+    payload = marshal.dumps({
+        'version': lexicon.version,
+        'fingerprint': lexicon.fingerprint,
+        'ambiguous_words': lexicon.ambiguous_words,
+        'suggestions': lexicon.suggestions,
+        'questions': lexicon.questions,
+        'functional_keywords': lexicon.functional_keywords,
+        'non_functional_keywords': lexicon.non_functional_keywords,
+        'ambiguity_tables': lexicon.ambiguity_matcher.to_tables(),
+        'keyword_tables': lexicon.keyword_matcher.to_tables(),
+    })
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path, fingerprint):
+    """
+    Reads a compiled lexicon.
+
+    marshal only decodes plain data here (no code is run), so a foreign
+    or corrupt file can at worst fail to load. An artifact compiled from
+    other lexicon content than expected is rejected.
+
+    Args:
+        path (str): Artifact path
+        fingerprint (str): lexicon_fingerprint() of the lexicon file's content
+
+    Returns:
+        Lexicon or None: The lexicon, or None if the artifact is missing,
+            unreadable or for another lexicon
+    """
+    try:
+        with open(path, 'rb') as f:
+            payload = marshal.loads(f.read())
+        if payload['fingerprint'] != fingerprint:
+            print(f"Ignoring lexicon artifact {path}: compiled from other lexicon content")
+            return None
+        return Lexicon(
+            version=payload['version'],
+            fingerprint=payload['fingerprint'],
+            ambiguous_words=payload['ambiguous_words'],
+            suggestions=payload['suggestions'],
+            questions=payload['questions'],
+            functional_keywords=payload['functional_keywords'],
+            non_functional_keywords=payload['non_functional_keywords'],
+            ambiguity_matcher=KeywordAutomaton.from_tables(payload['ambiguity_tables']),
+            keyword_matcher=KeywordAutomaton.from_tables(payload['keyword_tables']),
+        )
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError, KeyError) as e:
+        print(f"Ignoring unreadable lexicon artifact {path}: {e}")
+        return None
+
+
+def load_lexicon(path=None, cache_dir=None):
+    """
+    Loads a lexicon file, from its compiled artifact when one exists.
+
+    Args:
+        path (str): Lexicon file (default LEXICON_PATH)
+        cache_dir (str): Artifact directory (default LEXICON_CACHE_DIR; empty disables)
+
+    Returns:
+        Lexicon: Compiled lexicon
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it is not valid JSON or not a valid lexicon
+    """
+    path = path or LEXICON_PATH
+    cache_dir = LEXICON_CACHE_DIR if cache_dir is None else cache_dir
+
+    with open(path, 'rb') as f:
+        source = f.read()
+    data = json.loads(source.decode('utf-8'))
+
+    artifact = artifact_path(cache_dir, source) if cache_dir and private_cache_dir(cache_dir) else None
+    if artifact:
+        lexicon = load_artifact(artifact, lexicon_fingerprint(data))
+        if lexicon is not None:
+            return lexicon
+
+    lexicon = parse_lexicon(data)
+
+    if artifact:
+        try:
+            save_artifact(lexicon, artifact)
+        except OSError as e:
+            print(f"Lexicon artifact write error: {e}")
+
+    return lexicon
+
+
+def _source_stamp(path):
+    """Returns (mtime, size) of a file, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# The active lexicon. Replaced by one reference assignment, so readers see
+# either the old or the new version, and never wait for a reload.
+_current = load_lexicon()
+_stamp = _source_stamp(LEXICON_PATH)
+_last_check = time.monotonic()
+_reload_lock = threading.Lock()
+
+
+def current_lexicon():
+    """
+    Returns the active lexicon. Take it once per operation and pass it on.
+
+    Returns:
+        Lexicon: Active lexicon
+    """
+    return _current
+
+
+def reload_lexicon():
+    """
+    Reloads LEXICON_PATH and activates it if its content changed.
+
+    Returns:
+        bool: True if a new lexicon version was activated
+
+    Raises:
+        OSError, ValueError: If the file cannot be loaded; the active
+            lexicon stays in place
+    """
+    global _current, _stamp
+
+    with _reload_lock:
+        # Recorded first, so a broken file is reported once, not on every check
+        _stamp = _source_stamp(LEXICON_PATH)
+        lexicon = load_lexicon()
+        if lexicon.fingerprint == _current.fingerprint:
+            return False
+        _current = lexicon
+
+    print(f"Lexicon {lexicon.version_id} activated")
+    return True
+
+
+def require_lexicon(fingerprint):
+    """
+    Returns the active lexicon, reloading it first if it is not the given version.
+
+    Process pool workers keep the lexicon they were forked with and never
+    watch the file, so callers send the fingerprint of their lexicon with
+    each task and the worker catches up before running it.
+
+    Args:
+        fingerprint (str): Fingerprint of the caller's lexicon
+
+    Returns:
+        Lexicon: Active lexicon (still another version if the file changed
+            again since, or cannot be loaded)
+    """
+    if _current.fingerprint != fingerprint:
+        try:
+            reload_lexicon()
+        except (OSError, ValueError) as e:
+            print(f"Lexicon reload failed, keeping {_current.version_id}: {e}")
+    return _current
+
+
+def check_for_update():
+    """
+    Starts a background reload if the lexicon file changed.
+
+    Costs one clock read per call, plus one stat() every RELOAD_INTERVAL
+    seconds; compilation never runs on the calling thread.
+    """
+    global _last_check
+
+    if RELOAD_INTERVAL <= 0:
+        return
+    now = time.monotonic()
+    if now - _last_check < RELOAD_INTERVAL:
+        return
+    _last_check = now
+
+    if _source_stamp(LEXICON_PATH) == _stamp or _reload_lock.locked():
+        return
+    threading.Thread(target=_reload_in_background, name='lexicon-reload', daemon=True).start()
+
+
+def _reload_in_background():
+    try:
+        reload_lexicon()
+    except (OSError, ValueError) as e:
+        print(f"Lexicon reload failed, keeping {_current.version_id}: {e}")
+
+
+if __name__ == "__main__":
+    # Validate a lexicon file and compile its artifact ahead of deployment
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate and precompile a lexicon file")
+    parser.add_argument('path', nargs='?', default=LEXICON_PATH, help="lexicon file (default lexicon.json)")
+    parser.add_argument('--cache-dir', default=LEXICON_CACHE_DIR or None,
+                        help="artifact directory (default SRS_LEXICON_CACHE_DIR)")
+    args = parser.parse_args()
+
+    with open(args.path, 'rb') as f:
+        compiled = parse_lexicon(json.loads(f.read().decode('utf-8')))
+    print(f"Lexicon {compiled.version_id}: {len(compiled.ambiguous_words)} ambiguous terms, "
+          f"{len(compiled.functional_keywords)} functional and "
+          f"{len(compiled.non_functional_keywords)} non-functional keywords")
+
+    if args.cache_dir and private_cache_dir(args.cache_dir):
+        with open(args.path, 'rb') as f:
+            target = artifact_path(args.cache_dir, f.read())
+        save_artifact(compiled, target)
+        print(f"Compiled artifact: {target}")
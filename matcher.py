@@ -0,0 +1,154 @@
+"""
+Multi-Pattern Matcher Module
+Aho-Corasick automaton for finding many lexicon terms in a single pass
+"""
+
+from collections import deque
+
+
+def _is_word_char(char):
+    """Returns True if the character is part of a word (letter, digit or underscore)."""
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of patterns.
+
+    The automaton is built once and then finds every occurrence of every
+    pattern in a text with a single left-to-right scan, so the cost of a
+    search grows with the length of the text and the number of hits, not
+    with the number of patterns.
+
+    Patterns are matched literally; callers lowercase both the patterns and
+    the text when they want case-insensitive matching.
+    """
+
+    __slots__ = ('patterns', '_goto', '_fail', '_output')
+
+    def __init__(self, patterns):
+        """
+        Builds the automaton.
+
+        Args:
+            patterns (list): Pattern strings. The position of a pattern in
+                this list is the ID reported for its matches. Duplicate
+                patterns are allowed and each keeps its own ID.
+        """
+        self.patterns = tuple(patterns)
+        goto = [{}]
+        output = [[]]
+
+        # Build the trie of all patterns
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(pattern_id)
+
+        # Breadth-first pass computes failure links and merges outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state].extend(output[fail[next_state]])
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [tuple(ids) for ids in output]
+
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Rebuilds an automaton from to_tables() output without recomputing it.
+
+        Args:
+            tables (tuple): (patterns, goto, fail, output) as returned by to_tables
+
+        Returns:
+            KeywordAutomaton: Automaton equivalent to the one that was exported
+        """
+        automaton = cls.__new__(cls)
+        patterns, goto, fail, output = tables
+        automaton.patterns = tuple(patterns)
+        automaton._goto = list(goto)
+        automaton._fail = list(fail)
+        automaton._output = [tuple(ids) for ids in output]
+        return automaton
+
+    def to_tables(self):
+        """
+        Exports the automaton as plain tuples, lists, dicts, strings and ints,
+        e.g. for marshal.
+
+        Returns:
+            tuple: (patterns, goto, fail, output)
+        """
+        return self.patterns, self._goto, self._fail, self._output
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def iter_matches(self, text, whole_words=False):
+        """
+        Yields every pattern occurrence in the text.
+
+        Args:
+            text (str): Text to scan
+            whole_words (bool): If True, only report occurrences that are not
+                glued to a neighbouring word character on either side
+
+        Yields:
+            tuple: (start, end, pattern_id) ordered by end offset
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        patterns = self.patterns
+        text_length = len(text)
+        state = 0
+
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if not output[state]:
+                continue
+
+            end = index + 1
+            for pattern_id in output[state]:
+                start = end - len(patterns[pattern_id])
+                if whole_words and (
+                    (start > 0 and _is_word_char(text[start - 1]))
+                    or (end < text_length and _is_word_char(text[end]))
+                ):
+                    continue
+                yield start, end, pattern_id
+
+    def find_ids(self, text, whole_words=False):
+        """
+        Returns the IDs of all patterns occurring in the text.
+
+        Args:
+            text (str): Text to scan
+            whole_words (bool): See iter_matches
+
+        Returns:
+            list: Distinct pattern IDs in ascending order
+        """
+        return sorted({pattern_id for _, _, pattern_id in self.iter_matches(text, whole_words)})
@@ -0,0 +1,316 @@
+"""
+Metrics Module
+Low-overhead latency histograms and counters, exposed in Prometheus text format
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+# SRS_METRICS=0 turns every observation into a no-op and hides /metrics
+METRICS_ENABLED = os.environ.get('SRS_METRICS', '1') != '0'
+
+# Upper bounds in seconds; analysis stages take microseconds, PDFs seconds
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Upper bounds in bytes for request and response bodies
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _escape(value):
+    """Escapes a label value as the text format requires."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=None):
+    """Renders {name="value",...} for one series."""
+    pairs = list(zip(labelnames, labels))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Bucketed distribution of observed values, one series per label tuple.
+
+    observe() takes one lock and does a binary search; bucket counts are
+    only made cumulative when rendered.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): HELP line
+            buckets (tuple): Sorted bucket upper bounds; +Inf is implicit
+            labelnames (tuple): Label names, matched positionally by observe()
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, labels=()):
+        """
+        Records one value.
+
+        Args:
+            value (float): Observed value
+            labels (tuple): Label values, in labelnames order
+        """
+        if not METRICS_ENABLED:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def reset(self):
+        """Drops every recorded value."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        """Returns the exposition lines of every series."""
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+
+        lines = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.labelnames, labels, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+class Counter:
+    """Monotonic count, one series per label tuple."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, labels=(), amount=1):
+        """
+        Adds to the count.
+
+        Args:
+            labels (tuple): Label values, in labelnames order
+            amount (int): Increment
+        """
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def reset(self):
+        """Drops every recorded count."""
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        with self._lock:
+            snapshot = sorted(self._series.items())
+        return [f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}'
+                for labels, value in snapshot]
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose value is read from the application at scrape time,
+    e.g. the number of live sessions. Nothing is recorded on the hot path.
+    """
+
+    def __init__(self, name, help_text, kind, callback, labelnames=()):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): HELP line
+            kind (str): 'gauge' or 'counter'
+            callback (callable): Returns a number, or a dict mapping label
+                values (a tuple, or a string for a single label) to numbers
+            labelnames (tuple): Label names
+        """
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.callback = callback
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        try:
+            value = self.callback()
+        except Exception as e:
+            print(f"Metric {self.name} unavailable: {e}")
+            return []
+        if not isinstance(value, dict):
+            return [f'{self.name} {_format_value(value)}']
+        return [
+            f'{self.name}{_format_labels(self.labelnames, labels if isinstance(labels, tuple) else (labels,))} '
+            f'{_format_value(series_value)}'
+            for labels, series_value in sorted(value.items())
+        ]
+
+
+class Registry:
+    """Ordered collection of metrics rendered together by /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        """
+        Adds a metric, replacing any metric of the same name.
+
+        Returns:
+            The metric, for assignment at module level
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def reset(self):
+        """Drops the values recorded so far, e.g. by warmup requests; callback metrics are unaffected."""
+        for metric in list(self._metrics.values()):
+            if hasattr(metric, 'reset'):
+                metric.reset()
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text, newline-terminated
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Shared registry and the metrics recorded across modules
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'srs_stage_duration_seconds',
+    'Time spent in each analysis stage.',
+    LATENCY_BUCKETS, ('stage',)
+))
+
+# Per-thread stage totals of the request being profiled, if any
+_breakdown = threading.local()
+
+
+def observe_stage(stage, seconds):
+    """
+    Records the duration of one analysis stage.
+
+    Args:
+        stage (str): Stage name, e.g. 'detection' or 'pdf_render'
+        seconds (float): Elapsed time
+    """
+    STAGE_SECONDS.observe(seconds, (stage,))
+    totals = getattr(_breakdown, 'totals', None)
+    if totals is not None:
+        entry = totals.setdefault(stage, {'count': 0, 'seconds': 0.0})
+        entry['count'] += 1
+        entry['seconds'] += seconds
+
+
+@contextmanager
+def stage_breakdown():
+    """
+    Collects the stages observed on this thread while the block runs.
+
+    Yields:
+        dict: {stage: {'count': ..., 'seconds': ...}}, filled in as stages finish
+    """
+    totals = {}
+    _breakdown.totals = totals
+    try:
+        yield totals
+    finally:
+        _breakdown.totals = None
+
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Times the enclosed block as one observation of a stage.
+
+    Args:
+        stage (str): Stage name
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, perf_counter() - start)
+
+
+def timed_iter(stage, iterable):
+    """
+    Wraps a lazy iterator, timing only the work done inside it.
+
+    The time spent producing the items is recorded as one observation when
+    the iterator is exhausted, closed or fails, so stages interleaved with
+    the consumer (e.g. streaming segmentation) are measured without the
+    consumer's time. Closing the wrapper closes the wrapped iterator.
+
+    Args:
+        stage (str): Stage name
+        iterable: Iterable to wrap
+
+    Yields:
+        Items of the iterable
+    """
+    iterator = iter(iterable)
+    elapsed = 0.0
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                elapsed += perf_counter() - start
+                break
+            elapsed += perf_counter() - start
+            yield item
+    finally:
+        if hasattr(iterator, 'close'):
+            iterator.close()
+        observe_stage(stage, elapsed)
@@ -5,15 +5,186 @@ Compatible with Python 3.8+
 from fpdf import FPDF
 import os
 from datetime import datetime
-import re
+import hashlib
+import json
+import tempfile
+import threading
+from collections import OrderedDict
 
-def generate_improved_srs_pdf(session, filename="improved_srs.pdf"):
+from metrics import stage_timer
+from analyzer import RequirementTable
+from clarifications import improve_requirements
+
+
+class PdfRenderCache:
+    """
+    Rendered PDF bytes keyed by a hash of the content they were rendered from.
+
+    A size-bounded in-memory LRU tier is backed by an optional on-disk tier
+    (one <key>.pdf file per entry) that survives restarts and can be shared
+    by workers on the same host. If the directory cannot be created, only
+    the memory tier is used.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, disk_dir=None, max_disk_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._counts = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+        if disk_dir:
+            try:
+                os.makedirs(disk_dir, exist_ok=True)
+            except OSError as e:
+                print(f"PDF cache directory unavailable, caching in memory only: {e}")
+                self.disk_dir = None
+
+    def get(self, key):
+        """Return cached PDF bytes for a content key, or None"""
+        with self._lock:
+            pdf_bytes = self._entries.get(key)
+            if pdf_bytes is not None:
+                self._entries.move_to_end(key)
+                self._counts['hits'] += 1
+                return pdf_bytes
+
+        pdf_bytes = self._read_disk(key)
+        with self._lock:
+            if pdf_bytes is None:
+                self._counts['misses'] += 1
+                return None
+            self._counts['disk_hits'] += 1
+            self._remember(key, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        """Store rendered PDF bytes under a content key"""
+        with self._lock:
+            self._remember(key, pdf_bytes)
+        self._write_disk(key, pdf_bytes)
+
+    def stats(self):
+        """Return hit/miss counts and tier occupancy"""
+        with self._lock:
+            lookups = sum(self._counts.values())
+            hits = self._counts['hits'] + self._counts['disk_hits']
+            return dict(
+                self._counts,
+                hit_rate=round(hits / lookups, 4) if lookups else 0.0,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                disk_dir=self.disk_dir,
+            )
+
+    def _remember(self, key, pdf_bytes):
+        """Add to the memory tier, evicting least recently used entries (lock held)"""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        if len(pdf_bytes) > self.max_bytes:
+            return
+        self._entries[key] = pdf_bytes
+        self._bytes += len(pdf_bytes)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, pdf_bytes):
+        """Write atomically, then trim the oldest files beyond max_disk_bytes"""
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(pdf_bytes)
+            os.replace(tmp_path, self._path(key))
+
+            files = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith('.pdf')]
+            total = sum(entry.stat().st_size for entry in files)
+            for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+                if total <= self.max_disk_bytes:
+                    break
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+        except OSError as e:
+            print(f"PDF cache write error: {e}")
+
+
+# Shared render cache (SRS_PDF_CACHE_DIR enables the on-disk tier)
+render_cache = PdfRenderCache(
+    max_bytes=int(os.environ.get('SRS_PDF_CACHE_BYTES', 32 * 1024 * 1024)),
+    disk_dir=os.environ.get('SRS_PDF_CACHE_DIR') or None,
+    max_disk_bytes=int(os.environ.get('SRS_PDF_CACHE_DISK_BYTES', 512 * 1024 * 1024))
+)
+
+
+def render_cache_key(session):
+    """
+    Hash everything the PDF body is rendered from: each requirement's text,
+    category and ambiguous terms, plus the clarifications in order
+    """
+    requirements = RequirementTable.load(session['requirements'])
+    content = {
+        'requirements': [
+            [requirements.text(index), requirements.category(index), requirements.ambiguous(index)]
+            for index in range(len(requirements))
+        ],
+        'clarifications': list(session['clarifications'].items()),
+    }
+    encoded = json.dumps(content, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def generate_improved_srs_pdf(session, filename="improved_srs.pdf", generated_at=None, use_cache=True):
     """
     Generate PDF using FPDF2 and return bytes
+
+    Identical content is served from render_cache, keeping the
+    "Generated" date of the first render. Otherwise, passing the same
+    generated_at timestamp again reproduces byte-identical output.
+    """
+    if not use_cache:
+        with stage_timer('pdf_render'):
+            return render_improved_srs_pdf(session, generated_at)
+
+    key = render_cache_key(session)
+    pdf_bytes = render_cache.get(key)
+    if pdf_bytes is None:
+        with stage_timer('pdf_render'):
+            pdf_bytes = render_improved_srs_pdf(session, generated_at)
+        render_cache.put(key, pdf_bytes)
+    return pdf_bytes
+
+
+def render_improved_srs_pdf(session, generated_at=None):
+    """
+    Render the improved SRS PDF from scratch and return bytes
     """
     try:
         # Create PDF instance
+        if generated_at is None:
+            generated_at = datetime.now().astimezone()
+
+        requirements = RequirementTable.load(session['requirements'])
+
         pdf = FPDF()
+        pdf.set_creation_date(generated_at)
         pdf.set_auto_page_break(auto=True, margin=15)
         pdf.add_page()
         
@@ -27,9 +198,9 @@ def generate_improved_srs_pdf(session, filename="improved_srs.pdf"):
         pdf.set_font('helvetica', '', 10)
         pdf.set_text_color(0, 0, 0)
         
-        date_str = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+        date_str = generated_at.strftime('%B %d, %Y at %I:%M %p')
         pdf.cell(0, 6, f"Generated: {date_str}", new_x="LMARGIN", new_y="NEXT")
-        pdf.cell(0, 6, f"Total Requirements: {len(session['requirements'])}", new_x="LMARGIN", new_y="NEXT")
+        pdf.cell(0, 6, f"Total Requirements: {len(requirements)}", new_x="LMARGIN", new_y="NEXT")
         pdf.cell(0, 6, f"Clarifications Provided: {len(session['clarifications'])}", new_x="LMARGIN", new_y="NEXT")
         pdf.ln(10)
 
@@ -59,15 +230,13 @@ def generate_improved_srs_pdf(session, filename="improved_srs.pdf"):
         pdf.cell(0, 10, 'Improved Requirements', new_x="LMARGIN", new_y="NEXT")
         pdf.ln(2)
         
-        for i, req_data in enumerate(session['requirements'], 1):
-            
-            # Improve text
-            improved_text = req_data['original']
-            for ambiguous_word in req_data['ambiguous']:
-                if ambiguous_word in session['clarifications']:
-                    user_clarification = session['clarifications'][ambiguous_word]
-                    pattern = re.compile(re.escape(ambiguous_word), re.IGNORECASE)
-                    improved_text = pattern.sub(user_clarification, improved_text, count=1)
+        # Improved texts are computed once by generate_final_improvements
+        improved_requirements = session.get('improved_requirements')
+        if improved_requirements is None:
+            improved_requirements = improve_requirements(requirements, session['clarifications'])
+        
+        for i, improved_text in enumerate(improved_requirements, 1):
+            original = requirements.text(i - 1)
             
             # Header
             pdf.set_font('helvetica', 'B', 12)
@@ -76,17 +245,17 @@ def generate_improved_srs_pdf(session, filename="improved_srs.pdf"):
             if pdf.get_y() > 250:
                 pdf.add_page()
                 
-            pdf.cell(0, 8, f"Requirement {i} - {req_data['category']}", new_x="LMARGIN", new_y="NEXT")
+            pdf.cell(0, 8, f"Requirement {i} - {requirements.category(i - 1)}", new_x="LMARGIN", new_y="NEXT")
             
             # Before
             pdf.set_font('helvetica', 'B', 11)
             pdf.set_text_color(0, 0, 0)
             pdf.write(6, "Before: ")
             pdf.set_font('helvetica', '', 11)
-            pdf.multi_cell(0, 6, req_data['original'])
+            pdf.multi_cell(0, 6, original)
             
             # After
-            if improved_text != req_data['original']:
+            if improved_text != original:
                 pdf.set_font('helvetica', 'B', 11)
                 pdf.write(6, "After: ")
                 pdf.set_font('helvetica', '', 11)
@@ -104,7 +273,7 @@ def generate_improved_srs_pdf(session, filename="improved_srs.pdf"):
             pdf.set_text_color(0, 0, 0)
 
         # Return bytes
-        return pdf.output()
+        return bytes(pdf.output())
         
     except Exception as e:
         print(f"Error generating PDF: {str(e)}")
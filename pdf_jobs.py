@@ -0,0 +1,225 @@
+"""
+PDF Job Queue Module
+Renders improved SRS PDFs on background worker threads
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_generator import generate_improved_srs_pdf
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class PdfJob:
+    """One PDF rendering job and the session content it renders."""
+
+    __slots__ = (
+        'id', 'session_id', 'filename', 'generated_at', 'snapshot', 'state',
+        'error', 'submitted_at', 'started_at', 'finished_at', 'future',
+    )
+
+    def __init__(self, session_id, filename, generated_at, snapshot, now):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.filename = filename
+        self.generated_at = generated_at
+        self.snapshot = snapshot
+        self.state = QUEUED
+        self.error = None
+        self.submitted_at = now
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def to_dict(self):
+        """
+        Returns the job status reported by the /jobs endpoint.
+
+        Returns:
+            dict: job_id, state, filename, error and timings in seconds
+        """
+        status = {
+            'job_id': self.id,
+            'state': self.state,
+            'filename': self.filename,
+        }
+        if self.error:
+            status['error'] = self.error
+        if self.started_at is not None:
+            status['queued_seconds'] = round(self.started_at - self.submitted_at, 3)
+        if self.finished_at is not None and self.started_at is not None:
+            status['render_seconds'] = round(self.finished_at - self.started_at, 3)
+        return status
+
+    def render(self):
+        """
+        Returns the PDF bytes, normally straight from the render cache.
+
+        Returns:
+            bytes: Rendered PDF
+        """
+        return generate_improved_srs_pdf(self.snapshot, self.filename, self.generated_at)
+
+
+class PdfJobQueue:
+    """
+    Bounded queue of PDF rendering jobs run by a thread pool.
+
+    At most max_depth jobs may be queued or running at once; submit()
+    returns None beyond that so the caller can render synchronously.
+    A job that has not finished timeout_seconds after submission is
+    reported as failed and its result discarded. Finished jobs are kept
+    for retention_seconds so clients can poll and download them.
+    """
+
+    def __init__(self, workers=2, max_depth=32, timeout_seconds=60, retention_seconds=600,
+                 clock=time.monotonic):
+        """
+        Args:
+            workers (int): Rendering threads; 0 disables background rendering
+            max_depth (int): Maximum number of queued or running jobs
+            timeout_seconds (float): Time allowed from submission to completion
+            retention_seconds (float): How long finished jobs stay available
+            clock (callable): Monotonic time source, in seconds
+        """
+        self.workers = workers
+        self.max_depth = max_depth
+        self.timeout_seconds = timeout_seconds
+        self.retention_seconds = retention_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pdf') if workers > 0 else None
+        self._counts = {'submitted': 0, 'rejected': 0, DONE: 0, FAILED: 0, CANCELLED: 0, 'timed_out': 0}
+
+    def submit(self, session_id, session, filename, generated_at):
+        """
+        Queues a PDF render of the session's current requirements and clarifications.
+
+        Args:
+            session_id (str): Session the PDF belongs to
+            session (Mapping): Session object
+            filename (str): Download file name
+            generated_at (datetime): Timestamp printed in the PDF
+
+        Returns:
+            PdfJob or None: The queued job, or None if the queue is full or disabled
+        """
+        if self._executor is None:
+            return None
+
+        # Snapshot what the PDF is rendered from so later turns cannot race the worker
+        snapshot = {
+            'requirements': session['requirements'],  # RequirementTable, immutable
+            'clarifications': dict(session['clarifications']),
+            'improved_requirements': session.get('improved_requirements'),
+        }
+
+        with self._lock:
+            now = self._clock()
+            self._sweep(now)
+            depth = sum(1 for job in self._jobs.values() if job.state in (QUEUED, RUNNING))
+            if depth >= self.max_depth:
+                self._counts['rejected'] += 1
+                return None
+
+            job = PdfJob(session_id, filename, generated_at, snapshot, now)
+            self._jobs[job.id] = job
+            self._counts['submitted'] += 1
+            job.future = self._executor.submit(self._run, job)
+            return job
+
+    def get(self, job_id):
+        """
+        Returns a job with its timeout applied.
+
+        Args:
+            job_id (str): Job ID
+
+        Returns:
+            PdfJob or None: The job, or None if unknown or purged
+        """
+        with self._lock:
+            self._sweep(self._clock())
+            return self._jobs.get(job_id)
+
+    def cancel_session(self, session_id):
+        """
+        Cancels every unfinished job of a session, e.g. when the session expires.
+
+        Args:
+            session_id (str): Session ID
+        """
+        with self._lock:
+            now = self._clock()
+            for job in self._jobs.values():
+                if job.session_id == session_id and job.state not in FINISHED_STATES:
+                    job.future.cancel()
+                    self._finish(job, CANCELLED, now, 'Session expired')
+
+    def stats(self):
+        """
+        Returns queue depth and job outcome counters for monitoring.
+
+        Returns:
+            dict: workers, depth, limits and counts per outcome
+        """
+        with self._lock:
+            self._sweep(self._clock())
+            return dict(
+                self._counts,
+                workers=self.workers,
+                queued=sum(1 for job in self._jobs.values() if job.state == QUEUED),
+                running=sum(1 for job in self._jobs.values() if job.state == RUNNING),
+                max_depth=self.max_depth,
+            )
+
+    def _run(self, job):
+        """Worker body: renders the job unless it was cancelled or timed out while queued."""
+        with self._lock:
+            if job.state != QUEUED:
+                return
+            job.state = RUNNING
+            job.started_at = self._clock()
+
+        try:
+            job.render()
+            outcome, error = DONE, None
+        except Exception as e:
+            print(f"PDF job {job.id} failed: {e}")
+            outcome, error = FAILED, str(e)
+
+        with self._lock:
+            # A timeout or cancellation while rendering wins; the bytes stay cached
+            if job.state == RUNNING:
+                self._finish(job, outcome, self._clock(), error)
+
+    def _finish(self, job, state, now, error=None):
+        """Records a job outcome (lock held)."""
+        job.state = state
+        job.error = error
+        job.finished_at = now
+        if state != DONE:
+            job.snapshot = None
+        self._counts[state] += 1
+
+    def _sweep(self, now):
+        """Fails overdue jobs and forgets old finished ones (lock held)."""
+        for job_id, job in list(self._jobs.items()):
+            if job.state not in FINISHED_STATES:
+                if now - job.submitted_at > self.timeout_seconds:
+                    job.future.cancel()
+                    self._finish(job, FAILED, now, f'Timed out after {self.timeout_seconds:g} seconds')
+                    self._counts['timed_out'] += 1
+            elif now - job.finished_at > self.retention_seconds:
+                del self._jobs[job_id]
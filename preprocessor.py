@@ -4,6 +4,7 @@ Provides NLP utilities for text cleaning and tokenization
 """
 
 import re
+from itertools import islice
 
 
 def preprocess_text(text):
@@ -91,9 +92,262 @@ def normalize_whitespace(text):
     Returns:
         str: Text with normalized whitespace
     """
-    # Replace multiple spaces with single space
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    # Replace multiple spaces with single space; str.split() splits on
+    # exactly the characters \s matches, without the regex overhead
+    return ' '.join(text.split())
+
+
+# Candidate requirement boundaries, found in one left-to-right pass. Which
+# of them really end a requirement is decided by RequirementSegmenter.
+# Every branch starts with a literal or a character class, which lets the
+# regex engine skip quickly over plain text.
+SEGMENT_TOKEN_PATTERN = re.compile(r"""
+      \n(?P<paragraph>)(?=[ \t\r\f\v]*\n)                 # blank line follows
+    | \n[ \t]*                                            # list marker starting a line
+      (?:(?P<line_number>\d{1,9})[.)]|(?P<line_bullet>[•*\-]))\s+
+    | \s                                                  # list marker inside a line
+      (?:(?P<number>\d{1,9})[.)]|(?P<bullet>[•*\-]))\s+
+    | [.!?][.!?]*(?=\s|\Z)                                 # end of a sentence
+""", re.VERBOSE)
+
+# List marker on the document's first line, which has no newline before it
+LEADING_MARKER_PATTERN = re.compile(r'[ \t]*(?:(?P<line_number>\d{1,9})[.)]|(?P<line_bullet>[•*\-]))\s+')
+LEADING_MARKER_PREFIX_PATTERN = re.compile(r'[ \t]*(?:\d{0,9}[.)]?|[•*\-])')
+
+NON_SPACE_PATTERN = re.compile(r'\S')
+
+# Characters of a boundary besides whitespace and digits
+BOUNDARY_CHARS = frozenset('.!?)•*-')
+
+# Segments this short (after trimming) are headings or debris, not requirements
+MIN_REQUIREMENT_LENGTH = 16
+
+# Maximum number of requirements extract_requirements returns
+MAX_REQUIREMENTS = 50
+
+
+class RequirementSegmenter:
+    """
+    Single-pass state machine splitting an SRS document into requirements.
+    
+    Numbered items, bullets and blank lines delimit requirements, and so
+    do sentence ends in prose outside list items, so one document may mix
+    lists and prose. A list item is one requirement however many sentences
+    it has; it runs until the next list marker or blank line. A list
+    marker at the start of a line always starts an item, and so does a
+    '•' or a marker right after a sentence end. In text without line
+    structure (e.g. whose newlines were collapsed) a marker inside a line
+    also counts when it continues the current list: the next number, or
+    the bullet character in use. A rejected "12. " is still a sentence
+    end, so "within 12. Users" keeps its number. "99.9" and
+    "user-friendly" never split.
+    
+    The segmenter keeps its state between calls to scan(), so a document
+    can be fed in chunks; see iter_chunked_requirements.
+    """
+    
+    __slots__ = (
+        'start', 'position', 'at_document_start', 'list_marker', 'last_number', 'has_lines',
+        'in_item', 'sentence_end',
+    )
+    
+    def __init__(self):
+        self.start = 0  # start of the current segment
+        self.position = 0  # where scanning resumes
+        self.at_document_start = True
+        self.list_marker = None  # 'number' or the bullet character of the current list
+        self.last_number = 0
+        self.has_lines = False  # whether list items start on new lines
+        self.in_item = False  # whether the current segment is a list item
+        self.sentence_end = 0  # end of the last sentence inside the current item
+    
+    def scan(self, text, final=True):
+        """
+        Yields the spans of the requirements completed in text.
+        
+        Args:
+            text (str): Document text; start and position index into it
+            final (bool): Whether text reaches the end of the document. If
+                not, scanning stops before any boundary that more text
+                could extend, and resumes there on the next call.
+            
+        Yields:
+            tuple: (start, end) offsets of each requirement, whitespace-trimmed
+        """
+        length = len(text)
+        
+        if self.at_document_start:
+            match = LEADING_MARKER_PATTERN.match(text)
+            if not final and (match.end() >= length if match else LEADING_MARKER_PREFIX_PATTERN.fullmatch(text)):
+                return  # the first line might still turn out to be a list item
+            self.at_document_start = False
+            if match:
+                self._enter_list(match.group(match.lastgroup), match.lastgroup == 'line_number')
+                self.start = self.position = match.end()
+        
+        for match in SEGMENT_TOKEN_PATTERN.finditer(text, self.position):
+            boundary_end = match.end()
+            if boundary_end >= length and not final:
+                break
+            self.position = boundary_end
+            boundary_start = match.start()
+            kind = match.lastgroup
+            
+            if kind == 'line_number' or kind == 'line_bullet':
+                self.has_lines = True
+                self._enter_list(match.group(kind), kind == 'line_number')
+            elif kind == 'number' or kind == 'bullet':
+                marker = match.group(kind)
+                if marker == '•':
+                    continues_list = True
+                elif self.has_lines:
+                    continues_list = False
+                elif kind == 'number':
+                    continues_list = self.list_marker == 'number' and int(marker) == self.last_number + 1
+                else:
+                    continues_list = marker == self.list_marker
+                after_sentence = not NON_SPACE_PATTERN.search(
+                    text, max(self.start, self.sentence_end), boundary_start
+                )
+                if continues_list or after_sentence:
+                    self._enter_list(marker, kind == 'number')
+                elif kind == 'number' and text[match.end(kind)] == '.':
+                    # Not a list item, but still the end of a sentence
+                    boundary_start = match.end(kind)
+                    boundary_end = boundary_start + 1
+                    if self.in_item:
+                        self.sentence_end = boundary_end
+                        continue
+                else:
+                    continue
+            elif kind == 'paragraph':
+                self.in_item = False
+            elif self.in_item:
+                # The sentences of a list item stay one requirement
+                self.sentence_end = boundary_end
+                continue
+            
+            segment = _trim(text, self.start, boundary_start)
+            if segment is not None:
+                yield segment
+            self.start = boundary_end
+        
+        if final:
+            segment = _trim(text, self.start, length)
+            if segment is not None:
+                yield segment
+            self.start = self.position = length
+        else:
+            # Only the trailing run of boundary characters can still grow
+            # into a boundary, so the next call resumes there
+            self.position = max(self.position, _boundary_tail_start(text, length))
+    
+    def _enter_list(self, marker, numbered):
+        self.in_item = True
+        if numbered:
+            self.list_marker = 'number'
+            self.last_number = int(marker)
+        else:
+            self.list_marker = marker
+    
+    def rebase(self, offset):
+        """Shifts the saved offsets after the first offset characters of the text are dropped."""
+        self.start -= offset
+        self.position -= offset
+        self.sentence_end -= offset
+
+
+def _boundary_tail_start(text, end):
+    """Returns where the run of characters that SEGMENT_TOKEN_PATTERN can match ends text[:end]."""
+    start = end
+    while start > 0:
+        char = text[start - 1]
+        if not (char in BOUNDARY_CHARS or char.isspace() or char.isdecimal()):
+            break
+        start -= 1
+    return start
+
+
+def _trim(text, start, end):
+    """Returns (start, end) without surrounding whitespace, or None for a too-short segment."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if end - start < MIN_REQUIREMENT_LENGTH:
+        return None
+    return start, end
+
+
+def iter_requirement_spans(text):
+    """
+    Lazily yields the position of each requirement in an SRS document.
+    
+    Args:
+        text (str): Full SRS document text, newlines intact
+        
+    Yields:
+        tuple: (start, end) offsets into text, whitespace-trimmed
+    """
+    return RequirementSegmenter().scan(text)
+
+
+def iter_requirements(text):
+    """
+    Lazily yields individual requirements from an SRS document, without any limit.
+    
+    Args:
+        text (str): Full SRS document text, newlines intact
+        
+    Yields:
+        str: Whitespace-normalized requirement statements
+    """
+    for start, end in RequirementSegmenter().scan(text):
+        yield normalize_whitespace(text[start:end])
+
+
+def iter_chunked_requirements(chunks):
+    """
+    Lazily yields requirements from a document read in chunks.
+    
+    Only the current requirement and one chunk are held in memory, and
+    the output equals iter_requirements on the whole text.
+    
+    Args:
+        chunks: Iterable of text chunks, in document order
+        
+    Yields:
+        str: Whitespace-normalized requirement statements
+    """
+    segmenter = RequirementSegmenter()
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        for start, end in segmenter.scan(buffer, final=False):
+            yield normalize_whitespace(buffer[start:end])
+        # Keep only the open segment
+        offset = segmenter.start
+        if offset:
+            buffer = buffer[offset:]
+            segmenter.rebase(offset)
+    
+    for start, end in segmenter.scan(buffer):
+        yield normalize_whitespace(buffer[start:end])
+
+
+def extract_requirements(text, limit=MAX_REQUIREMENTS):
+    """
+    Extract individual requirements from SRS document
+    
+    Args:
+        text: Full SRS document text
+        limit: Maximum number of requirements (None for no limit)
+        
+    Returns:
+        list: Individual requirement statements (at most limit)
+    """
+    # Limit to 50 requirements by default to avoid overwhelming
+    return list(islice(iter_requirements(text), limit))
 
 
 if __name__ == "__main__":
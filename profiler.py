@@ -0,0 +1,274 @@
+"""
+Request Profiler Module
+Opt-in cProfile capture of single requests, kept in a bounded spool directory
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from metrics import stage_breakdown
+
+# Request header that asks for a profile; its value must equal the operator token
+PROFILE_HEADER = 'X-SRS-Profile'
+
+# Profile IDs are generated here; anything else is rejected before touching the disk
+PROFILE_ID_PATTERN = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+
+# Functions listed in each profile's summary, by cumulative time
+TOP_FUNCTIONS = 25
+
+
+class ProfileSpool:
+    """
+    Directory of saved profiles, trimmed to the newest max_files and max_bytes.
+
+    Each profile is stored as <id>.prof (pstats format, readable by
+    `python -m pstats`, snakeviz or flameprof) next to <id>.json holding
+    the request, timings, stage breakdown and top functions. The directory
+    is created with mode 0700; one that belongs to another user or is open
+    to others is refused, both for saving and for serving profiles.
+    """
+
+    def __init__(self, directory, max_files=50, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            directory (str): Spool directory, created private if missing
+            max_files (int): Maximum number of profiles kept
+            max_bytes (int): Maximum total size of the spool
+        """
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def save(self, profile, metadata):
+        """
+        Writes a profile and its metadata, then trims the spool.
+
+        Args:
+            profile (cProfile.Profile): Finished profile
+            metadata (dict): Request details and stage breakdown
+
+        Returns:
+            str: Profile ID, or None if the directory was refused
+        """
+        if not self.is_private():
+            return None
+        profile_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        summary = io.StringIO()
+        pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        metadata = dict(metadata, id=profile_id, top_functions=summary.getvalue())
+
+        with self._lock:
+            profile.dump_stats(self._path(profile_id, 'prof'))
+            # Metadata last and atomically: list() only shows complete profiles
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(metadata, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(profile_id, 'json'))
+            self._trim()
+
+        return profile_id
+
+    def is_private(self):
+        """
+        Creates the directory with mode 0700 and checks nobody else can use it.
+
+        Returns:
+            bool: True if profiles may be written to and served from it
+        """
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            stat = os.stat(self.directory)
+        except OSError as e:
+            print(f"Profile directory unavailable: {e}")
+            return False
+        if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+            print(f"Refusing profile directory {self.directory}: "
+                  f"it must belong to this user and not be accessible to others")
+            return False
+        return True
+
+    def list(self):
+        """
+        Returns the saved profiles, newest first.
+
+        Returns:
+            list: Metadata dicts without the top_functions text
+        """
+        profiles = []
+        for profile_id in self._ids():
+            metadata = self.metadata(profile_id)
+            if metadata is not None:
+                metadata.pop('top_functions', None)
+                profiles.append(metadata)
+        return profiles
+
+    def metadata(self, profile_id):
+        """
+        Returns one profile's metadata, or None if unknown.
+
+        Args:
+            profile_id (str): Profile ID
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id) or not self.is_private():
+            return None
+        try:
+            with open(self._path(profile_id, 'json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def profile_path(self, profile_id):
+        """
+        Returns the path of a saved .prof file, or None if unknown.
+
+        Args:
+            profile_id (str): Profile ID
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id) or not self.is_private():
+            return None
+        path = self._path(profile_id, 'prof')
+        return path if os.path.exists(path) else None
+
+    def _path(self, profile_id, extension):
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _ids(self):
+        """IDs of complete profiles, newest first (IDs sort by time)."""
+        if not self.is_private():
+            return []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        ids = {name[:-5] for name in names if name.endswith('.json')}
+        return sorted((i for i in ids if PROFILE_ID_PATTERN.match(i)), reverse=True)
+
+    def _trim(self):
+        """Deletes the oldest profiles beyond max_files or max_bytes (lock held)."""
+        total = 0
+        for index, profile_id in enumerate(self._ids()):
+            paths = [self._path(profile_id, 'json'), self._path(profile_id, 'prof')]
+            size = sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+            total += size
+            if index >= self.max_files or total > self.max_bytes:
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+
+class ProfilingMiddleware:
+    """
+    WSGI middleware running selected requests under cProfile.
+
+    A request is profiled when it carries PROFILE_HEADER with the operator
+    token, or at random with probability sample_rate, and its path is one
+    of the profiled paths. The response body is consumed inside the
+    profile, so streamed responses are fully covered but are delivered in
+    one piece. Unprofiled requests cost one path check and, with sampling
+    on, one random number. A request that cannot get the profiler because
+    another one holds it (Python 3.12+) is served unprofiled.
+    """
+
+    def __init__(self, wsgi_app, spool, token=None, sample_rate=0.0, paths=('/chat', '/analyze/batch')):
+        """
+        Args:
+            wsgi_app: Wrapped WSGI application
+            spool (ProfileSpool): Where profiles are saved
+            token (str): Operator token; None disables the header switch
+            sample_rate (float): Fraction of requests profiled without the header
+            paths (tuple): Request paths that may be profiled
+        """
+        self.wsgi_app = wsgi_app
+        self.spool = spool
+        self.token = token
+        self.sample_rate = sample_rate
+        self.paths = frozenset(paths)
+
+    def is_operator(self, environ):
+        """
+        Checks the request carries the operator token.
+
+        Args:
+            environ (dict): WSGI environment
+
+        Returns:
+            bool: True if a token is configured and the header matches it
+        """
+        if not self.token:
+            return False
+        supplied = environ.get('HTTP_' + PROFILE_HEADER.upper().replace('-', '_'), '')
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') not in self.paths:
+            return self.wsgi_app(environ, start_response)
+
+        if self.is_operator(environ):
+            trigger = 'header'
+        elif self.sample_rate > 0 and random.random() < self.sample_rate:
+            trigger = 'sample'
+        else:
+            return self.wsgi_app(environ, start_response)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+ runs one profiler at a time; another request holds it
+            print(f"Request not profiled: {e}")
+            return self.wsgi_app(environ, start_response)
+
+        # Lets the app keep work on this thread, e.g. batch analysis
+        environ['srs.profiling'] = True
+        status = []
+
+        def capture_start_response(status_line, headers, exc_info=None):
+            status.append(status_line)
+            return start_response(status_line, headers, exc_info)
+
+        started_at = datetime.now().astimezone()
+        started = time.perf_counter()
+        with stage_breakdown() as stages:
+            try:
+                body = self.wsgi_app(environ, capture_start_response)
+                try:
+                    chunks = list(body)
+                finally:
+                    if hasattr(body, 'close'):
+                        body.close()
+            finally:
+                profile.disable()
+        elapsed = time.perf_counter() - started
+
+        try:
+            self.spool.save(profile, {
+                'path': environ.get('PATH_INFO'),
+                'method': environ.get('REQUEST_METHOD'),
+                'status': status[0] if status else None,
+                'trigger': trigger,
+                'request_bytes': int(environ.get('CONTENT_LENGTH') or 0),
+                'response_bytes': sum(len(chunk) for chunk in chunks),
+                'started_at': started_at.isoformat(),
+                'duration_seconds': round(elapsed, 6),
+                'stages': stages,
+            })
+        except Exception as e:
+            print(f"Profile save error: {e}")
+
+        return chunks
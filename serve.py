@@ -0,0 +1,185 @@
+"""
+Production Server Entry Point
+Preforks gunicorn workers from a warmed-up parent, sharing its memory copy-on-write
+
+Usage:
+    pip install gunicorn
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+    gunicorn -c serve.py app:app
+
+The parent imports the app (which loads the lexicon and compiles its
+matchers), then runs the analysis and a PDF render once, so that regexes,
+caches and fpdf fonts are built before forking. The collector stays off
+until then; gc.freeze() moves everything allocated so far out of its
+reach, so workers never write to those pages and keep sharing them, and
+collection is switched back on. Each worker sends one
+warmup request through the whole /chat path before it takes traffic.
+Metrics recorded by the warmups are dropped.
+
+With several workers, sessions default to the shared SQLite backend
+and PDFs to inline rendering: a background job lives in the memory of
+one worker, and the next poll may reach another.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+# Gunicorn settings, also read when this file is passed as `gunicorn -c serve.py`
+bind = os.environ.get('SRS_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('SRS_WORKERS', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('SRS_WORKER_THREADS', 4))
+preload_app = True
+
+WARMUP_DOCUMENT = (
+    "1. The system shall respond fast and be user-friendly for all users.\n"
+    "2. The user can login using email and password.\n"
+    "3. Reports must load quickly and the service should be reliable and secure."
+)
+
+
+def configure_environment(worker_count):
+    """
+    Sets the defaults a multi-process deployment needs, unless already set.
+
+    Must run before the app is imported.
+
+    Args:
+        worker_count (int): Number of worker processes
+    """
+    if worker_count > 1:
+        os.environ.setdefault('SRS_SESSION_BACKEND', 'sqlite')
+        os.environ.setdefault('SRS_PDF_WORKERS', '0')
+
+
+def warm_up():
+    """
+    Builds everything lazily initialized on the request path, in this process.
+
+    Starts no threads and opens no session store connection, so it is
+    safe to fork afterwards.
+
+    Returns:
+        float: Seconds taken
+    """
+    started = time.perf_counter()
+
+    from analyzer import analyze_requirement, RequirementTable
+    from clarifications import improve_requirements
+    from pdf_generator import render_improved_srs_pdf
+    from preprocessor import extract_requirements
+    from app import app as flask_app
+
+    requirements = RequirementTable.build(
+        analyze_requirement(req).row() for req in extract_requirements(WARMUP_DOCUMENT)
+    )
+    clarifications = {
+        word: 'within 2 seconds'
+        for index in range(len(requirements)) for word in requirements.ambiguous(index)
+    }
+    improve_requirements(requirements, clarifications)
+    render_improved_srs_pdf({'requirements': requirements, 'clarifications': clarifications})
+
+    # Compiles the URL map's matcher
+    flask_app.url_map.bind('localhost').match('/chat', 'POST')
+
+    return time.perf_counter() - started
+
+
+def warmup_request(flask_app):
+    """
+    Sends one document through /chat in this process and discards its session.
+
+    Args:
+        flask_app (Flask): The application
+
+    Returns:
+        float: Seconds taken
+    """
+    from app import conversations
+    from metrics import REGISTRY
+
+    started = time.perf_counter()
+    response = flask_app.test_client().post('/chat', json={'message': WARMUP_DOCUMENT})
+    session_id = (response.get_json() or {}).get('session_id')
+    if response.status_code != 200:
+        print(f"Warmup request failed with status {response.status_code}")
+    if session_id:
+        conversations.delete(session_id)
+        conversations.flush()
+    REGISTRY.reset()
+    return time.perf_counter() - started
+
+
+def when_ready(server):
+    """Gunicorn hook: runs in the parent after the app is imported, before any worker is forked."""
+    seconds = warm_up()
+    # No gc.collect() first: the holes it leaves would be refilled by the
+    # workers, dirtying the shared pages around them
+    gc.freeze()
+    # The parent lives on, respawning workers, so it collects again from here
+    gc.enable()
+    from metrics import REGISTRY
+    REGISTRY.reset()
+    server.log.info(f"Warmed up in {seconds * 1000:.0f} ms; {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server, worker):
+    """Gunicorn hook: runs in each worker right after the fork."""
+    gc.enable()
+
+
+def post_worker_init(worker):
+    """Gunicorn hook: runs in each worker before it accepts connections."""
+    seconds = warmup_request(worker.wsgi)
+    worker.log.info(f"Worker {worker.pid} warmup request took {seconds * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the chatbot on preforked gunicorn workers")
+    parser.add_argument('--bind', '-b', default=bind, help=f"address to listen on (default {bind})")
+    parser.add_argument('--workers', '-w', type=int, default=workers,
+                        help=f"worker processes (default {workers})")
+    parser.add_argument('--threads', type=int, default=threads,
+                        help=f"request threads per worker (default {threads})")
+    args = parser.parse_args(argv)
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("The production server needs gunicorn: pip install gunicorn")
+
+    configure_environment(args.workers)
+    gc.disable()  # until the workers start, so nothing is freed between warmup and fork
+
+    class PreforkServer(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': args.bind,
+                'workers': args.workers,
+                'worker_class': worker_class,
+                'threads': args.threads,
+                'preload_app': preload_app,
+                'when_ready': when_ready,
+                'post_fork': post_fork,
+                'post_worker_init': post_worker_init,
+            }
+            for key, value in settings.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app as flask_app
+            return flask_app
+
+    PreforkServer().run()
+
+
+if __name__ == "__main__":
+    main()
+else:
+    # Loaded by gunicorn as its config file
+    configure_environment(workers)
+    gc.disable()
@@ -0,0 +1,562 @@
+"""
+Session Storage Module
+Pluggable conversation stores: a bounded in-memory store and a SQLite
+backend that lets several worker processes share sessions.
+
+Both stores expose the same interface: get(), put(), delete(), flush(),
+stats(), usage(), len() and the in operator.
+"""
+
+import heapq
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+def estimate_size(obj):
+    """
+    Estimates the memory held by a session object.
+
+    Walks dicts, lists, tuples, sets and the attributes of __slots__
+    objects recursively and adds up sys.getsizeof of every node. Shared
+    objects are counted once.
+
+    Args:
+        obj: Session dict or any nested value
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(type(item), '__slots__'):
+            stack.extend(getattr(item, name) for name in type(item).__slots__ if hasattr(item, name))
+
+    return total
+
+
+def encode_field(value):
+    """
+    Encodes a session field as JSON for the SQLite store.
+
+    Objects such as analyzer.RequirementTable are written through their
+    to_json() method; readers turn the result back with the class's load().
+
+    Args:
+        value: Session field value
+
+    Returns:
+        str: JSON text
+    """
+    return json.dumps(value, ensure_ascii=False, default=_to_json)
+
+
+def _to_json(obj):
+    to_json = getattr(obj, 'to_json', None)
+    if to_json is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_json()
+
+
+class SessionStore:
+    """
+    Conversation sessions keyed by session ID.
+
+    Sessions are kept in least-recently-used order. A session is dropped when
+    it has been idle for longer than ttl_seconds, or, oldest first, when the
+    store exceeds max_sessions entries or max_bytes of estimated memory.
+    """
+
+    def __init__(self, max_sessions=1000, max_bytes=256 * 1024 * 1024, ttl_seconds=3600,
+                 clock=time.monotonic):
+        """
+        Args:
+            max_sessions (int): Maximum number of sessions kept
+            max_bytes (int): Memory budget for all sessions, in bytes
+            ttl_seconds (float): Idle time after which a session expires
+            clock (callable): Monotonic time source, in seconds
+        """
+        self.max_sessions = max_sessions
+        # Called with the session ID of every expired or evicted session
+        self.on_evict = None
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # session_id -> (session, size in bytes, last access time)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._evictions = {'expired': 0, 'capacity': 0, 'memory': 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def get(self, session_id):
+        """
+        Returns a live session and marks it as recently used.
+
+        Args:
+            session_id (str): Session ID
+
+        Returns:
+            dict or None: The session, or None if unknown or expired
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+
+            session, size, _ = entry
+            self._entries[session_id] = (session, size, now)
+            self._entries.move_to_end(session_id)
+            return session
+
+    def put(self, session_id, session):
+        """
+        Stores a session after a turn, re-measuring its size.
+
+        Args:
+            session_id (str): Session ID
+            session (dict): Session object
+        """
+        size = estimate_size(session)
+
+        with self._lock:
+            now = self._clock()
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[session_id] = (session, size, now)
+            self._bytes += size
+
+            self._expire(now)
+            self._enforce_limits(keep=session_id)
+
+    def delete(self, session_id):
+        """
+        Removes a session if present.
+
+        Args:
+            session_id (str): Session ID
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def flush(self):
+        """Nothing to write back: sessions live in this process."""
+
+    def stats(self):
+        """
+        Returns occupancy and eviction counters for monitoring.
+
+        Returns:
+            dict: sessions, bytes, limits and eviction counts
+        """
+        with self._lock:
+            self._expire(self._clock())
+            return {
+                'backend': 'memory',
+                'sessions': len(self._entries),
+                'bytes': self._bytes,
+                'max_sessions': self.max_sessions,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': dict(self._evictions),
+            }
+
+    def usage(self, limit=20):
+        """
+        Returns the largest sessions with a per-field size breakdown.
+
+        Args:
+            limit (int): Number of sessions returned
+
+        Returns:
+            list: {'session_id', 'bytes', 'idle_seconds', 'fields': {field: bytes}},
+                largest first
+        """
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            largest = heapq.nlargest(limit, self._entries.items(), key=lambda item: item[1][1])
+
+        return [
+            {
+                'session_id': session_id,
+                'bytes': size,
+                'idle_seconds': round(now - last_access, 1),
+                'fields': {field: estimate_size(value) for field, value in list(session.items())},
+            }
+            for session_id, (session, size, last_access) in largest
+        ]
+
+    def _expire(self, now):
+        """Drops idle sessions. Entries are in access order, so only the oldest are checked."""
+        while self._entries:
+            session_id, (_, size, last_access) = next(iter(self._entries.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            del self._entries[session_id]
+            self._bytes -= size
+            self._evictions['expired'] += 1
+            self._notify_evicted(session_id)
+
+    def _enforce_limits(self, keep):
+        """Evicts least recently used sessions until both limits hold, never evicting keep."""
+        while len(self._entries) > self.max_sessions or self._bytes > self.max_bytes:
+            session_id = next(iter(self._entries))
+            if session_id == keep:
+                break
+            _, size, _ = self._entries.pop(session_id)
+            self._bytes -= size
+            if len(self._entries) >= self.max_sessions:
+                self._evictions['capacity'] += 1
+            else:
+                self._evictions['memory'] += 1
+            self._notify_evicted(session_id)
+
+    def _notify_evicted(self, session_id):
+        if self.on_evict is not None:
+            self.on_evict(session_id)
+
+
+class LazySession(MutableMapping):
+    """
+    Session view backed by SQLiteSessionStore.
+
+    Each top-level field is read from the database the first time a turn
+    touches it, so a clarification answer never loads the stored document
+    or message history it does not need.
+    """
+
+    def __init__(self, store, session_id):
+        self._store = store
+        self._session_id = session_id
+        # field -> decoded value for every field this turn has touched
+        self._fields = {}
+        # field -> JSON as stored, used to skip unchanged fields on write-back
+        self._loaded = {}
+        self._deleted = set()
+
+    def __getitem__(self, field):
+        if field in self._fields:
+            return self._fields[field]
+        if field in self._deleted:
+            raise KeyError(field)
+
+        raw = self._store._load_field(self._session_id, field)
+        if raw is None:
+            raise KeyError(field)
+
+        value = json.loads(raw)
+        self._fields[field] = value
+        self._loaded[field] = raw
+        return value
+
+    def __setitem__(self, field, value):
+        self._fields[field] = value
+        self._deleted.discard(field)
+
+    def __delitem__(self, field):
+        self[field]
+        del self._fields[field]
+        self._deleted.add(field)
+
+    def __iter__(self):
+        fields = set(self._store._field_names(self._session_id)) | set(self._fields)
+        return iter(sorted(fields - self._deleted))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def changes(self):
+        """
+        Returns the fields that differ from what is stored.
+
+        Returns:
+            tuple: (dict of field -> JSON to write, set of fields to delete)
+        """
+        updates = {}
+        for field, value in self._fields.items():
+            encoded = encode_field(value)
+            if encoded != self._loaded.get(field):
+                updates[field] = encoded
+        return updates, set(self._deleted)
+
+
+class SQLiteSessionStore:
+    """
+    Conversation sessions persisted in a SQLite database in WAL mode.
+
+    Any worker process pointing at the same file sees the same sessions.
+    Each process keeps a single connection. Sessions are stored one row
+    per top-level field, returned as LazySession views, and written back
+    in one transaction per flush() containing only the fields that changed.
+    """
+
+    _SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS sessions ('
+        ' session_id TEXT PRIMARY KEY,'
+        ' last_access REAL NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)',
+        'CREATE TABLE IF NOT EXISTS session_fields ('
+        ' session_id TEXT NOT NULL,'
+        ' field TEXT NOT NULL,'
+        ' value TEXT NOT NULL,'
+        ' PRIMARY KEY (session_id, field))',
+    )
+
+    def __init__(self, path, ttl_seconds=3600, clock=time.time):
+        """
+        Args:
+            path (str): Database file shared by all workers
+            ttl_seconds (float): Idle time after which a session expires
+            clock (callable): Wall-clock time source shared across processes
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        # Called with the session ID of every expired session
+        self.on_evict = None
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._connection = None
+        self._pid = None
+        # session_id -> session awaiting write-back
+        self._pending = {}
+        self._evictions = {'expired': 0}
+
+    def _connect(self):
+        """Returns this process's connection, reopening it after a fork."""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in self._SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def __len__(self):
+        with self._lock:
+            cutoff = self._clock() - self.ttl_seconds
+            row = self._connect().execute(
+                'SELECT COUNT(*) FROM sessions WHERE last_access >= ?', (cutoff,)
+            ).fetchone()
+            return row[0]
+
+    def __contains__(self, session_id):
+        return self.get(session_id) is not None
+
+    def get(self, session_id):
+        """
+        Returns a live session and refreshes its last access time.
+
+        Args:
+            session_id (str): Session ID
+
+        Returns:
+            MutableMapping or None: The session, or None if unknown or expired
+        """
+        with self._lock:
+            if session_id in self._pending:
+                return self._pending[session_id]
+
+            connection = self._connect()
+            now = self._clock()
+            row = connection.execute(
+                'SELECT last_access FROM sessions WHERE session_id = ?', (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[0] > self.ttl_seconds:
+                self._delete_rows(connection, [session_id])
+                self._evictions['expired'] += 1
+                if self.on_evict is not None:
+                    self.on_evict(session_id)
+                return None
+
+            connection.execute(
+                'UPDATE sessions SET last_access = ? WHERE session_id = ?', (now, session_id)
+            )
+            return LazySession(self, session_id)
+
+    def put(self, session_id, session):
+        """
+        Stages a session for write-back on the next flush().
+
+        Args:
+            session_id (str): Session ID
+            session (MutableMapping): Session from get() or a new dict
+        """
+        with self._lock:
+            self._pending[session_id] = session
+
+    def flush(self):
+        """Writes every staged session back in a single transaction."""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+
+            connection = self._connect()
+            now = self._clock()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                for session_id, session in pending.items():
+                    if isinstance(session, LazySession):
+                        updates, deleted = session.changes()
+                    else:
+                        updates = {field: encode_field(value) for field, value in session.items()}
+                        deleted = ()
+                    connection.execute(
+                        'INSERT INTO sessions (session_id, last_access) VALUES (?, ?) '
+                        'ON CONFLICT(session_id) DO UPDATE SET last_access = excluded.last_access',
+                        (session_id, now)
+                    )
+                    connection.executemany(
+                        'INSERT OR REPLACE INTO session_fields (session_id, field, value) VALUES (?, ?, ?)',
+                        [(session_id, field, value) for field, value in updates.items()]
+                    )
+                    connection.executemany(
+                        'DELETE FROM session_fields WHERE session_id = ? AND field = ?',
+                        [(session_id, field) for field in deleted]
+                    )
+                self._expire(connection, now)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+    def delete(self, session_id):
+        """
+        Removes a session if present.
+
+        Args:
+            session_id (str): Session ID
+        """
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._delete_rows(self._connect(), [session_id])
+
+    def stats(self):
+        """
+        Returns occupancy and eviction counters for monitoring.
+
+        Returns:
+            dict: sessions, database size and eviction counts
+        """
+        with self._lock:
+            connection = self._connect()
+            page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+            page_size = connection.execute('PRAGMA page_size').fetchone()[0]
+            return {
+                'backend': 'sqlite',
+                'sessions': len(self),
+                'bytes': page_count * page_size,
+                'pending_writes': len(self._pending),
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': dict(self._evictions),
+            }
+
+    def usage(self, limit=20):
+        """
+        Returns the largest sessions with a per-field size breakdown.
+
+        Sizes are those of the stored JSON.
+
+        Args:
+            limit (int): Number of sessions returned
+
+        Returns:
+            list: {'session_id', 'bytes', 'idle_seconds', 'fields': {field: bytes}},
+                largest first
+        """
+        with self._lock:
+            connection = self._connect()
+            now = self._clock()
+            largest = connection.execute(
+                'SELECT f.session_id, SUM(LENGTH(CAST(f.value AS BLOB))) AS size, s.last_access'
+                ' FROM session_fields f JOIN sessions s ON s.session_id = f.session_id'
+                ' WHERE s.last_access >= ? GROUP BY f.session_id ORDER BY size DESC LIMIT ?',
+                (now - self.ttl_seconds, limit)
+            ).fetchall()
+
+            sessions = []
+            for session_id, size, last_access in largest:
+                fields = connection.execute(
+                    'SELECT field, LENGTH(CAST(value AS BLOB)) FROM session_fields WHERE session_id = ?',
+                    (session_id,)
+                ).fetchall()
+                sessions.append({
+                    'session_id': session_id,
+                    'bytes': size,
+                    'idle_seconds': round(now - last_access, 1),
+                    'fields': dict(fields),
+                })
+            return sessions
+
+    def _load_field(self, session_id, field):
+        """Returns the stored JSON for one session field, or None."""
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT value FROM session_fields WHERE session_id = ? AND field = ?',
+                (session_id, field)
+            ).fetchone()
+            return row[0] if row else None
+
+    def _field_names(self, session_id):
+        """Returns the names of the stored fields of a session."""
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT field FROM session_fields WHERE session_id = ?', (session_id,)
+            ).fetchall()
+            return [row[0] for row in rows]
+
+    def _expire(self, connection, now):
+        """Deletes sessions idle for longer than the TTL."""
+        expired = [row[0] for row in connection.execute(
+            'SELECT session_id FROM sessions WHERE last_access < ?', (now - self.ttl_seconds,)
+        )]
+        if expired:
+            self._delete_rows(connection, expired)
+            self._evictions['expired'] += len(expired)
+            if self.on_evict is not None:
+                for session_id in expired:
+                    self.on_evict(session_id)
+
+    @staticmethod
+    def _delete_rows(connection, session_ids):
+        """Deletes the given sessions and all their fields."""
+        params = [(session_id,) for session_id in session_ids]
+        connection.executemany('DELETE FROM session_fields WHERE session_id = ?', params)
+        connection.executemany('DELETE FROM sessions WHERE session_id = ?', params)
@@ -4,6 +4,8 @@
 const chatMessages = document.getElementById('chat-messages');
 const userInput = document.getElementById('user-input');
 const sendBtn = document.getElementById('send-btn');
+const attachBtn = document.getElementById('attach-btn');
+const fileInput = document.getElementById('file-input');
 const typingIndicator = document.getElementById('typing-indicator');
 const charCount = document.getElementById('char-count');
 
@@ -11,8 +13,10 @@ const charCount = document.getElementById('char-count');
 // Configuration
 // ============================================
 const API_URL = '/chat';
+const UPLOAD_URL = '/chat/upload';
 const WELCOME_URL = '/welcome';
 let sessionId = null;
+let awaitingClarification = false;
 
 // ============================================
 // Initialize
@@ -95,24 +99,70 @@ async function sendMessage() {
     // Show typing indicator
     showTyping();
 
+    // Documents are streamed so results appear while analysis runs;
+    // clarification answers use the regular JSON reply
+    const stream = !awaitingClarification;
+
+    // Send to API
+    await sendRequest(() => fetch(API_URL, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': stream ? 'application/x-ndjson' : 'application/json',
+        },
+        body: JSON.stringify({
+            message: message,
+            session_id: sessionId,
+            stream: stream
+        }),
+    }));
+}
+
+// ============================================
+// File Upload
+// ============================================
+attachBtn.addEventListener('click', () => fileInput.click());
+
+fileInput.addEventListener('change', () => {
+    const file = fileInput.files[0];
+    fileInput.value = '';
+    if (file) {
+        uploadDocument(file);
+    }
+});
+
+async function uploadDocument(file) {
+    addUserMessage(`📎 Uploaded ${file.name}`);
+    showTyping();
+
+    // The server reads the file in chunks, so documents of any length are streamed
+    const form = new FormData();
+    form.append('file', file);
+    if (sessionId) {
+        form.append('session_id', sessionId);
+    }
+    form.append('stream', 'true');
+
+    await sendRequest(() => fetch(UPLOAD_URL, {
+        method: 'POST',
+        headers: { 'Accept': 'application/x-ndjson' },
+        body: form,
+    }));
+}
+
+async function sendRequest(send) {
     // Disable input while processing
     userInput.disabled = true;
     sendBtn.disabled = true;
+    attachBtn.disabled = true;
 
     try {
-        // Send to API
-        const response = await fetch(API_URL, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                message: message,
-                session_id: sessionId
-            }),
-        });
+        const response = await send();
 
-        const data = await response.json();
+        const isStream = (response.headers.get('Content-Type') || '').includes('application/x-ndjson');
+        const data = isStream && response.ok && response.body
+            ? await readAnalysisStream(response)
+            : await response.json();
 
         if (!response.ok) {
             throw new Error(data.error || 'Failed to get response');
@@ -120,6 +170,7 @@ async function sendMessage() {
 
         // Store session ID
         sessionId = data.session_id;
+        awaitingClarification = data.awaiting_clarification;
 
         // Hide typing indicator
         hideTyping();
@@ -139,10 +190,85 @@ async function sendMessage() {
         // Re-enable input
         userInput.disabled = false;
         sendBtn.disabled = false;
+        attachBtn.disabled = false;
         userInput.focus();
     }
 }
 
+// ============================================
+// Streamed Analysis
+// ============================================
+async function readAnalysisStream(response) {
+    // Reads NDJSON events, rendering each requirement as it arrives,
+    // and resolves with the final 'done' payload
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let progress = null;
+    let done = null;
+
+    const handleLine = (line) => {
+        if (!line.trim()) {
+            return;
+        }
+        const event = JSON.parse(line);
+
+        if (event.event === 'requirement') {
+            if (!progress) {
+                hideTyping();
+                progress = addStreamingMessage();
+            }
+            appendRequirementResult(progress, event.index, event.requirement);
+        } else if (event.event === 'done') {
+            done = event;
+        } else if (event.event === 'error') {
+            throw new Error(event.error);
+        }
+    };
+
+    while (true) {
+        const { value, done: finished } = await reader.read();
+        if (finished) {
+            break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+    }
+    handleLine(buffer + decoder.decode());
+
+    if (!done) {
+        throw new Error('Analysis stream ended unexpectedly');
+    }
+    return done;
+}
+
+function addStreamingMessage() {
+    const messageDiv = createMessageElement('bot', '🔎 **Analyzing requirements...**');
+    const list = document.createElement('div');
+    list.className = 'stream-results';
+    messageDiv.querySelector('.message-content').appendChild(list);
+    chatMessages.appendChild(messageDiv);
+    scrollToBottom();
+    return list;
+}
+
+function appendRequirementResult(list, index, requirement) {
+    const label = requirement.category === 'Functional Requirement' ? 'FR'
+        : requirement.category === 'Non-Functional Requirement' ? 'NFR' : '—';
+    const ambiguous = requirement.ambiguous.length
+        ? ` ⚠️ ${requirement.ambiguous.map(w => `"${w}"`).join(', ')}`
+        : ' ✅';
+
+    const row = document.createElement('div');
+    row.className = 'stream-result';
+    row.textContent = `${index}. [${label}] ${requirement.original}${ambiguous}`;
+    list.appendChild(row);
+    scrollToBottom();
+}
+
 // ============================================
 // Add Messages to Chat
 // ============================================
@@ -181,22 +307,12 @@ function createMessageElement(role, content, type = 'text', data = null) {
 
     // Add download button if type is 'download'
     if (type === 'download' && data) {
-        const downloadBtn = document.createElement('a');
-
-        if (data.pdf_base64) {
-            // Client-side download using Base64
-            downloadBtn.href = `data:application/pdf;base64,${data.pdf_base64}`;
-        } else if (data.download_url) {
-            // Fallback for legacy (or local)
-            downloadBtn.href = data.download_url;
-        }
+        appendDownloadButton(contentDiv, data.download_url, data.filename);
+    }
 
-        downloadBtn.className = 'download-btn';
-        downloadBtn.innerHTML = '📥 Download PDF';
-        downloadBtn.download = data.filename || 'improved_srs.pdf';
-        downloadBtn.target = '_blank';
-        contentDiv.appendChild(document.createElement('br'));
-        contentDiv.appendChild(downloadBtn);
+    // PDF still rendering on the server: poll until it can be downloaded
+    if (type === 'job' && data) {
+        pollPdfJob(contentDiv, data);
     }
 
     messageDiv.appendChild(avatar);
@@ -205,6 +321,48 @@ function createMessageElement(role, content, type = 'text', data = null) {
     return messageDiv;
 }
 
+function appendDownloadButton(contentDiv, downloadUrl, filename) {
+    const downloadBtn = document.createElement('a');
+
+    // PDF is served by the download endpoint (supports resumed downloads)
+    downloadBtn.href = downloadUrl;
+
+    downloadBtn.className = 'download-btn';
+    downloadBtn.innerHTML = '📥 Download PDF';
+    downloadBtn.download = filename || 'improved_srs.pdf';
+    downloadBtn.target = '_blank';
+    contentDiv.appendChild(document.createElement('br'));
+    contentDiv.appendChild(downloadBtn);
+    scrollToBottom();
+}
+
+async function pollPdfJob(contentDiv, data) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+
+        try {
+            const response = await fetch(data.status_url);
+            const status = await response.json();
+
+            if (!response.ok) {
+                throw new Error(status.error || 'Job not found');
+            }
+            if (status.state === 'done') {
+                appendDownloadButton(contentDiv, status.download_url, data.filename);
+                return;
+            }
+            if (status.state === 'failed' || status.state === 'cancelled') {
+                throw new Error(status.error || status.state);
+            }
+        } catch (error) {
+            console.error('PDF job error:', error);
+            contentDiv.appendChild(document.createElement('br'));
+            contentDiv.appendChild(document.createTextNode(`⚠️ PDF generation encountered an issue: ${error.message}`));
+            return;
+        }
+    }
+}
+
 function formatMessageContent(content) {
     // Convert **text** to <strong>text</strong>
     let formatted = content.replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
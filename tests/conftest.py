@@ -0,0 +1,16 @@
+"""
+Test configuration
+Puts the application modules and the benchmark corpus generator on the path
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+# Set before the modules are imported: no reload thread, no artifacts outside the test directories
+os.environ.setdefault('SRS_LEXICON_RELOAD_INTERVAL', '0')
+os.environ.setdefault('SRS_LEXICON_CACHE_DIR', '')
+os.environ.setdefault('SRS_METRICS', '0')
@@ -0,0 +1,51 @@
+"""
+Tests for the memoized requirement analysis
+"""
+
+import sys
+
+import pytest
+
+import analyzer
+import lexicon
+from analyzer import analyze_requirement
+from metrics import stage_breakdown
+
+REQUIREMENT = "The system shall respond fast and be user-friendly."
+
+
+@pytest.fixture
+def empty_cache():
+    analyzer._cached_analysis.cache_clear()
+    yield
+    analyzer._cached_analysis.cache_clear()
+
+
+def test_keyed_on_normalized_text(empty_cache):
+    first = analyze_requirement(REQUIREMENT)
+    assert analyze_requirement("  The system shall respond\n fast and   be user-friendly. ") is first
+    assert first.text == REQUIREMENT
+    info = analyzer._cached_analysis.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_hits_reported_as_their_own_stage(empty_cache):
+    with stage_breakdown() as stages:
+        analyze_requirement(REQUIREMENT)
+    assert stages['detection']['count'] == 1
+    assert 'analysis_cache_hit' not in stages
+
+    with stage_breakdown() as stages:
+        analyze_requirement(REQUIREMENT)
+        analyze_requirement(REQUIREMENT)
+    assert stages['analysis_cache_hit']['count'] == 2
+    assert 'detection' not in stages
+
+
+def test_cache_does_not_hold_the_lexicon(empty_cache):
+    # A lexicon referenced by cache entries would stay alive after a reload
+    active = lexicon.current_lexicon()
+    references = sys.getrefcount(active)
+    analyze_requirement("The report shall be generated quickly.", active)
+    assert sys.getrefcount(active) == references
+    assert analyzer._cached_analysis.cache_info().currsize == 1
@@ -0,0 +1,65 @@
+"""
+Tests for the ASGI serving mode
+"""
+
+import asyncio
+import json
+
+import asgi
+import app as chatbot
+from asgi import AsgiAdapter
+
+
+def echo_length(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(len(environ['wsgi.input'].read())).encode()]
+
+
+def call(adapter, chunks, headers=()):
+    """Sends the body in the given chunks; returns (status, body, chunks received)."""
+    scope = {'type': 'http', 'method': 'POST', 'path': '/chat', 'headers': list(headers)}
+    pending = [{'type': 'http.request', 'body': chunk, 'more_body': index < len(chunks) - 1}
+               for index, chunk in enumerate(chunks)]
+    received = []
+    sent = []
+
+    async def receive():
+        received.append(pending[0])
+        return pending.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(adapter(scope, receive, send))
+    adapter.shutdown()
+    body = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return sent[0]['status'], body, len(received)
+
+
+def test_body_within_limit_passed_on():
+    adapter = AsgiAdapter(echo_length, max_body_bytes=10)
+    assert call(adapter, [b'12345', b'67890']) == (200, b'10', 2)
+
+
+def test_declared_length_over_limit_refused_unread():
+    adapter = AsgiAdapter(echo_length, max_body_bytes=10)
+    status, body, received = call(adapter, [b'x' * 11], [(b'content-length', b'11')])
+    assert (status, received) == (413, 0)
+    assert 'limit 10 bytes' in json.loads(body)['error']
+
+
+def test_streamed_body_over_limit_refused_early():
+    adapter = AsgiAdapter(echo_length, max_body_bytes=10)
+    status, _, received = call(adapter, [b'x' * 6, b'x' * 6, b'x' * 6])
+    assert (status, received) == (413, 2)
+
+
+def test_served_app_uses_flask_limit():
+    assert asgi.app.max_body_bytes == chatbot.app.config['MAX_CONTENT_LENGTH'] == chatbot.MAX_UPLOAD_BYTES
+
+
+def test_flask_refuses_declared_oversized_body(monkeypatch):
+    monkeypatch.setitem(chatbot.app.config, 'MAX_CONTENT_LENGTH', 100)
+    response = chatbot.app.test_client().post('/chat', json={'message': 'x' * 200})
+    assert response.status_code == 413
+    assert 'limit 100 bytes' in response.get_json()['error']
@@ -0,0 +1,45 @@
+"""
+Tests for the /analyze/batch endpoint
+"""
+
+import pytest
+
+import app as chatbot
+from synthetic import generate_document
+
+DOCUMENTS = [generate_document(12, style, seed) for seed in range(3) for style in ('numbered', 'bulleted', 'prose')]
+
+
+def analyze_batch(documents):
+    response = chatbot.app.test_client().post('/analyze/batch', json={'documents': documents})
+    assert response.status_code == 200
+    return response.get_json()['results']
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(chatbot, 'BATCH_WORKERS', 2)
+    monkeypatch.setattr(chatbot, '_batch_executor', None)
+    yield
+    if chatbot._batch_executor is not None:
+        chatbot._batch_executor.shutdown()
+
+
+def test_process_pool_matches_in_process(process_pool, monkeypatch):
+    pooled = analyze_batch(DOCUMENTS)
+    assert chatbot._batch_executor is not None
+    assert chatbot._batch_executor._mp_context.get_start_method() == chatbot.BATCH_START_METHOD
+
+    monkeypatch.setattr(chatbot, 'BATCH_WORKERS', 0)
+    assert pooled == analyze_batch(DOCUMENTS)
+
+
+def test_document_ids_kept():
+    results = analyze_batch([{'id': 'billing', 'text': DOCUMENTS[0]}, DOCUMENTS[1]])
+    assert [result['id'] for result in results] == ['billing', 1]
+
+
+def test_invalid_documents_rejected():
+    client = chatbot.app.test_client()
+    assert client.post('/analyze/batch', json={'documents': []}).status_code == 400
+    assert client.post('/analyze/batch', json={'documents': [42]}).status_code == 400
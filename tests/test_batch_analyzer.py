@@ -0,0 +1,102 @@
+"""
+Tests for the command-line batch analyzer
+"""
+
+import json
+
+import batch_analyzer
+from synthetic import generate_document
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def run(*args):
+    return batch_analyzer.main(['--jobs', '1', *[str(arg) for arg in args]])
+
+
+def test_analyzes_every_requirement_by_default(tmp_path):
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'long.txt').write_text(generate_document(80, 'numbered', 1), encoding='utf-8')
+    output = tmp_path / 'out.jsonl'
+
+    assert run(tmp_path / 'docs', '--summary', '--output', output) == 0
+    lines = read_lines(output)
+    assert sum(line['type'] == 'requirement' for line in lines) == 80
+    assert lines[-1]['requirement_count'] == 80
+    assert lines[-1]['truncated'] is False
+
+
+def test_limit_marks_truncated_files(tmp_path, capsys):
+    (tmp_path / 'docs').mkdir()
+    (tmp_path / 'docs' / 'long.txt').write_text(generate_document(80, 'numbered', 1), encoding='utf-8')
+    (tmp_path / 'docs' / 'short.txt').write_text(generate_document(10, 'numbered', 2), encoding='utf-8')
+    output = tmp_path / 'out.jsonl'
+
+    assert run(tmp_path / 'docs', '--summary', '--output', output, '--max-requirements', 10) == 0
+    summaries = {line['file']: line for line in read_lines(output) if line['type'] == 'file'}
+    assert summaries['long.txt']['requirement_count'] == 10
+    assert summaries['long.txt']['truncated'] is True
+    assert summaries['short.txt']['truncated'] is False
+    assert '1 file(s) had more than 10 requirements' in capsys.readouterr().err
+
+
+def write_tree(root, count=3):
+    root.mkdir()
+    for index in range(count):
+        (root / f'doc{index}.txt').write_text(generate_document(5, 'numbered', index), encoding='utf-8')
+
+
+def test_resume_skips_finished_files(tmp_path):
+    write_tree(tmp_path / 'docs')
+    output, checkpoint = tmp_path / 'out.jsonl', tmp_path / 'run.ckpt'
+    assert run(tmp_path / 'docs', '--output', output, '--checkpoint', checkpoint) == 0
+    complete = output.read_bytes()
+
+    # Interrupted after the first file, with a partial line of the second
+    first_offset = json.loads(checkpoint.read_text(encoding='utf-8').splitlines()[0])['offset']
+    checkpoint.write_text(checkpoint.read_text(encoding='utf-8').splitlines()[0] + '\n', encoding='utf-8')
+    output.write_bytes(complete[:first_offset] + b'{"type": "requirem')
+
+    assert run(tmp_path / 'docs', '--output', output, '--checkpoint', checkpoint) == 0
+    assert output.read_bytes() == complete
+
+
+def test_missing_output_restarts_from_scratch(tmp_path, capsys):
+    write_tree(tmp_path / 'docs')
+    output, checkpoint = tmp_path / 'out.jsonl', tmp_path / 'run.ckpt'
+    assert run(tmp_path / 'docs', '--output', output, '--checkpoint', checkpoint) == 0
+    complete = output.read_bytes()
+
+    output.unlink()
+    assert run(tmp_path / 'docs', '--output', output, '--checkpoint', checkpoint) == 0
+    assert output.read_bytes() == complete
+    assert b'\0' not in output.read_bytes()
+    assert 'starting over' in capsys.readouterr().err
+
+    output.write_bytes(complete[:10])
+    assert run(tmp_path / 'docs', '--output', output, '--checkpoint', checkpoint) == 0
+    assert output.read_bytes() == complete
+    assert len(checkpoint.read_text(encoding='utf-8').splitlines()) == 3
+
+
+def test_same_name_under_two_roots_both_resumed(tmp_path):
+    for root in ('a', 'b'):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / 'x.txt').write_text(f"1. Root {root} requirement shall be fast.\n", encoding='utf-8')
+    output, checkpoint = tmp_path / 'out.jsonl', tmp_path / 'run.ckpt'
+    roots = [tmp_path / 'a', tmp_path / 'b']
+    assert run(*roots, '--output', output, '--checkpoint', checkpoint) == 0
+    complete = output.read_bytes()
+
+    # Interrupted after a/x.txt: b/x.txt must not count as done
+    first = checkpoint.read_text(encoding='utf-8').splitlines()[0]
+    checkpoint.write_text(first + '\n', encoding='utf-8')
+    output.write_bytes(complete[:json.loads(first)['offset']])
+
+    assert run(*roots, '--output', output, '--checkpoint', checkpoint) == 0
+    assert output.read_bytes() == complete
+    assert [line['original'] for line in read_lines(output)] == [
+        'Root a requirement shall be fast.', 'Root b requirement shall be fast.',
+    ]
@@ -0,0 +1,34 @@
+"""
+Tests for applying a session's clarifications to requirements
+"""
+
+from clarifications import ClarificationApplier, apply_user_clarification
+
+
+def test_longer_term_wins_at_same_start():
+    applier = ClarificationApplier({'quick': 'within 1 second', 'quickly': 'within 2 seconds'})
+    text = "The page shall load quickly."
+    assert applier.apply(text, ['quick', 'quickly']) == "The page shall load within 2 seconds."
+    assert applier.apply(text, ['quickly', 'quick']) == "The page shall load within 2 seconds."
+
+
+def test_each_term_replaced_once_ignoring_case():
+    applier = ClarificationApplier({'Fast': 'within 2 seconds', 'secure': 'encrypted with TLS 1.3'})
+    text = "Search shall be FAST and secure; results shall be fast."
+    assert applier.apply(text, ['fast', 'secure']) == (
+        "Search shall be within 2 seconds and encrypted with TLS 1.3; results shall be fast."
+    )
+
+
+def test_inserted_text_not_rewritten():
+    applier = ClarificationApplier({'fast': 'in a reliable way', 'reliable': 'with 99.9% uptime'})
+    assert applier.apply("It shall be fast.", ['fast', 'reliable']) == "It shall be in a reliable way."
+
+
+def test_matches_single_term_replacement():
+    text = "The interface shall be user-friendly."
+    applier = ClarificationApplier({'user-friendly': 'usable without training'})
+    assert applier.apply(text, ['user-friendly', 'fast']) == apply_user_clarification(
+        text, 'user-friendly', 'usable without training'
+    )
+    assert applier.apply(text, []) == text
@@ -0,0 +1,47 @@
+"""
+Tests for requirement classification
+"""
+
+import pytest
+
+import classifier
+from classifier import classify_many, classify_requirement, get_confidence_score, get_matched_keywords
+from preprocessor import extract_requirements
+from synthetic import generate_document
+
+SENTENCES = [
+    sentence
+    for seed in range(5)
+    for style in ('numbered', 'bulleted', 'prose', 'mixed')
+    for sentence in extract_requirements(generate_document(30, style, seed))
+] + [
+    "The user can login to the system using email and password.",
+    "The system should have good performance and security.",
+    "The user can search and the page must be secure.",  # one keyword of each kind
+    "The application must be accessible and comply with WCAG 2.1.",
+    "This is a random sentence without clear requirements.",
+    "",
+]
+
+
+def per_call(sentence):
+    category = classify_requirement(sentence)
+    return category, get_confidence_score(sentence, category), get_matched_keywords(sentence, category)
+
+
+@pytest.mark.parametrize('vectorized', [True, False], ids=['numpy', 'fallback'])
+def test_classify_many_matches_per_call_functions(vectorized, monkeypatch):
+    if vectorized:
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(classifier, 'np', None)
+    results = classify_many(SENTENCES)
+    assert results == [per_call(sentence) for sentence in SENTENCES]
+    assert all(type(confidence) is int for _, confidence, _ in results)
+    assert {category for category, _, _ in results} == {
+        "Functional Requirement", "Non-Functional Requirement", "Unclassified",
+    }
+
+
+def test_empty_batch():
+    assert classify_many([]) == []
@@ -0,0 +1,102 @@
+"""
+Tests for ambiguity detection and suggestions
+"""
+
+import re
+
+import pytest
+
+from detector import detect_ambiguity, find_ambiguities, suggest_improvement
+from lexicon import current_lexicon
+from matcher import KeywordAutomaton
+from preprocessor import extract_requirements
+from synthetic import generate_document
+
+SENTENCES = [
+    sentence
+    for seed in range(5)
+    for style in ('numbered', 'bulleted', 'prose', 'mixed')
+    for sentence in extract_requirements(generate_document(30, style, seed))
+]
+
+
+def baseline_detect_ambiguity(sentence, words):
+    """The original detect_ambiguity: one substring scan per lexicon entry."""
+    found_words = []
+    sentence_lower = sentence.lower()
+    for word in words:
+        if word in sentence_lower:
+            if word not in found_words:
+                found_words.append(word)
+    return found_words
+
+
+def reference_suggest_improvement(sentence, suggestions):
+    """One case-insensitive alternation, longest term first, each term replaced once."""
+    terms = sorted(suggestions, key=len, reverse=True)
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    replaced = set()
+
+    def replace(match):
+        term = match.group(0).lower()
+        if term in replaced:
+            return match.group(0)
+        replaced.add(term)
+        return suggestions[term]
+    return pattern.sub(replace, sentence)
+
+
+def test_automaton_finds_same_terms_as_substring_scan():
+    words = list(current_lexicon().ambiguous_words)
+    # Filler terms sharing prefixes and suffixes with the real ones
+    words += ['fasten', 'ast', 'user', 'friendly', 'so on', 'on', 'a']
+    automaton = KeywordAutomaton(words)
+    for sentence in SENTENCES + ["Breakfast is quick, and so on."]:
+        found = [words[word_id] for word_id in automaton.find_ids(sentence.lower())]
+        assert found == baseline_detect_ambiguity(sentence, words)
+
+
+def test_detect_ambiguity_matches_substring_scan():
+    words = current_lexicon().ambiguous_words
+    for sentence in SENTENCES:
+        expected = baseline_detect_ambiguity(sentence, words)
+        if 'quickly' in sentence.lower() and sentence.lower().count('quick') == sentence.lower().count('quickly'):
+            # "quick" only inside "quickly" is reported as the longer term alone
+            expected.remove('quick')
+        assert detect_ambiguity(sentence) == expected
+
+
+def test_nested_term_reported_once_with_its_offsets():
+    hits = find_ambiguities("load quickly, then quick.")
+    assert hits == [('quickly', 5, 12), ('quick', 19, 24)]
+
+
+@pytest.mark.parametrize('sentence, expected', [
+    ("Serve breakfast fast.", ['fast']),
+    ("Serve breakfast.", []),
+    ("It must be FAST.", ['fast']),
+])
+def test_whole_words(sentence, expected):
+    assert detect_ambiguity(sentence, whole_words=True) == expected
+
+
+def test_suggestions_match_single_pass_reference():
+    suggestions = current_lexicon().suggestions
+    for sentence in SENTENCES:
+        assert suggest_improvement(sentence) == reference_suggest_improvement(sentence, suggestions)
+
+
+@pytest.mark.parametrize('sentence, expected', [
+    # Longest term wins where several start together
+    ("Respond as soon as possible.", "Respond within 24 hours."),
+    # Only the first occurrence of each term is replaced, ignoring case
+    ("It shall be FAST and fast.", "It shall be within 2 seconds and fast."),
+    # Replacement text is never rewritten ("within 3 seconds" after "quick")
+    ("A quick and secure login.",
+     "A within 3 seconds and using AES-256 encryption and OAuth 2.0 authentication login."),
+    # Lowercasing "İ" adds a character; offsets still map back to the original
+    ("İstanbul users need a fast page.", "İstanbul users need a within 2 seconds page."),
+    ("Export the monthly report as CSV.", "Export the monthly report as CSV."),
+])
+def test_suggestion_semantics(sentence, expected):
+    assert suggest_improvement(sentence) == expected
@@ -0,0 +1,60 @@
+"""
+Tests for the bounded chat history of a session
+"""
+
+import pytest
+
+import app as chatbot
+
+
+def message(content, index=0):
+    return {'role': 'user', 'content': content, 'timestamp': str(index)}
+
+
+@pytest.fixture
+def session():
+    return chatbot.load_session('history-test')
+
+
+def test_keeps_newest_messages(session, monkeypatch):
+    monkeypatch.setattr(chatbot, 'SESSION_HISTORY', 3)
+    for index in range(5):
+        chatbot.append_history(session, message(f'message {index}', index))
+    assert [entry['content'] for entry in session['messages']] == ['message 2', 'message 3', 'message 4']
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_keeps_no_history(session, monkeypatch, limit):
+    monkeypatch.setattr(chatbot, 'SESSION_HISTORY', limit)
+    session['messages'].append(message('kept before the limit changed'))
+    for index in range(3):
+        chatbot.append_history(session, message(f'message {index}', index))
+    assert session['messages'] == []
+
+
+def test_long_message_truncated_to_preview(session, monkeypatch):
+    monkeypatch.setattr(chatbot, 'HISTORY_INLINE_CHARS', 100)
+    document = 'The system shall respond fast. ' * 20
+    chatbot.append_history(session, message(document))
+    chatbot.append_history(session, message('short answer'))
+
+    long_entry, short_entry = session['messages']
+    assert long_entry['content'] == document[:chatbot.HISTORY_PREVIEW_CHARS] + '…'
+    assert long_entry['content_chars'] == len(document)
+    assert short_entry == message('short answer')
+
+
+def test_chat_history_stays_bounded(monkeypatch):
+    monkeypatch.setattr(chatbot, 'SESSION_HISTORY', 4)
+    client = chatbot.app.test_client()
+    session_id = None
+    for _ in range(5):
+        response = client.post('/chat', json={
+            'message': '1. The user can login using email and password.',
+            'session_id': session_id,
+        })
+        assert response.status_code == 200
+        session_id = response.get_json()['session_id']
+
+    assert len(chatbot.conversations.get(session_id)['messages']) == 4
+    chatbot.conversations.delete(session_id)
@@ -0,0 +1,124 @@
+"""
+Tests for lexicon hot reload and compiled artifacts
+"""
+
+import json
+import marshal
+import os
+import shutil
+import stat
+
+import pytest
+
+import lexicon
+from analyzer import analyze_document, analyze_requirement
+
+REQUIREMENT = "The system shall respond fast and be user-friendly."
+
+
+@pytest.fixture
+def lexicon_file(tmp_path, monkeypatch):
+    """A private copy of lexicon.json that the active lexicon is reloaded from."""
+    path = tmp_path / 'lexicon.json'
+    shutil.copy(lexicon.LEXICON_PATH, path)
+    monkeypatch.setattr(lexicon, 'LEXICON_PATH', str(path))
+    monkeypatch.setattr(lexicon, 'LEXICON_CACHE_DIR', '')
+    # Restored afterwards, so other tests see the original lexicon
+    monkeypatch.setattr(lexicon, '_current', lexicon.current_lexicon())
+    monkeypatch.setattr(lexicon, '_stamp', lexicon._stamp)
+    return path
+
+
+def edit_lexicon(path, **changes):
+    data = json.loads(path.read_text(encoding='utf-8'))
+    data.update(changes)
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return data
+
+
+def test_artifact_written_to_private_directory_and_reused(tmp_path, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    compiled = lexicon.load_lexicon(cache_dir=str(cache_dir))
+    assert stat.S_IMODE(os.stat(cache_dir).st_mode) & 0o077 == 0
+    assert len(os.listdir(cache_dir)) == 1
+
+    def no_parse(data):
+        raise AssertionError("artifact not used")
+    monkeypatch.setattr(lexicon, 'parse_lexicon', no_parse)
+    cached = lexicon.load_lexicon(cache_dir=str(cache_dir))
+    assert cached.fingerprint == compiled.fingerprint
+    assert cached.suggestion_by_id == compiled.suggestion_by_id
+    assert (list(cached.ambiguity_matcher.iter_matches('fast and user-friendly'))
+            == list(compiled.ambiguity_matcher.iter_matches('fast and user-friendly')))
+
+
+def test_artifact_for_other_content_rejected(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    compiled = lexicon.load_lexicon(cache_dir=str(cache_dir))
+    artifact = cache_dir / os.listdir(cache_dir)[0]
+    payload = marshal.loads(artifact.read_bytes())
+    payload['fingerprint'] = '0' * 64
+    payload['suggestions'] = {}
+    artifact.write_bytes(marshal.dumps(payload))
+
+    assert lexicon.load_artifact(str(artifact), compiled.fingerprint) is None
+    reloaded = lexicon.load_lexicon(cache_dir=str(cache_dir))
+    assert reloaded.suggestions == compiled.suggestions
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX permissions")
+def test_directory_writable_by_others_not_used(tmp_path):
+    cache_dir = tmp_path / 'shared'
+    cache_dir.mkdir()
+    cache_dir.chmod(0o777)
+    assert not lexicon.private_cache_dir(str(cache_dir))
+    lexicon.load_lexicon(cache_dir=str(cache_dir))
+    assert os.listdir(cache_dir) == []
+
+
+def test_reload_activates_new_version(lexicon_file):
+    before = lexicon.current_lexicon()
+    assert not lexicon.reload_lexicon()  # same content
+
+    edit_lexicon(lexicon_file, version='test-2')
+    assert lexicon.reload_lexicon()
+    after = lexicon.current_lexicon()
+    assert after.version == 'test-2'
+    assert after.fingerprint != before.fingerprint
+    # Memoized analyses are keyed by lexicon, so none of the old version is reused
+    assert analyze_requirement(REQUIREMENT).lexicon_version == after.version_id
+    assert analyze_requirement(REQUIREMENT, before).lexicon_version == before.version_id
+
+
+def test_invalid_file_keeps_active_lexicon(lexicon_file):
+    before = lexicon.current_lexicon()
+    lexicon_file.write_text('{"format": 1, "version": ""}', encoding='utf-8')
+    with pytest.raises(lexicon.LexiconError):
+        lexicon.reload_lexicon()
+    assert lexicon.current_lexicon() is before
+
+
+def test_removed_term_no_longer_detected(lexicon_file):
+    data = json.loads(lexicon_file.read_text(encoding='utf-8'))
+    terms = [entry for entry in data['ambiguous_terms'] if entry['term'] != 'fast']
+    edit_lexicon(lexicon_file, version='test-3', ambiguous_terms=terms)
+    lexicon.reload_lexicon()
+
+    analysis = analyze_requirement(REQUIREMENT)
+    assert 'fast' not in analysis.ambiguous_words
+    assert 'fast' in analysis.suggestion
+
+
+def test_worker_with_old_lexicon_catches_up(lexicon_file, monkeypatch):
+    old = lexicon.current_lexicon()
+    edit_lexicon(lexicon_file, version='test-4')
+    new = lexicon.load_lexicon()
+
+    # A batch worker forked before the reload still holds the old version
+    monkeypatch.setattr(lexicon, '_current', old)
+    result = analyze_document(f"1. {REQUIREMENT}", lexicon_fingerprint=new.fingerprint)
+    assert {record['lexicon_version'] for record in result['requirements']} == {new.version_id}
+    assert lexicon.current_lexicon().fingerprint == new.fingerprint
+
+    # Matching fingerprints do not reload
+    assert lexicon.require_lexicon(new.fingerprint) is lexicon.current_lexicon()
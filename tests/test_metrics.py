@@ -0,0 +1,55 @@
+"""
+Tests for stage timing
+"""
+
+import io
+
+import app as chatbot
+from metrics import stage_breakdown, timed_iter
+from synthetic import generate_document
+
+
+def test_timed_iter_observed_when_exhausted():
+    with stage_breakdown() as stages:
+        assert list(timed_iter('segmentation', iter(range(3)))) == [0, 1, 2]
+    assert stages['segmentation']['count'] == 1
+
+
+def test_timed_iter_observed_and_closes_when_abandoned():
+    closed = []
+
+    def produce():
+        try:
+            yield from range(10)
+        finally:
+            closed.append(True)
+
+    with stage_breakdown() as stages:
+        items = timed_iter('segmentation', produce())
+        assert next(items) == 0
+        items.close()
+    assert stages['segmentation']['count'] == 1
+    assert closed == [True]
+
+
+def test_upload_reads_limited_requirements_and_records_segmentation(monkeypatch):
+    monkeypatch.setattr(chatbot, 'MAX_REQUIREMENTS', 5)
+    uploads = []
+    segment = chatbot.iter_upload_requirements
+
+    def iter_upload_requirements(stream):
+        uploads.append(stream)
+        return segment(stream)
+    monkeypatch.setattr(chatbot, 'iter_upload_requirements', iter_upload_requirements)
+
+    document = generate_document(20, 'numbered', 1).encode('utf-8')
+    with stage_breakdown() as stages:
+        response = chatbot.app.test_client().post('/chat/upload', data={
+            'file': (io.BytesIO(document), 'srs.txt'),
+        }, content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert stages['segmentation']['count'] == 1
+    analyzed = sum(stages.get(stage, {}).get('count', 0) for stage in ('detection', 'analysis_cache_hit'))
+    assert analyzed == 5
+    assert uploads[0].closed
+    chatbot.conversations.delete(response.get_json()['session_id'])
@@ -0,0 +1,114 @@
+"""
+Tests for PDF downloads and the render cache
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+import app as chatbot
+import pdf_generator
+from analyzer import RequirementTable, analyze_requirement
+from pdf_generator import PdfRenderCache
+
+REQUIREMENTS = [
+    "The system shall respond fast and be user-friendly.",
+    "The user can login using email and password.",
+]
+
+
+@pytest.fixture
+def pdf_session(monkeypatch):
+    """A finished session with a PDF, rendered into an empty cache."""
+    monkeypatch.setattr(pdf_generator, 'render_cache', PdfRenderCache())
+    session = chatbot.load_session('pdf-test')
+    session.update({
+        'state': 'completed',
+        'clarifications': {'fast': 'within 2 seconds'},
+        'requirements': RequirementTable.build(analyze_requirement(text).row() for text in REQUIREMENTS),
+        'pdf': {
+            'filename': 'improved_srs_pdf-test.pdf',
+            'generated_at': datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc).isoformat(),
+        },
+    })
+    chatbot.conversations.put('pdf-test', session)
+    yield session
+    chatbot.conversations.delete('pdf-test')
+
+
+def test_download_supports_etag_and_range(pdf_session):
+    client = chatbot.app.test_client()
+    response = client.get('/download-pdf/pdf-test')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    pdf_bytes = response.data
+    assert pdf_bytes.startswith(b'%PDF')
+    assert response.content_length == len(pdf_bytes)
+    etag = response.headers['ETag']
+    assert 'improved_srs_pdf-test.pdf' in response.headers['Content-Disposition']
+
+    assert client.get('/download-pdf/pdf-test', headers={'If-None-Match': etag}).status_code == 304
+
+    partial = client.get('/download-pdf/pdf-test', headers={'Range': 'bytes=100-199'})
+    assert partial.status_code == 206
+    assert partial.data == pdf_bytes[100:200]
+    assert partial.headers['Content-Range'] == f'bytes 100-199/{len(pdf_bytes)}'
+
+    stale = client.get('/download-pdf/pdf-test', headers={'Range': 'bytes=100-199', 'If-Range': '"other"'})
+    assert stale.status_code == 200 and stale.data == pdf_bytes
+
+
+def test_other_worker_renders_identical_bytes(pdf_session, monkeypatch):
+    client = chatbot.app.test_client()
+    first = client.get('/download-pdf/pdf-test')
+    assert pdf_generator.render_cache.stats()['misses'] == 1
+
+    # A worker without the cached bytes renders from the session
+    monkeypatch.setattr(pdf_generator, 'render_cache', PdfRenderCache())
+    second = client.get('/download-pdf/pdf-test')
+    assert pdf_generator.render_cache.stats()['misses'] == 1
+    assert second.data == first.data
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_no_pdf_yet():
+    response = chatbot.app.test_client().get('/download-pdf/unknown-session')
+    assert response.status_code == 404
+    assert 'error' in response.get_json()
+
+
+def test_render_cache_evicts_least_recently_used_by_bytes():
+    cache = PdfRenderCache(max_bytes=250)
+    cache.put('a', b'a' * 100)
+    cache.put('b', b'b' * 100)
+    assert cache.get('a') == b'a' * 100  # b is now the least recently used
+    cache.put('c', b'c' * 100)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes']) == (2, 200)
+
+    # An entry larger than the whole budget is not kept
+    cache.put('huge', b'h' * 300)
+    assert cache.get('huge') is None
+    assert cache.stats()['bytes'] == 200
+
+
+def test_unusable_disk_dir_falls_back_to_memory(tmp_path, capsys):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = PdfRenderCache(disk_dir=str(blocker / 'pdfs'))
+    assert cache.disk_dir is None
+    assert 'memory only' in capsys.readouterr().out
+
+    cache.put('a', b'%PDF-a')
+    assert cache.get('a') == b'%PDF-a'
+    assert cache.stats()['disk_dir'] is None
+
+
+def test_disk_tier_shared_between_caches(tmp_path):
+    PdfRenderCache(disk_dir=str(tmp_path / 'pdfs')).put('a', b'%PDF-a')
+    other = PdfRenderCache(disk_dir=str(tmp_path / 'pdfs'))
+    assert other.get('a') == b'%PDF-a'
+    assert other.stats()['disk_hits'] == 1
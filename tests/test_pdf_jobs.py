@@ -0,0 +1,137 @@
+"""
+Tests for the background PDF job queue
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+import pdf_jobs
+from analyzer import RequirementTable, analyze_requirement
+from pdf_jobs import CANCELLED, DONE, FAILED, QUEUED, PdfJobQueue
+from session_store import SessionStore
+
+GENERATED_AT = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Replaces PDF rendering with one that waits until `release` is set."""
+    release = threading.Event()
+    started = []
+
+    def render(session, filename, generated_at):
+        started.append(filename)
+        assert release.wait(5)
+        return b'%PDF-test'
+
+    monkeypatch.setattr(pdf_jobs, 'generate_improved_srs_pdf', render)
+    yield release, started
+    release.set()
+
+
+@pytest.fixture
+def make_queue(renders):
+    """Creates job queues whose workers are finished before the next test."""
+    queues = []
+
+    def make(**kwargs):
+        queues.append(PdfJobQueue(**kwargs))
+        return queues[-1]
+    yield make
+    renders[0].set()
+    for queue in queues:
+        if queue._executor is not None:
+            queue._executor.shutdown()
+
+
+def wait_started(started, count):
+    deadline = time.monotonic() + 5
+    while len(started) < count:
+        assert time.monotonic() < deadline, "render never started"
+        time.sleep(0.01)
+
+
+def new_session():
+    return {
+        'requirements': RequirementTable.build([analyze_requirement("The page shall load fast.").row()]),
+        'clarifications': {'fast': 'within 2 seconds'},
+    }
+
+
+def test_job_runs_to_completion(renders, make_queue):
+    release, _ = renders
+    queue = make_queue(workers=1)
+    job = queue.submit('s1', new_session(), 'a.pdf', GENERATED_AT)
+    release.set()
+    job.future.result(timeout=5)
+
+    assert queue.get(job.id).state == DONE
+    assert queue.get(job.id).to_dict()['filename'] == 'a.pdf'
+    assert queue.stats()[DONE] == 1
+
+
+def test_full_queue_rejects_submissions(renders, make_queue):
+    queue = make_queue(workers=1, max_depth=2)
+    assert queue.submit('s1', new_session(), 'a.pdf', GENERATED_AT) is not None
+    assert queue.submit('s2', new_session(), 'b.pdf', GENERATED_AT) is not None
+    assert queue.submit('s3', new_session(), 'c.pdf', GENERATED_AT) is None
+    stats = queue.stats()
+    assert (stats['submitted'], stats['rejected'], stats['running'] + stats['queued']) == (2, 1, 2)
+
+    assert make_queue(workers=0).submit('s1', new_session(), 'a.pdf', GENERATED_AT) is None
+
+
+def test_overdue_jobs_fail_and_stay_failed(renders, make_queue):
+    release, started = renders
+    clock = FakeClock()
+    queue = make_queue(workers=1, timeout_seconds=60, clock=clock)
+    running = queue.submit('s1', new_session(), 'a.pdf', GENERATED_AT)
+    queued = queue.submit('s2', new_session(), 'b.pdf', GENERATED_AT)
+    wait_started(started, 1)
+
+    clock.now += 61
+    for job in (running, queued):
+        assert queue.get(job.id).state == FAILED
+        assert 'Timed out' in job.to_dict()['error']
+    assert queue.stats()['timed_out'] == 2
+
+    # The render finishing late does not revive the job; the queued one never starts
+    release.set()
+    running.future.result(timeout=5)
+    assert running.state == FAILED
+    assert started == ['a.pdf']
+
+
+def test_session_eviction_cancels_its_jobs(renders, make_queue):
+    release, started = renders
+    queue = make_queue(workers=1)
+    store = SessionStore(max_sessions=1)
+    store.on_evict = queue.cancel_session
+
+    store.put('s1', new_session())
+    blocking = queue.submit('other', new_session(), 'other.pdf', GENERATED_AT)
+    wait_started(started, 1)
+    job = queue.submit('s1', store.get('s1'), 's1.pdf', GENERATED_AT)
+    assert job.state == QUEUED
+
+    store.put('s2', new_session())  # evicts s1
+    assert job.state == CANCELLED
+    assert job.error == 'Session expired'
+    assert job.snapshot is None
+    assert blocking.state != CANCELLED
+
+    release.set()
+    blocking.future.result(timeout=5)
+    assert started == ['other.pdf']
+    assert queue.stats()[CANCELLED] == 1
@@ -0,0 +1,65 @@
+"""
+Tests for request profiling and the profile spool
+"""
+
+import cProfile
+import os
+import stat
+
+import pytest
+
+from profiler import ProfileSpool, ProfilingMiddleware
+
+
+def finished_profile():
+    profile = cProfile.Profile()
+    profile.enable()
+    sorted(range(100))
+    profile.disable()
+    return profile
+
+
+def test_spool_created_private_and_served(tmp_path):
+    spool = ProfileSpool(str(tmp_path / 'profiles'))
+    profile_id = spool.save(finished_profile(), {'path': '/chat'})
+    assert stat.S_IMODE(os.stat(spool.directory).st_mode) & 0o077 == 0
+    assert [metadata['id'] for metadata in spool.list()] == [profile_id]
+    assert spool.metadata(profile_id)['path'] == '/chat'
+    assert spool.profile_path(profile_id) is not None
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason="POSIX permissions")
+def test_directory_open_to_others_refused(tmp_path):
+    directory = tmp_path / 'shared'
+    spool = ProfileSpool(str(directory))
+    profile_id = spool.save(finished_profile(), {'path': '/chat'})
+
+    directory.chmod(0o755)
+    assert not spool.is_private()
+    assert spool.save(finished_profile(), {'path': '/chat'}) is None
+    assert spool.list() == []
+    assert spool.metadata(profile_id) is None
+    assert spool.profile_path(profile_id) is None
+    assert len(os.listdir(directory)) == 2
+
+
+def test_request_served_when_profiler_busy(tmp_path, monkeypatch, capsys):
+    class BusyProfile(cProfile.Profile):
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    def wsgi_app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'profiled' if environ.get('srs.profiling') else b'plain']
+
+    monkeypatch.setattr(cProfile, 'Profile', BusyProfile)
+    spool = ProfileSpool(str(tmp_path / 'profiles'))
+    middleware = ProfilingMiddleware(wsgi_app, spool, token='secret')
+    statuses = []
+    body = middleware({'PATH_INFO': '/chat', 'HTTP_X_SRS_PROFILE': 'secret'},
+                      lambda status, headers, exc_info=None: statuses.append(status))
+
+    assert list(body) == [b'plain']
+    assert statuses == ['200 OK']
+    assert spool.list() == []
+    assert 'not profiled' in capsys.readouterr().out
@@ -0,0 +1,76 @@
+"""
+Tests for the column-packed requirement table kept in sessions
+"""
+
+import json
+import sys
+
+from analyzer import RequirementTable, analyze_requirement
+from preprocessor import extract_requirements
+from session_store import estimate_size
+from synthetic import generate_document
+
+SENTENCES = [
+    sentence
+    for seed in range(3)
+    for style in ('numbered', 'bulleted', 'prose', 'mixed')
+    for sentence in extract_requirements(generate_document(30, style, seed))
+] + ["İstanbul users need a fast page.", "Export the monthly report as CSV."]
+
+
+def build_table():
+    return RequirementTable.build(analyze_requirement(sentence).row() for sentence in SENTENCES)
+
+
+def records(table):
+    return [table.record(index) for index in range(len(table))]
+
+
+def test_records_match_analysis():
+    table = build_table()
+    assert len(table) == len(SENTENCES)
+    assert records(table) == [analyze_requirement(sentence).to_dict() for sentence in SENTENCES]
+    for index, sentence in enumerate(SENTENCES):
+        assert table.ambiguities(index) == list(analyze_requirement(sentence).ambiguities)
+
+
+def test_json_round_trip():
+    table = build_table()
+    loaded = RequirementTable.load(json.loads(json.dumps(table.to_json())))
+    assert loaded.to_json() == table.to_json()
+    assert records(loaded) == records(table)
+
+
+def test_rows_rebuild_identical_table():
+    table = build_table()
+    rebuilt = RequirementTable.build(table.row(index) for index in range(len(table)))
+    assert rebuilt.to_json() == table.to_json()
+
+
+def test_unchanged_requirements_store_no_suggestion():
+    table = build_table()
+    unchanged = [index for index in range(len(table)) if table.suggestion(index) == table.text(index)]
+    assert unchanged
+    for index in unchanged:
+        assert table.suggestion_spans[2 * index] == table.suggestion_spans[2 * index + 1]
+    assert len(table.suggested) < sum(len(table.suggestion(index)) for index in range(len(table)))
+
+
+def test_older_session_formats_loaded():
+    table = build_table()
+    assert RequirementTable.load(table) is table
+    assert len(RequirementTable.load(None)) == 0
+    # Record dicts and tables saved before suggestions were stored are analyzed again
+    assert records(RequirementTable.load(records(table))) == records(table)
+    columns = table.to_json()
+    del columns['suggested'], columns['suggestion_spans']
+    assert records(RequirementTable.load(columns)) == records(table)
+
+
+def test_smaller_than_record_dicts():
+    table = build_table()
+    dicts = records(table)
+    text_bytes = sum(sys.getsizeof(record['original']) + sys.getsizeof(record['suggested']) for record in dicts)
+    # Beyond the text both forms must hold, the table needs several times less
+    table_overhead = estimate_size(table) - sys.getsizeof(table.document) - sys.getsizeof(table.suggested)
+    assert table_overhead * 4 < estimate_size(dicts) - text_bytes
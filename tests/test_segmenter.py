@@ -0,0 +1,116 @@
+"""
+Tests for requirement segmentation
+"""
+
+import re
+
+import pytest
+
+from preprocessor import (
+    MAX_REQUIREMENTS, extract_requirements, iter_chunked_requirements, iter_requirements,
+    normalize_whitespace,
+)
+from synthetic import generate_document
+
+
+def baseline_extract_requirements(text):
+    """The original extract_requirements: one delimiter chosen for the whole document."""
+    numbered_pattern = r'\d+[\.)]\s+'
+    if re.search(numbered_pattern, text):
+        requirements = re.split(numbered_pattern, text)
+        requirements = [r.strip() for r in requirements if r.strip()]
+    elif '•' in text or '*' in text or '-' in text[:50]:
+        requirements = re.split(r'[•\*\-]\s+', text)
+        requirements = [r.strip() for r in requirements if r.strip()]
+    else:
+        requirements = re.split(r'[.!?]+', text)
+        requirements = [r.strip() for r in requirements if r.strip() and len(r.strip()) > 15]
+    requirements = [r for r in requirements if len(r) > 15]
+    return requirements[:50]
+
+
+@pytest.mark.parametrize('style', ['numbered', 'bulleted', 'prose'])
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_baseline_on_single_style_documents(style, seed):
+    document = generate_document(120, style, seed)
+    expected = [normalize_whitespace(r) for r in baseline_extract_requirements(document)]
+    assert extract_requirements(document) == expected
+
+
+def test_list_item_sentences_stay_together():
+    document = (
+        "1. The system shall respond fast.\n"
+        "2. The user can login using email and password. It must be secure.\n"
+        "3. Reports must load quickly! They are used daily."
+    )
+    assert extract_requirements(document) == [
+        "The system shall respond fast.",
+        "The user can login using email and password. It must be secure.",
+        "Reports must load quickly! They are used daily.",
+    ]
+    assert extract_requirements(document) == baseline_extract_requirements(document)
+
+
+def test_numbers_inside_list_item_do_not_split():
+    document = (
+        "1. Requests must be answered within 12. Users may retry them later.\n"
+        "2. The service keeps 99.9 percent availability every month."
+    )
+    assert extract_requirements(document) == [
+        "Requests must be answered within 12. Users may retry them later.",
+        "The service keeps 99.9 percent availability every month.",
+    ]
+
+
+def test_prose_outside_list_items_is_split_into_sentences():
+    document = (
+        "The portal serves the finance team. It replaces the old spreadsheets.\n\n"
+        "- Users can export every report as a spreadsheet. Exports keep the filters.\n"
+        "- Administrators can deactivate accounts of former employees."
+    )
+    assert extract_requirements(document) == [
+        "The portal serves the finance team",
+        "It replaces the old spreadsheets",
+        "Users can export every report as a spreadsheet. Exports keep the filters.",
+        "Administrators can deactivate accounts of former employees.",
+    ]
+
+
+def test_blank_line_ends_list_item():
+    document = (
+        "1. The system shall store every order in the database.\n\n"
+        "Orders are kept for audits. Audits happen every year."
+    )
+    assert extract_requirements(document) == [
+        "The system shall store every order in the database.",
+        "Orders are kept for audits",
+        "Audits happen every year",
+    ]
+
+
+def test_collapsed_numbered_list():
+    document = "1. Users can upload profile pictures. 2. Users can delete their own account."
+    assert extract_requirements(document) == [
+        "Users can upload profile pictures.",
+        "Users can delete their own account.",
+    ]
+
+
+def test_limit():
+    document = generate_document(MAX_REQUIREMENTS + 10, 'numbered', 1)
+    assert len(extract_requirements(document)) == MAX_REQUIREMENTS
+    assert len(extract_requirements(document, None)) == MAX_REQUIREMENTS + 10
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 4096])
+@pytest.mark.parametrize('style', ['numbered', 'bulleted', 'prose', 'mixed'])
+def test_chunked_matches_whole_document(style, chunk_size):
+    document = generate_document(60, style, 3)
+    chunks = (document[i:i + chunk_size] for i in range(0, len(document), chunk_size))
+    assert list(iter_chunked_requirements(chunks)) == list(iter_requirements(document))
+
+
+def test_chunked_long_open_segment():
+    document = "1. " + "the system shall keep every record and " * 2000 + "more.\n2. Second requirement here."
+    chunks = (document[i:i + 100] for i in range(0, len(document), 100))
+    assert list(iter_chunked_requirements(chunks)) == list(iter_requirements(document))
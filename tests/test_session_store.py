@@ -0,0 +1,175 @@
+"""
+Tests for the session stores
+"""
+
+import pytest
+
+import app as chatbot
+from analyzer import RequirementTable, analyze_requirement
+from session_store import LazySession, SessionStore, SQLiteSessionStore, estimate_size
+
+REQUIREMENTS = [
+    "The system shall respond fast and be user-friendly.",
+    "The user can login using email and password.",
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'sessions.db')
+
+
+def new_session():
+    return {
+        'state': 'awaiting_clarification',
+        'messages': [{'role': 'user', 'content': 'hello', 'timestamp': 't'}],
+        'clarifications': {'fast': 'within 2 seconds'},
+        'requirements': RequirementTable.build(analyze_requirement(text).row() for text in REQUIREMENTS),
+    }
+
+
+def test_least_recently_used_evicted_beyond_max_sessions():
+    evicted = []
+    store = SessionStore(max_sessions=2, clock=FakeClock())
+    store.on_evict = evicted.append
+    store.put('s1', new_session())
+    store.put('s2', new_session())
+    store.get('s1')  # s2 is now the least recently used
+    store.put('s3', new_session())
+
+    assert evicted == ['s2']
+    assert 's1' in store and 's3' in store and 's2' not in store
+    assert store.stats()['evictions'] == {'expired': 0, 'capacity': 1, 'memory': 0}
+
+
+def test_memory_budget_evicts_oldest():
+    size = estimate_size(new_session())
+    store = SessionStore(max_bytes=size * 2 + size // 2, clock=FakeClock())
+    for session_id in ('s1', 's2', 's3'):
+        store.put(session_id, new_session())
+
+    stats = store.stats()
+    assert stats['sessions'] == 2 and 's1' not in store
+    assert stats['bytes'] == size * 2
+    assert stats['evictions']['memory'] == 1
+
+    # The session just stored is kept even if it alone exceeds the budget
+    store.put('big', dict(new_session(), document='x' * size * 4))
+    assert len(store) == 1 and 'big' in store
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    evicted = []
+    store = SessionStore(ttl_seconds=60, clock=clock)
+    store.on_evict = evicted.append
+    store.put('s1', new_session())
+    store.put('s2', new_session())
+
+    clock.now += 40
+    assert store.get('s1') is not None  # refreshes s1 only
+    clock.now += 30
+    assert store.get('s2') is None
+    assert store.get('s1') is not None
+    assert evicted == ['s2']
+    assert store.stats()['bytes'] == estimate_size(store.get('s1'))
+    assert store.stats()['evictions']['expired'] == 1
+
+
+def test_health_reports_session_store():
+    stats = chatbot.app.test_client().get('/health').get_json()['session_store']
+    assert set(stats['evictions']) >= {'expired', 'capacity', 'memory'}
+    assert stats['sessions'] >= 0 and stats['bytes'] >= 0
+
+
+def test_round_trip(db_path):
+    store = SQLiteSessionStore(db_path)
+    store.put('s1', new_session())
+    store.flush()
+
+    session = store.get('s1')
+    assert isinstance(session, LazySession)
+    assert session['state'] == 'awaiting_clarification'
+    assert session['messages'] == [{'role': 'user', 'content': 'hello', 'timestamp': 't'}]
+    assert session['clarifications'] == {'fast': 'within 2 seconds'}
+    requirements = RequirementTable.load(session['requirements'])
+    assert [requirements.record(index) for index in range(len(requirements))] == [
+        analyze_requirement(text).to_dict() for text in REQUIREMENTS
+    ]
+    assert sorted(session) == ['clarifications', 'messages', 'requirements', 'state']
+    assert store.get('missing') is None
+
+
+def test_visible_from_another_connection(db_path):
+    writer = SQLiteSessionStore(db_path)
+    reader = SQLiteSessionStore(db_path)
+
+    writer.put('s1', new_session())
+    assert reader.get('s1') is None  # staged, not yet written
+    writer.flush()
+    assert reader.get('s1')['state'] == 'awaiting_clarification'
+    assert 's1' in reader
+    assert len(reader) == 1
+
+
+def test_changes_written_back_field_by_field(db_path):
+    first = SQLiteSessionStore(db_path)
+    second = SQLiteSessionStore(db_path)
+    first.put('s1', new_session())
+    first.flush()
+
+    session = second.get('s1')
+    session['state'] = 'completed'
+    session['messages'].append({'role': 'bot', 'content': 'done', 'timestamp': 'u'})
+    del session['clarifications']
+    assert session.changes()[1] == {'clarifications'}
+    second.put('s1', session)
+    second.flush()
+
+    session = first.get('s1')
+    assert session['state'] == 'completed'
+    assert [message['content'] for message in session['messages']] == ['hello', 'done']
+    assert 'clarifications' not in session
+
+
+def test_untouched_fields_are_not_rewritten(db_path):
+    store = SQLiteSessionStore(db_path)
+    store.put('s1', new_session())
+    store.flush()
+
+    session = store.get('s1')
+    assert session['state'] == 'awaiting_clarification'
+    assert session.changes() == ({}, set())
+
+
+def test_expiry(db_path):
+    clock = FakeClock()
+    evicted = []
+    store = SQLiteSessionStore(db_path, ttl_seconds=60, clock=clock)
+    store.on_evict = evicted.append
+    store.put('s1', new_session())
+    store.flush()
+
+    clock.now += 30
+    assert store.get('s1') is not None
+    clock.now += 61
+    assert store.get('s1') is None
+    assert evicted == ['s1']
+    assert SQLiteSessionStore(db_path, clock=clock).get('s1') is None
+
+
+def test_delete(db_path):
+    store = SQLiteSessionStore(db_path)
+    store.put('s1', new_session())
+    store.flush()
+    store.delete('s1')
+    assert store.get('s1') is None
+    assert SQLiteSessionStore(db_path).get('s1') is None